@@ -24,9 +24,10 @@ from app.models.trade_flow import TradeFlow
 from app.models.port import Port
 from app.models.shipping_density import ShippingDensity
 from app.models.chokepoint import Chokepoint
+from app.services import usage_rollup
 from app.schemas.admin import (
     AdminUserSummary, AdminUserUpdate, PlatformStats,
-    UsageAnalytics, EndpointUsage, DailyUsage, UserUsage,
+    UsageAnalytics, EndpointUsageList, DailyUsageList, UserUsageList,
     SystemHealth,
 )
 
@@ -34,6 +35,41 @@ router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
 _start_time = time.time()
 
+# Data-table counts on the stats page: cached per process, and the big
+# tables use the planner's row estimate instead of a full COUNT(*) scan.
+DB_COUNT_MODELS = {
+    "countries": Country,
+    "trade_flows": TradeFlow,
+    "ports": Port,
+    "shipping_density": ShippingDensity,
+    "chokepoints": Chokepoint,
+}
+APPROX_COUNT_TABLES = ("trade_flows", "shipping_density")
+DB_COUNTS_TTL = 60  # seconds
+_db_counts_cache: tuple[float, dict[str, int]] | None = None
+
+
+def _db_counts(db: Session) -> dict[str, int]:
+    global _db_counts_cache
+    if _db_counts_cache and time.monotonic() - _db_counts_cache[0] < DB_COUNTS_TTL:
+        return _db_counts_cache[1]
+
+    # reltuples is -1 until the table is first analysed; count those exactly
+    estimates = dict(db.execute(
+        text("SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(:names)"),
+        {"names": list(APPROX_COUNT_TABLES)},
+    ).all())
+    counts = {}
+    for name, model in DB_COUNT_MODELS.items():
+        estimate = estimates.get(name, -1)
+        if name in APPROX_COUNT_TABLES and estimate >= 0:
+            counts[name] = estimate
+        else:
+            counts[name] = db.query(func.count(model.id)).scalar() or 0
+
+    _db_counts_cache = (time.monotonic(), counts)
+    return counts
+
 
 # ══════════════════════════════════════════════════════════════════════════
 #  PLATFORM OVERVIEW
@@ -63,13 +99,7 @@ def platform_stats(
     total_channels = db.query(func.count(NotificationChannel.id)).scalar() or 0
 
     # Database content counts
-    db_counts = {
-        "countries": db.query(func.count(Country.id)).scalar() or 0,
-        "trade_flows": db.query(func.count(TradeFlow.id)).scalar() or 0,
-        "ports": db.query(func.count(Port.id)).scalar() or 0,
-        "shipping_density": db.query(func.count(ShippingDensity.id)).scalar() or 0,
-        "chokepoints": db.query(func.count(Chokepoint.id)).scalar() or 0,
-    }
+    db_counts = _db_counts(db)
 
     return PlatformStats(
         total_users=total_users,
@@ -241,86 +271,63 @@ def usage_analytics(
     today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     week_start = now - timedelta(days=7)
 
-    # Total requests in window
-    total = db.query(func.count(APIUsageLog.id)).filter(
-        APIUsageLog.timestamp >= start
-    ).scalar() or 0
-
-    # Today
-    requests_today = db.query(func.count(APIUsageLog.id)).filter(
-        APIUsageLog.timestamp >= today_start
-    ).scalar() or 0
-
-    # This week
-    requests_week = db.query(func.count(APIUsageLog.id)).filter(
-        APIUsageLog.timestamp >= week_start
-    ).scalar() or 0
-
-    # Top endpoints
-    top_eps = (
-        db.query(
-            APIUsageLog.endpoint,
-            APIUsageLog.method,
-            func.count(APIUsageLog.id).label("cnt"),
-            func.avg(APIUsageLog.response_time_ms).label("avg_ms"),
-        )
-        .filter(APIUsageLog.timestamp >= start)
-        .group_by(APIUsageLog.endpoint, APIUsageLog.method)
-        .order_by(desc("cnt"))
-        .limit(15)
-        .all()
-    )
-    top_endpoints = [
-        EndpointUsage(
-            endpoint=ep, method=method,
-            count=cnt, avg_response_ms=round(avg_ms, 1) if avg_ms else None,
-        )
+    # Window / today / this week / error totals in one scan of the newest
+    # partitions instead of four separate COUNT queries
+    total, requests_today, requests_week, error_count = db.query(
+        func.count(APIUsageLog.id).filter(APIUsageLog.timestamp >= start),
+        func.count(APIUsageLog.id).filter(APIUsageLog.timestamp >= today_start),
+        func.count(APIUsageLog.id).filter(APIUsageLog.timestamp >= week_start),
+        func.count(APIUsageLog.id).filter(
+            APIUsageLog.timestamp >= start, APIUsageLog.status_code >= 400,
+        ),
+    ).filter(
+        APIUsageLog.timestamp >= min(start, today_start, week_start),
+    ).one()
+
+    # Top endpoints (nightly roll-up + today's raw rows)
+    top_eps = usage_rollup.top_endpoints(db, start, limit=15)
+    top_endpoints = EndpointUsageList.validate_python([
+        {
+            "endpoint": ep, "method": method,
+            "count": cnt, "avg_response_ms": round(avg_ms, 1) if avg_ms else None,
+        }
         for ep, method, cnt, avg_ms in top_eps
-    ]
+    ])
 
     # Daily trend
-    daily_rows = (
-        db.query(
-            func.date(APIUsageLog.timestamp).label("day"),
-            func.count(APIUsageLog.id).label("cnt"),
-        )
-        .filter(APIUsageLog.timestamp >= start)
-        .group_by(func.date(APIUsageLog.timestamp))
-        .order_by("day")
-        .all()
+    daily_rows = usage_rollup.daily_counts(db, start)
+    daily_trend = DailyUsageList.validate_python(
+        [{"date": str(day), "request_count": cnt} for day, cnt in daily_rows]
     )
-    daily_trend = [DailyUsage(date=str(day), request_count=cnt) for day, cnt in daily_rows]
 
-    # Top users
+    # Top users (joined so the e-mail/tier lookup isn't one query per user)
     top_user_rows = (
         db.query(
             APIUsageLog.user_id,
+            User.email,
+            User.tier,
             func.count(APIUsageLog.id).label("cnt"),
             func.max(APIUsageLog.timestamp).label("last_req"),
         )
-        .filter(APIUsageLog.timestamp >= start, APIUsageLog.user_id.isnot(None))
-        .group_by(APIUsageLog.user_id)
+        .join(User, User.id == APIUsageLog.user_id)
+        .filter(APIUsageLog.timestamp >= start)
+        .group_by(APIUsageLog.user_id, User.email, User.tier)
         .order_by(desc("cnt"))
         .limit(10)
         .all()
     )
-    top_users = []
-    for uid, cnt, last_req in top_user_rows:
-        u = db.query(User).filter(User.id == uid).first()
-        if u:
-            top_users.append(UserUsage(
-                user_id=uid,
-                email=u.email,
-                tier=u.tier.value,
-                request_count=cnt,
-                last_request=last_req,
-            ))
+    top_users = UserUsageList.validate_python([
+        {
+            "user_id": uid,
+            "email": email,
+            "tier": tier.value,
+            "request_count": cnt,
+            "last_request": last_req,
+        }
+        for uid, email, tier, cnt, last_req in top_user_rows
+    ])
 
     # Error rate
-    error_count = db.query(func.count(APIUsageLog.id)).filter(
-        APIUsageLog.timestamp >= start,
-        APIUsageLog.status_code >= 400,
-    ).scalar() or 0
     error_rate = round((error_count / total * 100) if total > 0 else 0, 2)
 
     return UsageAnalytics(
@@ -8,7 +8,8 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 
 from app.core.database import get_db
 from app.core.security import get_current_user, require_tier
@@ -19,7 +20,7 @@ from app.models.alert import (
 )
 from app.schemas.alerts import (
     AlertRuleCreate, AlertRuleUpdate, AlertRuleResponse,
-    AlertResponse, AlertList, AlertAcknowledge, AlertSummary,
+    AlertResponse, AlertResponseList, AlertList, AlertAcknowledge, AlertSummary,
     ChannelCreate, ChannelUpdate, ChannelResponse,
 )
 from app.services.alert_engine import evaluate_user_rules
@@ -56,22 +57,30 @@ def _rule_to_response(rule: AlertRule) -> AlertRuleResponse:
     )
 
 
+def _alert_row(alert: Alert) -> dict:
+    return {
+        "id": alert.id,
+        "rule_id": alert.rule_id,
+        "rule_name": alert.rule.name if alert.rule else "",
+        "severity": alert.severity,
+        "status": alert.status,
+        "title": alert.title,
+        "message": alert.message,
+        "details": alert.details,
+        "triggered_at": alert.triggered_at,
+        "acknowledged_at": alert.acknowledged_at,
+        "resolved_at": alert.resolved_at,
+        "email_sent": alert.email_sent,
+        "webhook_sent": alert.webhook_sent,
+    }
+
+
 def _alert_to_response(alert: Alert) -> AlertResponse:
-    return AlertResponse(
-        id=alert.id,
-        rule_id=alert.rule_id,
-        rule_name=alert.rule.name if alert.rule else "",
-        severity=alert.severity,
-        status=alert.status,
-        title=alert.title,
-        message=alert.message,
-        details=alert.details,
-        triggered_at=alert.triggered_at,
-        acknowledged_at=alert.acknowledged_at,
-        resolved_at=alert.resolved_at,
-        email_sent=alert.email_sent,
-        webhook_sent=alert.webhook_sent,
-    )
+    return AlertResponse.model_validate(_alert_row(alert))
+
+
+def _alerts_to_response(alerts: list[Alert]) -> list[AlertResponse]:
+    return AlertResponseList.validate_python([_alert_row(a) for a in alerts])
 
 
 # ══════════════════════════════════════════════════════════════════════════
@@ -185,17 +194,23 @@ def list_alerts(
 
     total = q.count()
     unread = (
-        db.query(Alert)
+        db.query(func.count(Alert.id))
         .filter(Alert.user_id == user.id, Alert.status == AlertStatus.ACTIVE)
-        .count()
+        .scalar()
     )
 
-    alerts = q.order_by(Alert.triggered_at.desc()).offset(offset).limit(limit).all()
+    alerts = (
+        q.options(joinedload(Alert.rule))
+        .order_by(Alert.triggered_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
 
     return AlertList(
         total=total,
         unread=unread,
-        alerts=[_alert_to_response(a) for a in alerts],
+        alerts=_alerts_to_response(alerts),
     )
 
 
@@ -205,18 +220,17 @@ def alert_summary(
     db: Session = Depends(get_db),
 ):
     """Quick summary for the notification bell badge."""
-    active = (
-        db.query(Alert)
+    # Counts only — never hydrate the alerts (and their details JSONB)
+    by_severity = dict(
+        db.query(Alert.severity, func.count(Alert.id))
         .filter(Alert.user_id == user.id, Alert.status == AlertStatus.ACTIVE)
+        .group_by(Alert.severity)
+        .all()
     )
 
-    all_active = active.all()
-    critical = sum(1 for a in all_active if a.severity == AlertSeverity.CRITICAL)
-    warning = sum(1 for a in all_active if a.severity == AlertSeverity.WARNING)
-    info = sum(1 for a in all_active if a.severity == AlertSeverity.INFO)
-
     latest = (
         db.query(Alert)
+        .options(joinedload(Alert.rule))
         .filter(Alert.user_id == user.id)
         .order_by(Alert.triggered_at.desc())
         .limit(5)
@@ -224,11 +238,11 @@ def alert_summary(
     )
 
     return AlertSummary(
-        total_active=len(all_active),
-        critical=critical,
-        warning=warning,
-        info=info,
-        latest=[_alert_to_response(a) for a in latest],
+        total_active=sum(by_severity.values()),
+        critical=by_severity.get(AlertSeverity.CRITICAL, 0),
+        warning=by_severity.get(AlertSeverity.WARNING, 0),
+        info=by_severity.get(AlertSeverity.INFO, 0),
+        latest=_alerts_to_response(latest),
     )
 
 
@@ -285,7 +299,7 @@ def trigger_check(
     return {
         "checked_at": datetime.utcnow().isoformat(),
         "new_alerts": len(new_alerts),
-        "alerts": [_alert_to_response(a) for a in new_alerts],
+        "alerts": _alerts_to_response(new_alerts),
     }
 
 
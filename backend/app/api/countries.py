@@ -15,6 +15,7 @@ from app.models.port import Port
 from app.schemas.schemas import CountryMacro, CountryProfile, TradePartner, TradeYearSummary, PortResponse
 
 from app.models.country_indicator import CountryIndicator
+from app.services import partner_summary
 
 router = APIRouter(prefix="/api/countries", tags=["Countries"])
 
@@ -178,43 +179,18 @@ def get_country_profile(iso_code: str, db: Session = Depends(get_db)):
         for r in import_partners_raw
     ]
 
-    # Trade history by year
-    export_by_year = dict(
-        db.query(TradeFlow.year, func.sum(TradeFlow.trade_value_usd))
-        .filter(TradeFlow.exporter_iso == iso)
-        .group_by(TradeFlow.year)
-        .all()
-    )
+    # Trade history by year — totals and top partner per year come
+    # precomputed from the nightly materialized view
+    by_year: dict[int, dict[str, tuple]] = {}
+    for yr, direction, partner, total in partner_summary.year_summaries(db, iso):
+        by_year.setdefault(yr, {})[direction] = (partner, total)
 
-    import_by_year = dict(
-        db.query(TradeFlow.year, func.sum(TradeFlow.trade_value_usd))
-        .filter(TradeFlow.importer_iso == iso)
-        .group_by(TradeFlow.year)
-        .all()
-    )
-
-    # Top partner per year
-    all_years = sorted(set(list(export_by_year.keys()) + list(import_by_year.keys())))
     trade_history = []
-    for yr in all_years:
-        exp_total = export_by_year.get(yr, 0) or 0
-        imp_total = import_by_year.get(yr, 0) or 0
-
-        # Top export partner for this year
-        top_exp = (
-            db.query(TradeFlow.importer_iso)
-            .filter(TradeFlow.exporter_iso == iso, TradeFlow.year == yr)
-            .group_by(TradeFlow.importer_iso)
-            .order_by(func.sum(TradeFlow.trade_value_usd).desc())
-            .first()
-        )
-        top_imp = (
-            db.query(TradeFlow.exporter_iso)
-            .filter(TradeFlow.importer_iso == iso, TradeFlow.year == yr)
-            .group_by(TradeFlow.exporter_iso)
-            .order_by(func.sum(TradeFlow.trade_value_usd).desc())
-            .first()
-        )
+    for yr in sorted(by_year):
+        top_exp, exp_total = by_year[yr].get("export", (None, 0))
+        top_imp, imp_total = by_year[yr].get("import", (None, 0))
+        exp_total = exp_total or 0
+        imp_total = imp_total or 0
 
         trade_history.append(
             TradeYearSummary(
@@ -222,8 +198,8 @@ def get_country_profile(iso_code: str, db: Session = Depends(get_db)):
                 total_exports=exp_total,
                 total_imports=imp_total,
                 trade_balance=exp_total - imp_total,
-                top_export_partner=top_exp[0] if top_exp else None,
-                top_import_partner=top_imp[0] if top_imp else None,
+                top_export_partner=top_exp,
+                top_import_partner=top_imp,
             )
         )
 
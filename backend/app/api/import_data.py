@@ -29,6 +29,7 @@ from app.services.import_engine import (
     create_import_job,
     get_import_jobs,
     get_import_job_detail,
+    ERROR_PAGE_SIZE,
     get_data_sources,
     create_data_source,
     get_table_stats,
@@ -179,11 +180,13 @@ def list_import_jobs(
 @router.get("/jobs/{job_id}")
 def get_job_detail(
     job_id: int,
+    error_offset: int = Query(0, ge=0),
+    error_limit: int = Query(ERROR_PAGE_SIZE, ge=1, le=1000),
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    """Get detailed import job info including error log."""
-    detail = get_import_job_detail(db, job_id)
+    """Get detailed import job info including a page of its error log."""
+    detail = get_import_job_detail(db, job_id, error_offset, error_limit)
     if not detail:
         raise HTTPException(status_code=404, detail="Job not found")
     return detail
@@ -202,7 +205,8 @@ def table_stats(
     admin: User = Depends(get_admin_user),
     db: Session = Depends(get_db),
 ):
-    """Get row counts and year ranges for all importable tables."""
+    """Get row counts, year ranges and approximate distinct keys imported
+    so far for all importable tables."""
     return get_table_stats(db)
 
 
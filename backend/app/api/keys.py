@@ -8,6 +8,7 @@ from app.core.database import get_db
 from app.core.security import (
     get_current_user,
     generate_api_key,
+    invalidate_api_key,
     TIER_LIMITS,
 )
 from app.models.user import User, APIKey
@@ -87,3 +88,4 @@ def revoke_key(
         raise HTTPException(status_code=404, detail="API key not found")
     ak.is_active = False
     db.commit()
+    invalidate_api_key(ak.key_hash)
@@ -7,7 +7,7 @@ from app.core.database import get_db
 
 logger = logging.getLogger("gefo.api.ports")
 from app.models.port import Port
-from app.schemas.schemas import PortResponse
+from app.schemas.schemas import PortResponse, PortList
 
 router = APIRouter(prefix="/api/ports", tags=["Ports"])
 
@@ -32,7 +32,7 @@ def get_ports(
 
     ports = query.order_by(Port.throughput_teu.desc().nullslast()).limit(limit).all()
     logger.info(f"Ports fetched: {len(ports)} (country={country}, type={port_type})")
-    return ports
+    return PortList.validate_python(ports, from_attributes=True)
 
 
 @router.get("/{port_id}", response_model=PortResponse)
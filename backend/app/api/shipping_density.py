@@ -7,7 +7,7 @@ from app.core.database import get_db
 
 logger = logging.getLogger("gefo.api.shipping")
 from app.models.shipping_density import ShippingDensity
-from app.schemas.schemas import ShippingDensityResponse, ShippingDensityGrid
+from app.schemas.schemas import ShippingDensityList, ShippingDensityGrid
 
 router = APIRouter(prefix="/api/shipping_density", tags=["Shipping Density"])
 
@@ -20,7 +20,17 @@ def get_shipping_density(
     db: Session = Depends(get_db),
 ):
     """Get shipping density grid data for heatmap visualization."""
-    query = db.query(ShippingDensity).filter(ShippingDensity.year == year)
+    # Only the response columns: skips ORM identity-map work and the
+    # grid_cell polygon
+    query = db.query(
+        ShippingDensity.lat,
+        ShippingDensity.lon,
+        ShippingDensity.density_value,
+        ShippingDensity.year,
+        ShippingDensity.month,
+        ShippingDensity.vessel_type,
+        ShippingDensity.region_name,
+    ).filter(ShippingDensity.year == year)
 
     if month:
         query = query.filter(ShippingDensity.month == month)
@@ -35,15 +45,7 @@ def get_shipping_density(
 
     density_values = [d.density_value for d in data]
     return ShippingDensityGrid(
-        data=[ShippingDensityResponse(
-            lat=d.lat,
-            lon=d.lon,
-            density_value=d.density_value,
-            year=d.year,
-            month=d.month,
-            vessel_type=d.vessel_type,
-            region_name=d.region_name,
-        ) for d in data],
+        data=ShippingDensityList.validate_python([d._asdict() for d in data]),
         min_density=min(density_values),
         max_density=max(density_values),
     )
@@ -9,7 +9,7 @@ from app.core.database import get_db
 logger = logging.getLogger("gefo.api.trade_flows")
 from app.models.trade_flow import TradeFlow
 from app.models.country import Country
-from app.schemas.schemas import TradeFlowResponse, TradeFlowAggregated
+from app.schemas.schemas import TradeFlowResponse, TradeFlowList, TradeFlowAggregated
 
 router = APIRouter(prefix="/api/trade_flows", tags=["Trade Flows"])
 
@@ -53,29 +53,33 @@ def get_trade_flows(
     logger.info(f"Trade flows fetched: {len(flows)} (year={year}, exporter={exporter}, importer={importer})")
 
     # Enrich with country centroids
-    countries = {c.iso_code: c for c in db.query(Country).all()}
+    centroids = {
+        iso: (lat, lon)
+        for iso, lat, lon in db.query(Country.iso_code, Country.centroid_lat, Country.centroid_lon)
+    }
+    no_centroid = (None, None)
     results = []
     for f in flows:
-        exp = countries.get(f.exporter_iso)
-        imp = countries.get(f.importer_iso)
-        results.append(TradeFlowResponse(
-            id=f.id,
-            exporter_iso=f.exporter_iso,
-            importer_iso=f.importer_iso,
-            year=f.year,
-            month=f.month,
-            commodity_code=f.commodity_code,
-            commodity_description=f.commodity_description,
-            trade_value_usd=f.trade_value_usd,
-            weight_kg=f.weight_kg,
-            flow_type=f.flow_type,
-            exporter_lat=exp.centroid_lat if exp else None,
-            exporter_lon=exp.centroid_lon if exp else None,
-            importer_lat=imp.centroid_lat if imp else None,
-            importer_lon=imp.centroid_lon if imp else None,
-        ))
-
-    return results
+        exp_lat, exp_lon = centroids.get(f.exporter_iso, no_centroid)
+        imp_lat, imp_lon = centroids.get(f.importer_iso, no_centroid)
+        results.append({
+            "id": f.id,
+            "exporter_iso": f.exporter_iso,
+            "importer_iso": f.importer_iso,
+            "year": f.year,
+            "month": f.month,
+            "commodity_code": f.commodity_code,
+            "commodity_description": f.commodity_description,
+            "trade_value_usd": f.trade_value_usd,
+            "weight_kg": f.weight_kg,
+            "flow_type": f.flow_type,
+            "exporter_lat": exp_lat,
+            "exporter_lon": exp_lon,
+            "importer_lat": imp_lat,
+            "importer_lon": imp_lon,
+        })
+
+    return TradeFlowList.validate_python(results)
 
 
 @router.get("/stats")
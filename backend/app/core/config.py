@@ -47,6 +47,18 @@ class Settings(BaseSettings):
     smtp_from_email: str = "alerts@gefo.io"
     smtp_use_tls: bool = True
 
+    # Optional API surfaces (skip mounting to shrink startup and the OpenAPI schema)
+    enable_intelligence: bool = True
+    enable_geopolitical: bool = True
+
+    # API usage log retention in months (monthly partitions older than this
+    # are dropped); 0 keeps everything
+    usage_log_retention_months: int = 0
+    # Usage rows are buffered and written in batches of this size, or when
+    # the oldest buffered row is this many seconds old
+    usage_log_batch_size: int = 1000
+    usage_log_flush_seconds: float = 5.0
+
     # App URL (for links in emails)
     app_url: str = "http://localhost:3000"
 
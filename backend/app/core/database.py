@@ -1,11 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
 engine = create_engine(settings.database_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Ingestion/seed scripts write rows and rarely read them back, so skip the
+# post-commit expiry that would re-SELECT every loaded object on next access.
+SeedSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine,
+)
 Base = declarative_base()
 
+# Server-side default for naive-UTC DateTime columns: the database stamps the
+# row, and values still compare against datetime.utcnow() in Python.
+UTC_NOW = func.timezone("utc", func.now())
+
 
 def get_db():
     """Dependency for FastAPI endpoints."""
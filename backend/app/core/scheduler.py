@@ -5,6 +5,7 @@ Uses APScheduler to run monthly data ingestion jobs.
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 
 logger = logging.getLogger("gefo.scheduler")
@@ -48,8 +49,14 @@ def job_comtrade_update():
     logger.info("=== SCHEDULED JOB: UN Comtrade data update started ===")
     try:
         from app.ingestion.comtrade import run_comtrade_ingestion
+        from app.services.analytics import clear_series_cache
         year = datetime.now().year - 1
-        count = run_comtrade_ingestion(year)
+        try:
+            count = run_comtrade_ingestion(year)
+        finally:
+            # Even a failed run may have committed some trade_flows rows
+            clear_series_cache()
+            job_refresh_partner_view()
         logger.info(f"Comtrade update complete: {count} records ingested")
     except Exception as e:
         logger.error(f"Comtrade update job failed: {e}", exc_info=True)
@@ -114,6 +121,93 @@ def job_alert_check():
         logger.error(f"Alert check job failed: {e}", exc_info=True)
 
 
+def job_usage_log_partitions():
+    """Create upcoming monthly api_usage_logs partitions; drop expired ones."""
+    logger.info("=== SCHEDULED JOB: Usage log partition maintenance ===")
+    try:
+        from app.core.config import settings
+        from app.core.database import engine
+        from app.services.usage_partitions import ensure_partitions, drop_expired_partitions
+
+        with engine.begin() as conn:
+            created = ensure_partitions(conn)
+            dropped = drop_expired_partitions(conn, settings.usage_log_retention_months)
+        logger.info(f"Usage log partitions: created {created or 'none'}, dropped {dropped or 'none'}")
+    except Exception as e:
+        logger.error(f"Usage log partition job failed: {e}", exc_info=True)
+
+
+def job_usage_rollup():
+    """Roll completed days of api_usage_logs up into api_usage_daily."""
+    logger.info("=== SCHEDULED JOB: Usage log daily roll-up ===")
+    try:
+        from app.core.database import engine
+        from app.services.usage_rollup import rollup_usage_days
+
+        with engine.begin() as conn:
+            rows = rollup_usage_days(conn)
+        logger.info(f"Usage roll-up: {rows} day/endpoint rows written")
+    except Exception as e:
+        logger.error(f"Usage roll-up job failed: {e}", exc_info=True)
+
+
+def job_refresh_partner_view():
+    """Refresh the country/year top-partner materialized view."""
+    logger.info("=== SCHEDULED JOB: Top-partner view refresh ===")
+    try:
+        from app.core.database import engine
+        from app.services.partner_summary import refresh_view
+
+        with engine.begin() as conn:
+            refresh_view(conn)
+        logger.info("Top-partner view refreshed")
+    except Exception as e:
+        logger.error(f"Top-partner view refresh failed: {e}", exc_info=True)
+
+
+def job_risk_scores():
+    """Recompute and store country risk scores for the reference year."""
+    logger.info("=== SCHEDULED JOB: Country risk scores ===")
+    try:
+        from app.core.database import SessionLocal
+        from app.services.risk_scoring import compute_country_risk_scores, store_country_risk_scores
+
+        db = SessionLocal()
+        try:
+            year = 2023
+            stored = store_country_risk_scores(db, year, compute_country_risk_scores(db, year))
+            logger.info(f"Risk scores stored for {stored} countries ({year})")
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Risk score job failed: {e}", exc_info=True)
+
+
+def job_flush_api_key_usage():
+    """Write buffered API-key request counts / last-used times."""
+    try:
+        from app.core.database import SessionLocal
+        from app.core.security import flush_api_key_usage
+
+        db = SessionLocal()
+        try:
+            flush_api_key_usage(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"API-key usage flush failed: {e}", exc_info=True)
+
+
+def job_flush_usage_logs():
+    """Write buffered usage-log rows, so they don't wait for the next request."""
+    try:
+        from app.core.usage_middleware import flush_usage_logs
+
+        flush_usage_logs()
+    except Exception as e:
+        logger.error(f"Usage log flush failed: {e}", exc_info=True)
+
+
 def start_scheduler():
     """
     Register and start all scheduled jobs.
@@ -160,6 +254,67 @@ def start_scheduler():
         replace_existing=True,
     )
 
+    # API-key usage counters — flushed every minute
+    scheduler.add_job(
+        job_flush_api_key_usage,
+        IntervalTrigger(seconds=60),
+        id="api_key_usage_flush",
+        name="API-key usage counter flush (every 60 s)",
+        replace_existing=True,
+    )
+
+    # Usage log buffer — flushed on a timer too; the middleware only checks
+    # the age of buffered rows when another request arrives
+    from app.core.config import settings
+    scheduler.add_job(
+        job_flush_usage_logs,
+        IntervalTrigger(seconds=settings.usage_log_flush_seconds),
+        id="usage_log_flush",
+        name=f"Usage log buffer flush (every {settings.usage_log_flush_seconds:g} s)",
+        replace_existing=True,
+    )
+
+    # Usage log partitions — at startup, then on the 20th of each month so
+    # next month's partition exists well before its first row arrives
+    scheduler.add_job(
+        job_usage_log_partitions,
+        CronTrigger(day=20, hour=3, minute=0),
+        id="usage_log_partitions",
+        name="Monthly usage log partition maintenance",
+        replace_existing=True,
+        next_run_time=datetime.now(),
+    )
+
+    # Usage analytics roll-up — nightly just after midnight UTC (catches up
+    # on any missed days when it runs)
+    scheduler.add_job(
+        job_usage_rollup,
+        CronTrigger(hour=0, minute=15, timezone="UTC"),
+        id="usage_rollup",
+        name="Daily usage log roll-up",
+        replace_existing=True,
+    )
+
+    # Country profile top partners — at startup (init_db creates the view
+    # before any trade_flows are seeded), then nightly after the usage roll-up
+    scheduler.add_job(
+        job_refresh_partner_view,
+        CronTrigger(hour=1, minute=0),
+        id="partner_view_refresh",
+        name="Nightly top-partner view refresh",
+        replace_existing=True,
+        next_run_time=datetime.now(),
+    )
+
+    # Country risk scores — nightly snapshot into country_risk_scores
+    scheduler.add_job(
+        job_risk_scores,
+        CronTrigger(hour=2, minute=30),
+        id="risk_scores",
+        name="Nightly country risk score snapshot",
+        replace_existing=True,
+    )
+
     scheduler.start()
 
     jobs = scheduler.get_jobs()
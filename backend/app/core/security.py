@@ -1,14 +1,19 @@
 """Authentication & authorisation utilities — JWT, passwords, API keys."""
 
 from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
 from typing import Optional
+import re
 import secrets
 import hashlib
+import threading
+import time
 
 from fastapi import Depends, HTTPException, status, Security
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import DateTime, Integer, column, func, update, values
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -60,16 +65,111 @@ def decode_access_token(token: str) -> dict:
 
 # ─── API-key helpers ───
 
-def generate_api_key() -> tuple[str, str, str]:
+def generate_api_key() -> tuple[str, str, bytes]:
     """Return (raw_key, key_prefix, key_hash)."""
     raw = f"gefo_{secrets.token_urlsafe(32)}"
     prefix = raw[:12]
-    key_hash = hashlib.sha256(raw.encode()).hexdigest()
-    return raw, prefix, key_hash
+    return raw, prefix, hash_api_key(raw)
 
 
-def hash_api_key(raw: str) -> str:
-    return hashlib.sha256(raw.encode()).hexdigest()
+def hash_api_key(raw: str) -> bytes:
+    """Raw 32-byte SHA-256 digest, as stored in ``api_keys.key_hash``."""
+    return hashlib.sha256(raw.encode()).digest()
+
+
+# Shape of keys from generate_api_key — anything else can't be valid
+API_KEY_RE = re.compile(r"gefo_[A-Za-z0-9_-]{43}")
+
+# Per-process API-key lookup cache: key_hash → (api_key_id, user_id,
+# expires_at). Known-bad hashes are cached separately so a flood of
+# invalid keys can't evict good entries. Revocation clears this process's
+# entry at once; other workers drop it within the TTL.
+API_KEY_CACHE_SIZE = 10_000
+API_KEY_CACHE_TTL = 60  # seconds
+_api_key_cache: "OrderedDict[bytes, tuple[float, Optional[tuple]]]" = OrderedDict()
+_api_key_misses: "OrderedDict[bytes, float]" = OrderedDict()
+
+
+def _cache_get(cache: OrderedDict, key: bytes):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    cached_at = entry[0] if isinstance(entry, tuple) else entry
+    if time.monotonic() - cached_at >= API_KEY_CACHE_TTL:
+        cache.pop(key, None)
+        return None
+    cache.move_to_end(key)
+    return entry
+
+
+def _cache_put(cache: OrderedDict, key: bytes, value) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > API_KEY_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def invalidate_api_key(key_hash: bytes) -> None:
+    """Forget a cached key (call after revoking it)."""
+    _api_key_cache.pop(key_hash, None)
+
+
+# API-key usage stats accumulate here (key id → [requests, last used]) and
+# are written by flush_api_key_usage — scheduled every minute and run on
+# shutdown — instead of one UPDATE per request.
+_pending_key_usage: dict[int, list] = {}
+_pending_lock = threading.Lock()
+
+
+def record_api_key_use(key_id: int, when: datetime) -> None:
+    with _pending_lock:
+        entry = _pending_key_usage.get(key_id)
+        if entry is None:
+            _pending_key_usage[key_id] = [1, when]
+        else:
+            entry[0] += 1
+            entry[1] = max(entry[1], when)
+
+
+def flush_api_key_usage(db: Session) -> int:
+    """Apply buffered usage stats in one UPDATE ... FROM (VALUES ...).
+    Returns the number of keys updated."""
+    global _pending_key_usage
+    with _pending_lock:
+        pending, _pending_key_usage = _pending_key_usage, {}
+    if not pending:
+        return 0
+
+    usage = values(
+        column("id", Integer),
+        column("n", Integer),
+        column("ts", DateTime(timezone=True)),
+        name="usage",
+    ).data([(key_id, n, ts) for key_id, (n, ts) in pending.items()])
+    table = APIKey.__table__
+    try:
+        db.execute(
+            update(table)
+            .where(table.c.id == usage.c.id)
+            .values(
+                request_count=func.coalesce(table.c.request_count, 0) + usage.c.n,
+                last_used_at=func.greatest(table.c.last_used_at, usage.c.ts),
+            )
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        # Put the stats back so the next flush retries them
+        with _pending_lock:
+            for key_id, (n, ts) in pending.items():
+                entry = _pending_key_usage.get(key_id)
+                if entry is None:
+                    _pending_key_usage[key_id] = [n, ts]
+                else:
+                    entry[0] += n
+                    entry[1] = max(entry[1], ts)
+        raise
+    return len(pending)
 
 
 # ─── Dependency: get current user from JWT ───
@@ -89,23 +189,40 @@ def _get_user_from_token(token: str, db: Session) -> Optional[User]:
     return None
 
 
-def _get_user_from_api_key(api_key: str, db: Session) -> Optional[User]:
-    key_hash = hash_api_key(api_key)
-    ak = (
-        db.query(APIKey)
+def _lookup_api_key(key_hash: bytes, db: Session) -> Optional[tuple]:
+    """(api_key_id, user_id, expires_at) for an active key, via the cache."""
+    hit = _cache_get(_api_key_cache, key_hash)
+    if hit is not None:
+        return hit[1]
+    if _cache_get(_api_key_misses, key_hash) is not None:
+        return None
+
+    row = (
+        db.query(APIKey.id, APIKey.user_id, APIKey.expires_at)
         .filter(APIKey.key_hash == key_hash, APIKey.is_active == True)
         .first()
     )
-    if ak is None:
+    if row is None:
+        _cache_put(_api_key_misses, key_hash, time.monotonic())
+        return None
+    entry = tuple(row)
+    _cache_put(_api_key_cache, key_hash, (time.monotonic(), entry))
+    return entry
+
+
+def _get_user_from_api_key(api_key: str, db: Session) -> Optional[User]:
+    if not API_KEY_RE.fullmatch(api_key):
+        return None
+    entry = _lookup_api_key(hash_api_key(api_key), db)
+    if entry is None:
         return None
+    key_id, user_id, expires_at = entry
     # Check expiry
-    if ak.expires_at and ak.expires_at < datetime.now(timezone.utc):
+    now = datetime.now(timezone.utc)
+    if expires_at and expires_at < now:
         return None
-    # Update usage stats
-    ak.request_count += 1
-    ak.last_used_at = datetime.now(timezone.utc)
-    db.commit()
-    return ak.user
+    record_api_key_use(key_id, now)
+    return db.get(User, user_id)
 
 
 async def get_current_user(
@@ -1,20 +1,118 @@
 """
 Usage tracking middleware — logs authenticated API requests for admin analytics.
+
+Rows are buffered in memory and written with one executemany INSERT per
+batch (``usage_log_batch_size`` rows, or whenever the oldest buffered row
+is ``usage_log_flush_seconds`` old), instead of a session + commit per
+request. ``flush_usage_logs`` also runs on a scheduler interval, so an idle
+server doesn't hold rows indefinitely, and on shutdown.
 """
 
 import time
 import logging
+import threading
+from datetime import datetime
+
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from app.core.config import settings
+
 logger = logging.getLogger("gefo.usage")
 
+_buffer: list[dict] = []
+_buffer_started = 0.0
+_lock = threading.Lock()
+
+# User-Agent text → user_agents.id, filled as batches are written
+USER_AGENT_CACHE_SIZE = 10_000
+_user_agent_ids: dict[str, int] = {}
+
+
+def _take_batch(force: bool = False) -> list[dict]:
+    """Detach the buffered rows if a flush is due (or forced)."""
+    global _buffer, _buffer_started
+    with _lock:
+        if not _buffer:
+            return []
+        due = (
+            len(_buffer) >= settings.usage_log_batch_size
+            or time.monotonic() - _buffer_started >= settings.usage_log_flush_seconds
+        )
+        if not (force or due):
+            return []
+        batch, _buffer = _buffer, []
+        return batch
+
+
+def _resolve_user_agents(db, batch: list[dict]) -> None:
+    """Swap each row's user_agent text for its user_agents.id.
+
+    Ids are resolved into a per-batch dict; the shared _user_agent_ids cache
+    is only a hint (read and written under _lock), since concurrent batches
+    may clear it at any time.
+    """
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.models.usage_log import UserAgent
+
+    wanted = {r["user_agent"] for r in batch if r["user_agent"]}
+    with _lock:
+        ids = {ua: _user_agent_ids[ua] for ua in wanted if ua in _user_agent_ids}
+    missing = wanted - ids.keys()
+    if missing:
+        db.execute(
+            pg_insert(UserAgent).values([{"ua_text": ua} for ua in missing])
+            .on_conflict_do_nothing(index_elements=["ua_text"])
+        )
+        # Commit before caching ids, so a failed log insert can't roll
+        # back rows the cache already points at
+        db.commit()
+        fetched = dict(
+            (ua, ua_id) for ua_id, ua in
+            db.query(UserAgent.id, UserAgent.ua_text).filter(UserAgent.ua_text.in_(missing))
+        )
+        ids.update(fetched)
+        with _lock:
+            if len(_user_agent_ids) + len(fetched) > USER_AGENT_CACHE_SIZE:
+                _user_agent_ids.clear()
+            _user_agent_ids.update(fetched)
+    for r in batch:
+        ua = r.pop("user_agent")
+        r["user_agent_id"] = ids.get(ua) if ua else None
+
+
+def _write_batch(batch: list[dict]) -> None:
+    # Import here to avoid circular imports
+    from app.core.database import SessionLocal
+    from app.models.usage_log import APIUsageLog
+
+    db = SessionLocal()
+    try:
+        _resolve_user_agents(db, batch)
+        db.execute(APIUsageLog.__table__.insert(), batch)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.warning("Usage logging failed, dropped %d rows: %s", len(batch), exc)
+    finally:
+        db.close()
+
+
+def flush_usage_logs() -> None:
+    """Write every buffered usage row now."""
+    batch = _take_batch(force=True)
+    if batch:
+        _write_batch(batch)
+
 
 class UsageTrackingMiddleware(BaseHTTPMiddleware):
     """Log API requests for usage analytics. Only tracks /api/ endpoints."""
 
     async def dispatch(self, request: Request, call_next) -> Response:
+        global _buffer_started
+
         # Only track API endpoints
         path = request.url.path
         if not path.startswith("/api/"):
@@ -28,31 +126,29 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         elapsed_ms = (time.time() - start) * 1000
 
-        # Try to log asynchronously (non-blocking)
         try:
             user_id = None
             if hasattr(request.state, "user") and request.state.user:
                 user_id = request.state.user.id
 
-            # Import here to avoid circular imports
-            from app.core.database import SessionLocal
-            from app.models.usage_log import APIUsageLog
-
-            db = SessionLocal()
-            try:
-                log = APIUsageLog(
-                    user_id=user_id,
-                    endpoint=path,
-                    method=request.method,
-                    status_code=response.status_code,
-                    response_time_ms=round(elapsed_ms, 2),
-                    ip_address=request.client.host if request.client else None,
-                    user_agent=request.headers.get("user-agent", "")[:500],
-                )
-                db.add(log)
-                db.commit()
-            finally:
-                db.close()
+            row = {
+                "user_id": user_id,
+                "endpoint": path,
+                "method": request.method,
+                "status_code": response.status_code,
+                "response_time_ms": round(elapsed_ms, 2),
+                "ip_address": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent", "")[:500],
+                "timestamp": datetime.utcnow(),
+            }
+            with _lock:
+                if not _buffer:
+                    _buffer_started = time.monotonic()
+                _buffer.append(row)
+
+            batch = _take_batch()
+            if batch:
+                await run_in_threadpool(_write_batch, batch)
         except Exception as exc:
             logger.debug("Usage logging failed: %s", exc)
 
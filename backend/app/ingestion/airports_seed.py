@@ -5,7 +5,7 @@ Seed data for major world airports.
 import logging
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.database import SeedSessionLocal
 from app.models.airport import Airport
 
 logger = logging.getLogger(__name__)
@@ -860,7 +860,7 @@ AIRPORTS_DATA = [
 
 def seed_airports():
     """Seed airport data into the database."""
-    db = SessionLocal()
+    db = SeedSessionLocal()
 
     try:
         for airport_data in AIRPORTS_DATA:
@@ -0,0 +1,83 @@
+"""
+Bulk-load helpers shared by the ingestion scripts.
+
+  - bulk_insert: Core INSERT executemany, chunked per dialect
+  - copy_rows:   PostgreSQL COPY FROM STDIN, falling back to bulk_insert
+"""
+import csv
+import io
+from itertools import islice
+
+from sqlalchemy import insert, text
+
+# Rows per INSERT statement. PostgreSQL gains nothing past ~1k rows and caps
+# bind parameters at 65535; other engines prefer larger batches.
+BULK_INSERT_BATCH_SIZES = {"postgresql": 1_000}
+DEFAULT_BULK_INSERT_BATCH_SIZE = 10_000
+
+# Columns written for aggregate (commodity-less) trade flows
+TRADE_FLOW_COPY_COLUMNS = ("exporter_iso", "importer_iso", "year", "trade_value_usd", "flow_type")
+
+
+def bulk_insert(db, model, rows, batch_size=None):
+    """Core executemany of `rows` (dicts) into `model`, chunked per dialect."""
+    if batch_size is None:
+        batch_size = BULK_INSERT_BATCH_SIZES.get(
+            db.get_bind().dialect.name, DEFAULT_BULK_INSERT_BATCH_SIZE
+        )
+    it = iter(rows)
+    while chunk := list(islice(it, batch_size)):
+        db.execute(insert(model), chunk)
+
+
+def copy_rows(db, model, columns, rows, skip_conflicts=False, on_conflict=None):
+    """Load `rows` (dicts) into `model` with PostgreSQL COPY.
+
+    Runs on the session's own connection, so the rows commit or roll back
+    with the surrounding transaction. With `skip_conflicts`, rows are COPYed
+    into a temp staging table and moved across with INSERT ... ON CONFLICT
+    DO NOTHING, so the table's unique indexes do the deduplication.
+    `on_conflict` replaces that clause (e.g. "(iso_code) DO UPDATE SET ...")
+    for upserts; it implies staging.
+    Other dialects use bulk_insert (without conflict handling).
+
+    Returns the number of rows actually inserted (or updated).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        bulk_insert(db, model, rows)
+        return len(rows)
+
+    table = model.__tablename__
+    column_list = ", ".join(columns)
+    target = table
+    skip_conflicts = skip_conflicts or on_conflict is not None
+    if skip_conflicts:
+        target = f"_stage_{table}"
+        db.execute(text(f"DROP TABLE IF EXISTS {target}"))
+        db.execute(text(
+            f"CREATE TEMP TABLE {target} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {table} WITH NO DATA"
+        ))
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows(tuple(r[col] for col in columns) for r in rows)
+    buf.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {target} ({column_list}) FROM STDIN WITH (FORMAT CSV)",
+            buf,
+        )
+    finally:
+        cursor.close()
+
+    if not skip_conflicts:
+        return len(rows)
+    result = db.execute(text(
+        f"INSERT INTO {table} ({column_list}) "
+        f"SELECT {column_list} FROM {target} ON CONFLICT {on_conflict or 'DO NOTHING'}"
+    ))
+    db.execute(text(f"DROP TABLE {target}"))
+    return result.rowcount
@@ -19,7 +19,7 @@ from typing import Optional, List, Dict
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
-from app.core.database import SessionLocal
+from app.core.database import SeedSessionLocal
 from app.core.config import settings
 from app.models.trade_flow import TradeFlow
 from app.models.country import Country
@@ -130,12 +130,18 @@ ISO3_TO_M49: Dict[str, str] = {
 
 
 def upsert_trade_flow(db: Session, flow: TradeFlow):
-    """Insert or update a trade flow record (avoid duplicates)."""
+    """Insert or update a trade flow record (avoid duplicates).
+
+    Matches on the ux_trade_flows_natural_key columns. The session does not
+    autoflush, so callers must not pass two flows with the same key between
+    commits; ingest_comtrade_for_country dedupes each batch first.
+    """
     existing = db.query(TradeFlow).filter(
         and_(
             TradeFlow.exporter_iso == flow.exporter_iso,
             TradeFlow.importer_iso == flow.importer_iso,
             TradeFlow.year == flow.year,
+            TradeFlow.month == flow.month,
             TradeFlow.commodity_code == flow.commodity_code,
             TradeFlow.flow_type == flow.flow_type,
         )
@@ -168,7 +174,8 @@ def ingest_comtrade_for_country(
         api_key=api_key,
     )
 
-    count = 0
+    # (partner, commodity) → flow; a repeated key keeps the last record
+    flows: Dict[tuple, TradeFlow] = {}
     for record in records:
         try:
             partner_iso = record.get("partner2ISO", "")
@@ -190,11 +197,13 @@ def ingest_comtrade_for_country(
                 weight_kg=record.get("netWgt", None),
                 flow_type="export",
             )
-            upsert_trade_flow(db, flow)
-            count += 1
+            flows[(flow.importer_iso, flow.commodity_code)] = flow
         except Exception as e:
             logger.error(f"Error processing record: {e}")
 
+    for flow in flows.values():
+        upsert_trade_flow(db, flow)
+    count = len(flows)
     db.commit()
     logger.info(f"Ingested {count} trade flows for {iso_code}/{year}")
     return count
@@ -214,7 +223,7 @@ def run_comtrade_ingestion(
         countries: Optional list of ISO3 codes to fetch (default: all mapped)
         api_key: Optional subscription API key
     """
-    db = SessionLocal()
+    db = SeedSessionLocal()
     total = 0
     api_key = api_key or getattr(settings, "un_comtrade_api_key", "") or None
 
@@ -231,6 +240,8 @@ def run_comtrade_ingestion(
                 count = ingest_comtrade_for_country(iso_code, year, db, api_key)
                 total += count
             except Exception as e:
+                # Discard the failed batch so the next country starts clean
+                db.rollback()
                 logger.error(f"Failed ingesting {iso_code}: {e}")
 
             if i < len(target_countries) - 1:
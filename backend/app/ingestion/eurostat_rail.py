@@ -21,7 +21,7 @@ import httpx
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from app.core.database import SessionLocal, engine
+from app.core.database import SeedSessionLocal, engine
 from app.models.country import Country
 from app.models.rail_freight import RailFreight
 
@@ -67,7 +67,7 @@ def fetch_eurostat_rail_csv() -> str:
 def parse_and_ingest(csv_text: str):
     """Parse SDMX-CSV and ingest bilateral flows."""
     RailFreight.__table__.create(engine, checkfirst=True)
-    db = SessionLocal()
+    db = SeedSessionLocal()
 
     try:
         # Get valid ISO codes
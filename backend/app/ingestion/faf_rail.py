@@ -23,7 +23,7 @@ import httpx
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from app.core.database import SessionLocal, engine
+from app.core.database import SeedSessionLocal, engine
 from app.models.rail_freight import RailFreight
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
@@ -208,7 +208,7 @@ def fetch_and_ingest():
 
     log.info("Filtered to %d records (>= %d K tons). Upserting...", len(records), int(MIN_TONS))
 
-    db = SessionLocal()
+    db = SeedSessionLocal()
     try:
         batch_size = 500
         for i in range(0, len(records), batch_size):
@@ -238,7 +238,7 @@ def _upsert_batch(batch: list[dict]):
             "tonne_km": stmt.excluded.tonne_km,
         },
     )
-    db = SessionLocal()
+    db = SeedSessionLocal()
     try:
         db.execute(stmt)
         db.commit()
@@ -27,8 +27,9 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 import comtradeapicall as cc
-from sqlalchemy import func, text
-from app.core.database import SessionLocal
+from sqlalchemy import func, text, tuple_
+from app.core.database import SeedSessionLocal
+from app.ingestion.bulk_load import TRADE_FLOW_COPY_COLUMNS, copy_rows
 from app.models.country import Country
 from app.models.trade_flow import TradeFlow
 
@@ -133,7 +134,7 @@ def main():
         log.info("For faster fetching, register at https://comtradeplus.un.org/ and set COMTRADE_KEY env var")
         rate_delay = 3.5  # be more polite with free tier to avoid rate limits
 
-    db = SessionLocal()
+    db = SeedSessionLocal()
     try:
         # Get our DB countries for ISO3 matching
         db_countries = {c.iso_code: c for c in db.query(Country).all()}
@@ -200,7 +201,8 @@ def main():
                     log.debug(f"  [{idx+1}/{len(reporter_list)}] {iso3} ({name}): no data")
                     continue
 
-                batch = []
+                # Deduplicate as we go: keep highest value per (exporter, importer)
+                best = {}
                 for _, row in df.iterrows():
                     partner_iso = row.get('partnerISO', '')
                     value = row.get('primaryValue', 0)
@@ -220,24 +222,24 @@ def main():
                     if partner_code == 0 or partner_iso in ('W00', 'WLD'):
                         continue
 
-                    batch.append(TradeFlow(
-                        exporter_iso=iso3,
-                        importer_iso=partner_iso,
-                        year=year,
-                        trade_value_usd=float(value),
-                        flow_type="export",
-                    ))
-
-                # Deduplicate batch: keep highest value per (exporter, importer)
-                seen = {}
-                for tf in batch:
-                    key = (tf.exporter_iso, tf.importer_iso)
-                    if key not in seen or tf.trade_value_usd > seen[key].trade_value_usd:
-                        seen[key] = tf
-                batch = list(seen.values())
+                    value = float(value)
+                    if partner_iso not in best or value > best[partner_iso]:
+                        best[partner_iso] = value
+
+                # Plain dicts + one Core executemany, no per-row ORM objects
+                batch = [
+                    {
+                        "exporter_iso": iso3,
+                        "importer_iso": partner_iso,
+                        "year": year,
+                        "trade_value_usd": value,
+                        "flow_type": "export",
+                    }
+                    for partner_iso, value in best.items()
+                ]
 
                 if batch:
-                    db.bulk_save_objects(batch)
+                    copy_rows(db, TradeFlow, TRADE_FLOW_COPY_COLUMNS, batch)
                     db.commit()
                     year_total += len(batch)
                     log.info(f"  [{idx+1}/{len(reporter_list)}] {iso3} ({name}): {len(batch)} trade flows")
@@ -259,17 +261,22 @@ def main():
         log.info(f"Total flows imported: {grand_total:,}")
         log.info(f"Years covered: {years}")
 
-        # Stats
+        # Stats — one grouped pass instead of two queries per year. Pairs are
+        # counted as a native row tuple rather than a concatenated string.
+        stats = db.query(
+            TradeFlow.year,
+            func.count(TradeFlow.id),
+            func.count(func.distinct(tuple_(TradeFlow.exporter_iso, TradeFlow.importer_iso))),
+            func.count(func.distinct(TradeFlow.exporter_iso)),
+        ).filter(
+            TradeFlow.year.in_(years),
+            TradeFlow.commodity_code.is_(None),
+        ).group_by(TradeFlow.year).all()
+        by_year = {row[0]: row[1:] for row in stats}
         for year in years:
-            pair_count = db.query(func.count(TradeFlow.id)).filter(
-                TradeFlow.year == year,
-                TradeFlow.commodity_code.is_(None),
-            ).scalar()
-            unique_exporters = db.query(func.count(func.distinct(TradeFlow.exporter_iso))).filter(
-                TradeFlow.year == year,
-                TradeFlow.commodity_code.is_(None),
-            ).scalar()
-            log.info(f"  {year}: {pair_count:,} flows, {unique_exporters} exporter countries")
+            flow_count, pair_count, unique_exporters = by_year.get(year, (0, 0, 0))
+            log.info(f"  {year}: {flow_count:,} flows ({pair_count:,} country pairs), "
+                     f"{unique_exporters} exporter countries")
 
     except KeyboardInterrupt:
         log.info("\nInterrupted! Committing partial data...")
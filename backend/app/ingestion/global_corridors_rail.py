@@ -25,7 +25,7 @@ Volumes in thousand tonnes (THS_T).
 
 import logging
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from app.core.database import SessionLocal, engine
+from app.core.database import SeedSessionLocal, engine
 from app.models.rail_freight import RailFreight
 
 log = logging.getLogger(__name__)
@@ -873,7 +873,7 @@ def seed():
     records = _build_records()
     log.info("Generated %d estimated corridor rail freight records", len(records))
 
-    db = SessionLocal()
+    db = SeedSessionLocal()
     try:
         batch_size = 200
         for i in range(0, len(records), batch_size):
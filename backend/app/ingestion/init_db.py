@@ -13,15 +13,17 @@ from app.models.shipping_density import ShippingDensity
 from app.models.chokepoint import Chokepoint
 from app.models.user import User, APIKey
 from app.models.alert import AlertRule, Alert, NotificationChannel
-from app.models.usage_log import APIUsageLog
+from app.models.usage_log import APIUsageLog, APIUsageDaily, UserAgent
 from app.models.geopolitical import SanctionedEntity, ConflictZone, CountryRiskScore, SupplyChainRoute
 from app.models.analytics import TradeForecast, TradeAnomaly
-from app.models.import_job import ImportJob, DataSource
+from app.models.import_job import ImportJob, ImportJobError, DataSource
 from app.models.commodity import Commodity, CommodityPrice, SupplyDependency
 from app.models.data_source import NationalDataSource, EconomicGroup, CountryGroupMembership, DataProvenance
 from app.models.airport import Airport
 from app.models.rail_freight import RailFreight
 from app.models.country_indicator import CountryIndicator
+from app.services.usage_partitions import ensure_partitions
+from app.services.partner_summary import ensure_view as ensure_partner_view
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,16 @@ def init_db():
     Base.metadata.create_all(bind=engine)
     logger.info("All tables created successfully")
 
+    # Monthly partitions for the API usage log
+    with engine.begin() as conn:
+        created = ensure_partitions(conn)
+    if created:
+        logger.info(f"Created usage log partitions: {', '.join(created)}")
+
+    # Per-country/year top-partner summary (refreshed nightly)
+    with engine.begin() as conn:
+        ensure_partner_view(conn)
+
 
 def drop_all():
     """Drop all tables (use with caution)."""
@@ -11,7 +11,7 @@ import geopandas as gpd
 from sqlalchemy.orm import Session
 from geoalchemy2.shape import from_shape
 
-from app.core.database import SessionLocal
+from app.core.database import SeedSessionLocal
 from app.models.country import Country
 
 logger = logging.getLogger(__name__)
@@ -55,7 +55,7 @@ def ingest_natural_earth():
     """
     Import Natural Earth country geometries and centroids into the database.
     """
-    db = SessionLocal()
+    db = SeedSessionLocal()
 
     try:
         shp_dir = download_natural_earth()
@@ -6,7 +6,7 @@ Static data from World Shipping Council and public sources.
 import logging
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.database import SeedSessionLocal
 from app.models.port import Port
 
 logger = logging.getLogger(__name__)
@@ -305,7 +305,7 @@ PORTS_DATA = [
 
 def seed_ports():
     """Seed port data into the database."""
-    db = SessionLocal()
+    db = SeedSessionLocal()
 
     try:
         for port_data in PORTS_DATA:
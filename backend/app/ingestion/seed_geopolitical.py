@@ -1,10 +1,10 @@
 """Seed sanctions, conflict zones, and supply chain route data."""
-import sys, os, json
+import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from datetime import date
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine, Base
+from app.core.database import SeedSessionLocal, engine, Base
 from app.models.geopolitical import SanctionedEntity, ConflictZone, CountryRiskScore, SupplyChainRoute
 
 # Ensure tables exist
@@ -227,7 +227,7 @@ CONFLICT_ZONES = [
 
 
 def seed_geopolitical():
-    db: Session = SessionLocal()
+    db: Session = SeedSessionLocal()
     try:
         # --- Sanctions ---
         existing_sanctions = db.query(SanctionedEntity).count()
@@ -251,10 +251,7 @@ def seed_geopolitical():
         existing_zones = db.query(ConflictZone).count()
         if existing_zones == 0:
             for cz in CONFLICT_ZONES:
-                cz_copy = dict(cz)
-                cz_copy["affected_countries"] = json.dumps(cz_copy.get("affected_countries", []))
-                cz_copy["affected_chokepoints"] = json.dumps(cz_copy.get("affected_chokepoints", []))
-                zone = ConflictZone(**cz_copy, is_active=True)
+                zone = ConflictZone(**cz, is_active=True)
                 db.add(zone)
             db.commit()
             count = db.query(ConflictZone).count()
@@ -5,17 +5,40 @@ Seeds national data source registry.
 Imports 5 pre-built trade-data JSON files into trade_flows.
 """
 import json
+import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import repeat
+from logging.handlers import MemoryHandler
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is a drop-in fallback
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # only used to stream very large trade files
+    ijson = None
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-from app.core.database import SessionLocal
+import numpy as np
+from sqlalchemy import text
+
+from app.core.database import SeedSessionLocal, engine
+from app.ingestion.bulk_load import TRADE_FLOW_COPY_COLUMNS, bulk_insert, copy_rows
 from app.models.country import Country
 from app.models.data_source import (
     NationalDataSource, EconomicGroup, CountryGroupMembership, DataProvenance
 )
 from app.models.trade_flow import TradeFlow
+from app.services.partner_summary import refresh_view as refresh_partner_view
+
+logger = logging.getLogger("gefo.ingestion.globe_merge")
 
 # ────────────────────────────────────────────
 #  ISO-2 → ISO-3 mapping  (globe uses 2-letter, GEFO uses 3-letter)
@@ -327,6 +350,20 @@ GLOBE_COUNTRIES = [
     ("ZW", "🇿🇼", "Harare", -17.8252, 31.0335, "Africa"),
 ]
 
+# Column-wise centroids so distance/clustering code can vectorise over them.
+# float64 keeps the stored values identical to the literals above.
+_CENTROID_LAT = np.fromiter((c[3] for c in GLOBE_COUNTRIES), dtype=np.float64, count=len(GLOBE_COUNTRIES))
+_CENTROID_LON = np.fromiter((c[4] for c in GLOBE_COUNTRIES), dtype=np.float64, count=len(GLOBE_COUNTRIES))
+_ISO2_INDEX = {c[0]: i for i, c in reversed(list(enumerate(GLOBE_COUNTRIES)))}
+
+
+def get_centroid(iso2):
+    """Return the (lat, lon) globe centroid for an ISO-2 code, or None if unknown."""
+    i = _ISO2_INDEX.get(iso2)
+    if i is None:
+        return None
+    return float(_CENTROID_LAT[i]), float(_CENTROID_LON[i])
+
 # ────────────────────────────────────────────
 # Income groups (ISO-3 keys)
 # ────────────────────────────────────────────
@@ -423,6 +460,22 @@ ECONOMIC_GROUPS = {
     },
 }
 
+# ECONOMIC_GROUPS is constant — flatten it into insert payloads once at import
+_GROUP_ROWS = tuple(
+    {
+        "code": code,
+        "name": info["name"],
+        "category": info["category"],
+        "member_count": len(info["members"]),
+    }
+    for code, info in ECONOMIC_GROUPS.items()
+)
+_MEMBERSHIP_ROWS = tuple(
+    {"country_iso": iso3, "group_code": code}
+    for code, info in ECONOMIC_GROUPS.items()
+    for iso3 in info["members"]
+)
+
 # ────────────────────────────────────────────
 # National data source registry (ported from national-apis-config.js)
 # ────────────────────────────────────────────
@@ -466,18 +519,35 @@ DATA_SOURCES = [
     ("FJI", "FJ", "SPC Pacific Data Hub / Fiji Bureau", "https://stats-nsi-stable.pacificdata.org/rest/data/SPC,DF_IMTS", False, "excellent", "complete", "annual", "sdmx", "limited", "https://stats.pacificdata.org/"),
 ]
 
+# Pending trade-flow rows are written and committed once this many accumulate
+TRADE_FLOW_FLUSH_ROWS = 10_000
+
+# pg advisory-lock key that serialises concurrent runs of this seed
+SEED_LOCK_KEY = 0x6EF05EED
+
 # ────────────────────────────────────────────
 # Trade data JSON files to import
 # ────────────────────────────────────────────
 TRADE_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "globe-repo")
 
 
+def _load_trade_json(filepath):
+    """Parse a trade-data JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        with open(filepath, "rb") as f:
+            return orjson.loads(f.read())
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
 def enrich_countries(db):
     """Add capitals, flags, iso_code_2, income_group from globe data.
     Creates missing countries so downstream seeds (trade flows) have valid FK targets."""
     updated = 0
     created = 0
-    for iso2, flag, capital, lat, lon, region in GLOBE_COUNTRIES:
+    for i, (iso2, flag, capital, _, _, region) in enumerate(GLOBE_COUNTRIES):
+        lat = float(_CENTROID_LAT[i])
+        lon = float(_CENTROID_LON[i])
         iso3 = ISO2_TO_ISO3.get(iso2)
         if not iso3:
             continue
@@ -499,14 +569,14 @@ def enrich_countries(db):
             db.add(country)
             created += 1
         # Enrich with globe data
-        if not country.flag_emoji:
+        if country.flag_emoji in (None, ""):
             country.flag_emoji = flag
-        if not country.capital:
+        if country.capital in (None, ""):
             country.capital = capital
-        if not country.iso_code_2:
+        if country.iso_code_2 in (None, ""):
             country.iso_code_2 = iso2
-        # Fill centroid if missing
-        if not country.centroid_lat:
+        # Fill centroid if missing (0.0 is a valid equatorial latitude)
+        if country.centroid_lat is None:
             country.centroid_lat = lat
             country.centroid_lon = lon
         updated += 1
@@ -516,11 +586,11 @@ def enrich_countries(db):
         label = group_name.replace("_", " ").title()
         for iso3 in isos:
             c = db.query(Country).filter(Country.iso_code == iso3).first()
-            if c and not c.income_group:
+            if c is not None and c.income_group in (None, ""):
                 c.income_group = label
 
     db.commit()
-    print(f"  \u2705 Enriched {updated} countries, created {created} new ones")
+    logger.info("  ✅ Enriched %d countries, created %d new ones", updated, created)
 
 
 def seed_economic_groups(db):
@@ -530,28 +600,15 @@ def seed_economic_groups(db):
     db.query(EconomicGroup).delete()
     db.commit()
 
-    for code, info in ECONOMIC_GROUPS.items():
-        grp = EconomicGroup(
-            code=code,
-            name=info["name"],
-            category=info["category"],
-            member_count=len(info["members"]),
-        )
-        db.add(grp)
-    db.commit()
+    bulk_insert(db, EconomicGroup, _GROUP_ROWS)
 
-    memberships = 0
-    for code, info in ECONOMIC_GROUPS.items():
-        for iso3 in info["members"]:
-            # Verify country exists
-            c = db.query(Country).filter(Country.iso_code == iso3).first()
-            if not c:
-                continue
-            m = CountryGroupMembership(country_iso=iso3, group_code=code)
-            db.add(m)
-            memberships += 1
+    # Only link members that exist in the countries table
+    known_isos = {iso for (iso,) in db.query(Country.iso_code).all()}
+    rows = [r for r in _MEMBERSHIP_ROWS if r["country_iso"] in known_isos]
+    bulk_insert(db, CountryGroupMembership, rows)
+    memberships = len(rows)
     db.commit()
-    print(f"  ✅ Seeded {len(ECONOMIC_GROUPS)} economic groups, {memberships} memberships")
+    logger.info("  ✅ Seeded %d economic groups, %d memberships", len(ECONOMIC_GROUPS), memberships)
 
 
 def seed_data_sources(db):
@@ -559,36 +616,146 @@ def seed_data_sources(db):
     db.query(NationalDataSource).delete()
     db.commit()
 
-    count = 0
+    known_isos = {iso for (iso,) in db.query(Country.iso_code).all()}
+    rows = []
     for row in DATA_SOURCES:
         iso3, iso2, institution, url, auth, quality, coverage, freq, fmt, tier, docs = row
         # Verify country exists
-        c = db.query(Country).filter(Country.iso_code == iso3).first()
-        if not c:
-            print(f"  ⚠️ Skipping data source for {iso3} — country not in DB")
+        if iso3 not in known_isos:
+            logger.warning("  ⚠️ Skipping data source for %s — country not in DB", iso3)
             continue
-        ds = NationalDataSource(
-            country_iso=iso3,
-            iso2=iso2,
-            institution=institution,
-            api_url=url,
-            docs_url=docs,
-            auth_required=auth,
-            quality=quality,
-            coverage=coverage,
-            update_frequency=freq,
-            data_format=fmt,
-            tier=tier,
-            is_active=True,
+        rows.append({
+            "country_iso": iso3,
+            "iso2": iso2,
+            "institution": institution,
+            "api_url": url,
+            "docs_url": docs,
+            "auth_required": auth,
+            "quality": quality,
+            "coverage": coverage,
+            "update_frequency": freq,
+            "data_format": fmt,
+            "tier": tier,
+            "is_active": True,
+        })
+    bulk_insert(db, NationalDataSource, rows)
+    count = len(rows)
+    db.commit()
+    logger.info("  ✅ Seeded %d national data sources", count)
+
+
+@contextmanager
+def _secondary_indexes_dropped(db, table):
+    """Drop non-unique indexes on `table` for a bulk load and rebuild them after.
+
+    One CREATE INDEX pass over the loaded rows is cheaper than maintaining
+    every B-tree row by row. Primary-key and unique indexes stay in place.
+    """
+    indexes = db.execute(text("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        JOIN pg_class c ON c.relname = i.indexname
+        JOIN pg_index x ON x.indexrelid = c.oid
+        WHERE i.schemaname = current_schema()
+          AND i.tablename = :table
+          AND NOT x.indisunique
+          AND NOT x.indisprimary
+    """), {"table": table}).all()
+    for name, _ in indexes:
+        db.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+    db.commit()
+    try:
+        yield
+    finally:
+        db.rollback()
+        for _, ddl in indexes:
+            db.execute(text(ddl))
+        db.commit()
+
+
+# Partner records share one schema; fetch all fields in a single C-level call
+_PARTNER_FIELDS = itemgetter("partnerISO", "exports", "imports")
+
+# Trade files larger than this are streamed with ijson (when installed)
+# instead of being decoded into one in-memory object tree
+TRADE_JSON_STREAM_BYTES = 50 * 1024 * 1024
+
+_TRADE_HEADER_KEYS = ("reporterISO", "year", "source")
+
+
+def _partner_tuple(p, iso2_to_iso3):
+    """(partner ISO-3 or None, exports, imports) for one partner record."""
+    try:
+        partner_iso2, exports_val, imports_val = _PARTNER_FIELDS(p)
+    except KeyError:
+        partner_iso2 = p.get("partnerISO", "")
+        exports_val = p.get("exports")
+        imports_val = p.get("imports")
+    # null/missing values count as zero so the importer's `> 0` tests hold
+    return iso2_to_iso3.get(partner_iso2), exports_val or 0, imports_val or 0
+
+
+def _stream_trade_json(filepath, iso2_to_iso3):
+    """Stream a large trade file: read the header scalars, then the partners."""
+    header = {}
+    with open(filepath, "rb") as f:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix in _TRADE_HEADER_KEYS and event in ("string", "number"):
+                header[prefix] = value
+                if len(header) == len(_TRADE_HEADER_KEYS):
+                    break
+    with open(filepath, "rb") as f:
+        partners = [
+            _partner_tuple(p, iso2_to_iso3)
+            for p in ijson.items(f, "countries.item", use_float=True)
+        ]
+    return header, partners
+
+
+def _init_parse_worker():
+    """Drop pooled DB connections inherited from the parent on fork."""
+    engine.dispose(close=False)
+
+
+def _parse_trade_file(filepath, iso2_to_iso3):
+    """Worker-side half of the import.
+
+    Runs in a worker process, so it must not touch the database. Returns
+    (header, partners) where partners is a list of compact
+    (partner ISO-3 or None, exports, imports) tuples, or None if the file is
+    missing. Partners absent from `iso2_to_iso3` map to None.
+    """
+    if not os.path.exists(filepath):
+        return None
+    if ijson is not None and os.path.getsize(filepath) > TRADE_JSON_STREAM_BYTES:
+        return _stream_trade_json(filepath, iso2_to_iso3)
+    data = _load_trade_json(filepath)
+    # Only the header fields go back to the parent, not the raw partner list
+    header = {k: data[k] for k in _TRADE_HEADER_KEYS if k in data}
+    return header, [_partner_tuple(p, iso2_to_iso3) for p in data.get("countries", [])]
+
+
+def _flush_trade_flows(db, pending):
+    """Write and commit queued flows, returning how many were new."""
+    inserted = 0
+    if pending:
+        inserted = copy_rows(
+            db, TradeFlow, TRADE_FLOW_COPY_COLUMNS, pending, skip_conflicts=True,
         )
-        db.add(ds)
-        count += 1
     db.commit()
-    print(f"  ✅ Seeded {count} national data sources")
+    pending.clear()
+    return inserted
 
 
 def import_trade_data_jsons(db):
-    """Import the 5 pre-built trade-data JSON files from globe project."""
+    """Import the 5 pre-built trade-data JSON files from globe project.
+
+    Files are decoded and ISO-mapped in worker processes while the main
+    process queues their flows; only the main process touches the session.
+    Rows are written in batches of TRADE_FLOW_FLUSH_ROWS, and flows already
+    in trade_flows are skipped by its natural-key index rather than by
+    per-row existence checks.
+    """
     json_files = [
         "belgium-trade-data.json",
         "brazil-trade-data.json",
@@ -596,126 +763,151 @@ def import_trade_data_jsons(db):
         "germany-trade-data.json",
         "luxembourg-trade-data.json",
     ]
+    filepaths = [os.path.join(TRADE_DATA_DIR, filename) for filename in json_files]
 
     # Get all known country ISO codes for validation
     known_isos = {c.iso_code for c in db.query(Country.iso_code).all()}
+    # ISO-2 → ISO-3 restricted to countries in the DB: one lookup both maps
+    # and validates a code
+    known_iso2_to_iso3 = {
+        iso2: iso3 for iso2, iso3 in ISO2_TO_ISO3.items() if iso3 in known_isos
+    }
 
     total_flows = 0
     total_skipped = 0
-
-    for filename in json_files:
-        filepath = os.path.join(TRADE_DATA_DIR, filename)
-        if not os.path.exists(filepath):
-            print(f"  ⚠️ {filename} not found at {filepath}")
-            continue
-
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        reporter_iso2 = data.get("reporterISO", "")
-        reporter_iso3 = ISO2_TO_ISO3.get(reporter_iso2)
-        year = data.get("year", 2023)
-        source = data.get("source", "Unknown")
-
-        if not reporter_iso3 or reporter_iso3 not in known_isos:
-            print(f"  ⚠️ Reporter {reporter_iso2} → {reporter_iso3} not in DB, skipping {filename}")
-            continue
-
-        partners = data.get("countries", [])
-        file_flows = 0
-        file_skipped = 0
-
-        for p in partners:
-            partner_iso2 = p.get("partnerISO", "")
-            partner_iso3 = ISO2_TO_ISO3.get(partner_iso2)
-
-            if not partner_iso3 or partner_iso3 not in known_isos:
-                file_skipped += 1
+    pending = []  # row dicts not yet written, carried across files
+
+    # Rebuilding indexes only pays off when this load is the bulk of the
+    # table; on top of a Comtrade-filled table incremental upkeep is cheaper.
+    if db.query(TradeFlow.id).first() is None:
+        index_guard = _secondary_indexes_dropped(db, TradeFlow.__tablename__)
+    else:
+        index_guard = nullcontext()
+
+    workers = max(1, min(len(filepaths), (os.cpu_count() or 2) - 1))
+    with index_guard, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_parse_worker,
+    ) as pool:
+        # map() yields in submission order, so inserts stay deterministic
+        parsed = pool.map(_parse_trade_file, filepaths, repeat(known_iso2_to_iso3))
+        for filename, filepath, data in zip(json_files, filepaths, parsed):
+            if data is None:
+                logger.warning("  ⚠️ %s not found at %s", filename, filepath)
                 continue
+            header, partners = data
 
-            exports_val = p.get("exports", 0)
-            imports_val = p.get("imports", 0)
-
-            # Skip zero-value flows
-            if exports_val <= 0 and imports_val <= 0:
-                file_skipped += 1
-                continue
+            reporter_iso2 = header.get("reporterISO", "")
+            reporter_iso3 = known_iso2_to_iso3.get(reporter_iso2)
+            year = header.get("year", 2023)
+            source = header.get("source", "Unknown")
 
-            # Convert from millions USD to USD
-            exports_usd = exports_val * 1_000_000
-            imports_usd = imports_val * 1_000_000
-
-            # Check for existing flow to avoid duplicates
-            existing = db.query(TradeFlow).filter(
-                TradeFlow.exporter_iso == reporter_iso3,
-                TradeFlow.importer_iso == partner_iso3,
-                TradeFlow.year == year,
-                TradeFlow.flow_type == "export",
-                TradeFlow.commodity_code == None,
-            ).first()
-
-            if existing:
-                file_skipped += 1
+            if reporter_iso3 is None:
+                logger.warning("  ⚠️ Reporter %s → %s not in DB, skipping %s",
+                               reporter_iso2, ISO2_TO_ISO3.get(reporter_iso2), filename)
                 continue
 
-            # Export flow: reporter → partner
-            if exports_usd > 0:
-                db.add(TradeFlow(
-                    exporter_iso=reporter_iso3,
-                    importer_iso=partner_iso3,
-                    year=year,
-                    trade_value_usd=exports_usd,
-                    flow_type="export",
-                ))
-                file_flows += 1
-
-            # Import flow: partner → reporter
-            if imports_usd > 0:
-                db.add(TradeFlow(
-                    exporter_iso=partner_iso3,
-                    importer_iso=reporter_iso3,
-                    year=year,
-                    trade_value_usd=imports_usd,
-                    flow_type="export",
-                ))
-                file_flows += 1
-
-        db.commit()
-        total_flows += file_flows
-        total_skipped += file_skipped
-        print(f"  📊 {filename}: {file_flows} flows imported, {file_skipped} skipped "
-              f"({reporter_iso2}→{reporter_iso3}, year={year}, source: {source})")
-
-    print(f"  ✅ Total: {total_flows} trade flows imported from {len(json_files)} files "
-          f"({total_skipped} skipped)")
+            file_flows = 0
+            file_skipped = 0
+
+            for partner_iso3, exports_val, imports_val in partners:
+                has_exports = exports_val > 0
+                has_imports = imports_val > 0
+
+                # Unknown partner or zero-value flows: nothing to queue
+                if partner_iso3 is None or not (has_exports or has_imports):
+                    file_skipped += 1
+                    continue
+
+                # Export flow: reporter → partner (millions USD → USD)
+                if has_exports:
+                    file_flows += 1
+                    pending.append({
+                        "exporter_iso": reporter_iso3,
+                        "importer_iso": partner_iso3,
+                        "year": year,
+                        "trade_value_usd": exports_val * 1_000_000,
+                        "flow_type": "export",
+                    })
+
+                # Import flow: partner → reporter
+                if has_imports:
+                    file_flows += 1
+                    pending.append({
+                        "exporter_iso": partner_iso3,
+                        "importer_iso": reporter_iso3,
+                        "year": year,
+                        "trade_value_usd": imports_val * 1_000_000,
+                        "flow_type": "export",
+                    })
+
+            if len(pending) >= TRADE_FLOW_FLUSH_ROWS:
+                total_flows += _flush_trade_flows(db, pending)
+            total_skipped += file_skipped
+            logger.info("  📊 %s: %d flows queued, %d skipped (%s→%s, year=%s, source: %s)",
+                        filename, file_flows, file_skipped, reporter_iso2, reporter_iso3, year, source)
+
+        total_flows += _flush_trade_flows(db, pending)
+
+    logger.info("  ✅ Total: %d trade flows imported from %d files (%d skipped)",
+                total_flows, len(json_files), total_skipped)
 
 
 def seed_globe_merge():
     """Main entry point: merge globe project data into GEFO."""
-    db = SessionLocal()
+    # Hold a session-level advisory lock on a dedicated connection so that a
+    # second concurrent run can't interleave its DELETE + re-insert with ours.
+    # (The seed commits per step, so a transaction-scoped lock would not last.)
+    with engine.connect() as lock_conn:
+        acquired = lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:k)"), {"k": SEED_LOCK_KEY}
+        ).scalar()
+        lock_conn.commit()
+        if not acquired:
+            logger.warning("⚠️ Another globe merge is already running — skipping")
+            return
+        try:
+            _run_globe_merge()
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": SEED_LOCK_KEY})
+            lock_conn.commit()
+
+
+def _run_globe_merge():
+    db = SeedSessionLocal()
     try:
-        print("=" * 60)
-        print("Phase 11: Merging globe project into GEFO")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info("Phase 11: Merging globe project into GEFO")
+        logger.info("=" * 60)
 
-        print("\n1. Enriching countries with capitals, flags, ISO-2...")
+        logger.info("1. Enriching countries with capitals, flags, ISO-2...")
         enrich_countries(db)
 
-        print("\n2. Seeding economic groups (G7, G20, BRICS, EU, etc.)...")
+        logger.info("2. Seeding economic groups (G7, G20, BRICS, EU, etc.)...")
         seed_economic_groups(db)
 
-        print("\n3. Seeding national data source registry...")
+        logger.info("3. Seeding national data source registry...")
         seed_data_sources(db)
 
-        print("\n4. Importing trade data from globe JSON files...")
+        logger.info("4. Importing trade data from globe JSON files...")
         import_trade_data_jsons(db)
 
-        print("\n" + "=" * 60)
-        print("✅ Globe merge complete!")
-        print("=" * 60)
+        logger.info("5. Refreshing country top-partner view...")
+        with engine.begin() as conn:
+            refresh_partner_view(conn)
+
+        logger.info("=" * 60)
+        logger.info("✅ Globe merge complete!")
+        logger.info("=" * 60)
     finally:
         db.close()
 
-
 if __name__ == "__main__":
-    seed_globe_merge()
+    # Buffer records and write them in blocks; warnings flush immediately
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    buffered = MemoryHandler(capacity=100, flushLevel=logging.WARNING, target=stream)
+    logging.basicConfig(level=logging.INFO, handlers=[buffered])
+    try:
+        seed_globe_merge()
+    finally:
+        buffered.close()
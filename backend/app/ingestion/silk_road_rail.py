@@ -16,7 +16,7 @@ Methodology:
 
 import logging
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from app.core.database import SessionLocal, engine
+from app.core.database import SeedSessionLocal, engine
 from app.models.rail_freight import RailFreight
 
 log = logging.getLogger(__name__)
@@ -282,7 +282,7 @@ def seed():
     log.info("Generated %d estimated Silk Road rail freight records", len(records))
 
     # Upsert in batches
-    db = SessionLocal()
+    db = SeedSessionLocal()
     try:
         batch_size = 200
         for i in range(0, len(records), batch_size):
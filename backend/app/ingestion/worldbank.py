@@ -3,18 +3,37 @@ World Bank API Data Ingestion Script
 Fetches 63 macroeconomic/geoeconomic indicators for all countries.
 Free API, no key required.
 """
+import asyncio
 import httpx
+import json
 import logging
+import os
 import time
 import argparse
-from typing import List, Dict
+from datetime import date
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Float, String, cast, column, func, update, values
 from sqlalchemy.orm import Session
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.core.database import SessionLocal
+from app.core.database import SeedSessionLocal
 from app.models.country import Country
 from app.models.country_indicator import CountryIndicator
 
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is a drop-in fallback
+    orjson = None
+
+try:
+    import pyarrow  # noqa: F401 — Parquet engine for the snapshot cache
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
 logger = logging.getLogger(__name__)
 
 WORLD_BANK_URL = "https://api.worldbank.org/v2"
@@ -118,106 +137,265 @@ INDICATORS = {
 }
 
 
-def fetch_indicator(indicator_code: str, year_range: str = "2020:2023", per_page: int = 20000) -> List[dict]:
+# Cap on in-flight requests against api.worldbank.org
+MAX_CONCURRENT_REQUESTS = 8
+
+# On-disk cache of raw indicator payloads. Ranges ending before the current
+# year are final and never expire; ranges touching it are refreshed daily.
+# Set WB_CACHE_DISABLE=1 to force a fresh pull.
+CACHE_DIR = Path(os.environ.get("WB_CACHE_DIR", ".cache/worldbank"))
+CACHE_DISABLED = os.environ.get("WB_CACHE_DISABLE", "") not in ("", "0")
+CURRENT_YEAR_CACHE_TTL = 24 * 3600
+
+
+def _json_loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _json_dumps(obj) -> bytes:
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
+
+
+def _cache_path(indicator_code: str, year_range: str) -> Path:
+    return CACHE_DIR / f"{indicator_code}_{year_range.replace(':', '-')}.json"
+
+
+def _cache_fresh(path: Path, end_year: int) -> bool:
+    """Raises OSError when the file is missing."""
+    age = time.time() - path.stat().st_mtime
+    return end_year < date.today().year or age <= CURRENT_YEAR_CACHE_TTL
+
+
+def _read_cache(indicator_code: str, year_range: str) -> Optional[List[dict]]:
+    if CACHE_DISABLED:
+        return None
+    path = _cache_path(indicator_code, year_range)
+    try:
+        if not _cache_fresh(path, int(year_range.rsplit(":", 1)[-1])):
+            return None
+        with open(path, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(indicator_code: str, year_range: str, records: List[dict]) -> None:
+    if CACHE_DISABLED:
+        return
+    path = _cache_path(indicator_code, year_range)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps(records))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not cache {indicator_code}: {e}")
+
+
+# The assembled per-country snapshot is also kept as Parquet, so a re-run
+# skips parsing every raw payload. Needs a Parquet engine (pyarrow).
+def _snapshot_path(year: int) -> Path:
+    return CACHE_DIR / f"snapshot_{year}.parquet"
+
+
+def _load_snapshot(year: int) -> Optional[Dict[str, dict]]:
+    if CACHE_DISABLED or not HAS_PARQUET:
+        return None
+    path = _snapshot_path(year)
+    try:
+        if not _cache_fresh(path, year):
+            return None
+        df = pd.read_parquet(path)
+    except (OSError, ValueError):
+        return None
+    return _wide_to_dict(df)
+
+
+def _save_snapshot(year: int, country_data: Dict[str, dict]) -> None:
+    if CACHE_DISABLED or not HAS_PARQUET or not country_data:
+        return
+    path = _snapshot_path(year)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        pd.DataFrame.from_dict(country_data, orient="index").to_parquet(tmp, compression="zstd")
+        os.replace(tmp, path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not cache {year} snapshot: {e}")
+
+
+async def fetch_indicator(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    indicator_code: str,
+    year_range: str = "2020:2023",
+    per_page: int = 20000,
+) -> Tuple[List[dict], bool]:
     """Fetch a single indicator for all countries from World Bank API.
-    Handles pagination automatically.
+    The first page reports the page count; any remaining pages are then
+    requested concurrently. Returns (records, complete). Only complete
+    payloads are cached on disk: a missing or failed page returns what
+    arrived, uncached, with complete=False.
     """
+    cached = _read_cache(indicator_code, year_range)
+    if cached is not None:
+        return cached, True
+
     url = f"{WORLD_BANK_URL}/country/all/indicator/{indicator_code}"
     params = {"date": year_range, "format": "json", "per_page": per_page}
+
+    async def get_page(page: int):
+        async with semaphore:
+            response = await client.get(url, params={**params, "page": page})
+        response.raise_for_status()
+        data = _json_loads(response.content)
+        if isinstance(data, list) and len(data) > 1:
+            return data
+        return None
+
     all_records = []
 
     try:
-        with httpx.Client(timeout=60.0) as client:
-            page = 1
-            while True:
-                params["page"] = page
-                response = client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                if isinstance(data, list) and len(data) > 1:
-                    records = data[1]
-                    all_records.extend(records)
-                    total_pages = data[0].get("pages", 1)
-                    if page >= total_pages:
-                        break
-                    page += 1
-                    time.sleep(0.3)
+        first = await get_page(1)
+        if first is None:
+            logger.error(f"Error fetching {indicator_code}: empty response for page 1")
+            return all_records, False
+        all_records.extend(first[1] or [])
+
+        total_pages = first[0].get("pages", 1)
+        missing = []
+        if total_pages > 1:
+            rest = await asyncio.gather(*(get_page(p) for p in range(2, total_pages + 1)))
+            for page, data in enumerate(rest, 2):
+                if data is None:
+                    missing.append(page)
                 else:
-                    break
+                    all_records.extend(data[1] or [])
+        if missing:
+            logger.error(
+                f"Error fetching {indicator_code}: empty response for page(s) "
+                f"{missing} of {total_pages}; not caching"
+            )
+            return all_records, False
     except Exception as e:
         logger.error(f"Error fetching {indicator_code}: {e}")
+        return all_records, False
 
-    return all_records
+    _write_cache(indicator_code, year_range, all_records)
 
+    return all_records, True
 
-def build_country_data(year: int = 2023) -> Dict[str, dict]:
-    """
-    Fetch all indicators and assemble into country-level dict.
-    Uses a 4-year window to maximize coverage, keeping most recent value.
-    """
-    country_data: Dict[str, dict] = {}
-    year_range = f"{year - 3}:{year}"
-    total = len(INDICATORS)
 
-    for idx, (field_name, (indicator_code, description)) in enumerate(INDICATORS.items(), 1):
-        logger.info(f"[{idx}/{total}] Fetching {field_name} ({indicator_code})...")
-        records = fetch_indicator(indicator_code, year_range)
+def new_client() -> httpx.AsyncClient:
+    """Client shared by every request of an ingest run, so the connection
+    pool keeps TCP/TLS sessions to the API alive between indicators."""
+    limits = httpx.Limits(max_connections=16, max_keepalive_connections=MAX_CONCURRENT_REQUESTS)
+    return httpx.AsyncClient(timeout=60.0, limits=limits)
 
-        # Keep most recent value per country
-        best: Dict[str, tuple] = {}
-        for record in records:
-            iso = record.get("countryiso3code", "")
-            value = record.get("value")
-            rec_year = int(record.get("date", "0"))
 
-            if not iso or len(iso) != 3 or value is None:
-                continue
+async def fetch_indicators(indicator_codes: List[str], year_range: str) -> List[Tuple[List[dict], bool]]:
+    """Fetch several indicators concurrently over one shared client.
+    (records, complete) pairs are returned in the same order as
+    ``indicator_codes``.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with new_client() as client:
+        return await asyncio.gather(
+            *(fetch_indicator(client, semaphore, code, year_range) for code in indicator_codes)
+        )
 
-            if iso not in best or rec_year > best[iso][0]:
-                best[iso] = (rec_year, value)
 
-        for iso, (_, value) in best.items():
-            if iso not in country_data:
-                country_data[iso] = {}
-            country_data[iso][field_name] = value
+def _latest_values(records: List[dict]) -> pd.DataFrame:
+    """Most recent non-null value per 3-letter ISO code, as (iso, value) rows."""
+    df = pd.DataFrame.from_records(records, columns=["countryiso3code", "date", "value"])
+    df = df[df["value"].notna() & (df["countryiso3code"].str.len() == 3)]
+    df = df.assign(date=pd.to_numeric(df["date"], errors="coerce"))
+    df = df.sort_values("date", kind="stable", na_position="first").drop_duplicates("countryiso3code", keep="last")
+    return df.rename(columns={"countryiso3code": "iso"})[["iso", "value"]]
 
-        logger.info(f"  -> {len(best)} countries with data")
 
-        # Small delay every 10 requests to be polite
-        if idx % 10 == 0:
-            time.sleep(0.5)
+def _wide_to_dict(wide: pd.DataFrame) -> Dict[str, dict]:
+    """ISO-indexed indicator frame -> {iso: {field: value}}, dropping empty cells."""
+    return {
+        iso: {field: value for field, value in row.items() if pd.notna(value)}
+        for iso, row in wide.to_dict(orient="index").items()
+    }
 
-    return country_data
 
+async def build_country_data(year: int = 2023) -> Tuple[Dict[str, dict], bool]:
+    """
+    Fetch all indicators and assemble into country-level dict.
+    Uses a 4-year window to maximize coverage, keeping most recent value.
+    The flag is False when any indicator was not fetched completely.
+    """
+    year_range = f"{year - 3}:{year}"
+    total = len(INDICATORS)
 
-def ingest_world_bank_data(year: int = 2023):
-    """Ingest World Bank macroeconomic data into countries table."""
-    db = SessionLocal()
+    logger.info(f"Fetching {total} indicators for {year_range}...")
+    results = await fetch_indicators([code for code, _ in INDICATORS.values()], year_range)
 
-    try:
-        country_data = build_country_data(year)
-        count = 0
+    frames = []
+    incomplete = []
+    for idx, ((field_name, (indicator_code, description)), (records, complete)) in enumerate(
+        zip(INDICATORS.items(), results), 1
+    ):
+        if not complete:
+            incomplete.append(field_name)
+        latest = _latest_values(records)
+        logger.info(f"[{idx}/{total}] {field_name} ({indicator_code}) -> {len(latest)} countries with data")
+        frames.append(latest.assign(field=field_name))
 
-        for iso_code, data in country_data.items():
-            if len(iso_code) != 3:
-                continue
+    if incomplete:
+        logger.warning(f"{len(incomplete)} indicator(s) incomplete for {year_range}: {', '.join(incomplete)}")
 
-            country = db.query(Country).filter(Country.iso_code == iso_code).first()
-            if not country:
-                continue
+    long = pd.concat(frames, ignore_index=True)
+    if long.empty:
+        return {}, not incomplete
+    return _wide_to_dict(long.pivot(index="iso", columns="field", values="value")), not incomplete
 
-            # Compute derived trade_balance
-            exports = data.get("export_value", 0) or 0
-            imports = data.get("import_value", 0) or 0
-            if exports or imports:
-                data["trade_balance"] = exports - imports
 
-            # Set all indicator fields
-            for field_name, value in data.items():
-                if hasattr(country, field_name):
-                    setattr(country, field_name, value)
+def ingest_world_bank_data(year: int = 2023):
+    """Ingest World Bank macroeconomic data into countries table.
+
+    Every country is written by one UPDATE ... FROM (VALUES ...) statement
+    joined on iso_code. Codes with no row in ``countries`` (regional and
+    income-group aggregates) simply match nothing. Indicators a country
+    has no value for are bound as NULL and COALESCEd, leaving the stored
+    value untouched.
+    """
+    db = SeedSessionLocal()
+
+    try:
+        country_data = _load_snapshot(year)
+        if country_data is None:
+            country_data, complete = asyncio.run(build_country_data(year))
+            # A partial snapshot for a past year would never be refetched
+            if complete:
+                _save_snapshot(year, country_data)
+        # trade_balance is a generated column; PostgreSQL derives it
+        fields = list(INDICATORS)
+
+        rows = [
+            (iso_code, *(data.get(f) for f in fields))
+            for iso_code, data in country_data.items()
+            if len(iso_code) == 3
+        ]
 
-            count += 1
+        count = 0
+        if rows:
+            table = Country.__table__
+            wb = values(
+                column("iso_code", String),
+                *(column(f, Float) for f in fields),
+                name="wb",
+            ).data(rows)
+            stmt = (
+                update(table)
+                .where(table.c.iso_code == wb.c.iso_code)
+                .values({f: func.coalesce(cast(wb.c[f], Float), table.c[f]) for f in fields})
+            )
+            count = db.execute(stmt).rowcount
 
         db.commit()
         logger.info(f"World Bank ingestion complete. Updated {count} countries with {len(INDICATORS)} indicators.")
@@ -234,7 +412,7 @@ def ingest_world_bank_historical(start_year: int = 1960, end_year: int = 2024):
     from app.models.country_indicator import CountryIndicator
     CountryIndicator.__table__.create(engine, checkfirst=True)
 
-    db = SessionLocal()
+    db = SeedSessionLocal()
     year_range = f"{start_year}:{end_year}"
 
     try:
@@ -242,62 +420,86 @@ def ingest_world_bank_historical(start_year: int = 1960, end_year: int = 2024):
         valid_isos = {c.iso_code for c in db.query(Country.iso_code).all()}
         logger.info(f"Fetching {len(INDICATORS)} indicators for years {start_year}-{end_year} ({len(valid_isos)} countries)")
 
-        total_rows = 0
-        total_indicators = len(INDICATORS)
+        total_rows = asyncio.run(_ingest_historical(db, valid_isos, year_range))
+        logger.info(f"Historical ingestion complete. {total_rows:,} total data points across {len(INDICATORS)} indicators.")
+
+    finally:
+        db.close()
+
+    return total_rows
+
+
+async def _ingest_historical(db: Session, valid_isos: set, year_range: str) -> int:
+    """Fetch and store each indicator in turn over one pooled client.
 
-        for idx, (field_name, (indicator_code, description)) in enumerate(INDICATORS.items(), 1):
+    The next indicator is fetched while the current one is written, with
+    the blocking DB work moved to a worker thread. At most two
+    multi-decade payloads are held in memory at a time.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    total_rows = 0
+    items = list(INDICATORS.items())
+    total_indicators = len(items)
+
+    upsert = pg_insert(CountryIndicator)
+    upsert = upsert.on_conflict_do_update(
+        constraint="uq_country_year_indicator",
+        set_={"value": upsert.excluded.value},
+    )
+
+    async with new_client() as client:
+        def start_fetch(i: int) -> asyncio.Task:
+            return asyncio.create_task(fetch_indicator(client, semaphore, items[i][1][0], year_range))
+
+        pending = start_fetch(0)
+        for idx, (field_name, (indicator_code, description)) in enumerate(items, 1):
             logger.info(f"[{idx}/{total_indicators}] Fetching {field_name} ({indicator_code}) {year_range}...")
-            records = fetch_indicator(indicator_code, year_range)
-
-            batch = []
-            for record in records:
-                iso = record.get("countryiso3code", "")
-                value = record.get("value")
-                rec_year = record.get("date", "")
-
-                if not iso or len(iso) != 3 or value is None or not rec_year:
-                    continue
-                if iso not in valid_isos:
-                    continue
-
-                try:
-                    year_int = int(rec_year)
-                except ValueError:
-                    continue
-
-                batch.append({
-                    "iso_code": iso,
-                    "year": year_int,
-                    "indicator": field_name,
-                    "value": float(value),
-                })
-
-            if batch:
-                # Upsert in chunks
-                for i in range(0, len(batch), 1000):
-                    chunk = batch[i:i+1000]
-                    stmt = pg_insert(CountryIndicator).values(chunk)
-                    stmt = stmt.on_conflict_do_update(
-                        constraint="uq_country_year_indicator",
-                        set_={"value": stmt.excluded.value},
-                    )
-                    db.execute(stmt)
-                db.commit()
-                total_rows += len(batch)
-                logger.info(f"  -> {len(batch)} data points stored")
-            else:
-                logger.info(f"  -> 0 data points")
+            records, _ = await pending
+            if idx < total_indicators:
+                pending = start_fetch(idx)
+
+            stored = await asyncio.to_thread(_store_indicator, db, upsert, field_name, records, valid_isos)
+            total_rows += stored
+            logger.info(f"  -> {stored} data points stored")
 
             # Be polite
             if idx % 5 == 0:
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
 
-        logger.info(f"Historical ingestion complete. {total_rows:,} total data points across {total_indicators} indicators.")
+    return total_rows
 
-    finally:
-        db.close()
 
-    return total_rows
+def _store_indicator(db: Session, upsert, field_name: str, records: List[dict], valid_isos: set) -> int:
+    """Upsert one indicator's records into country_indicators and commit."""
+    batch = []
+    for record in records:
+        iso = record.get("countryiso3code", "")
+        value = record.get("value")
+        rec_year = record.get("date", "")
+
+        if not iso or len(iso) != 3 or value is None or not rec_year:
+            continue
+        if iso not in valid_isos:
+            continue
+
+        try:
+            year_int = int(rec_year)
+        except ValueError:
+            continue
+
+        batch.append({
+            "iso_code": iso,
+            "year": year_int,
+            "indicator": field_name,
+            "value": float(value),
+        })
+
+    if batch:
+        # executemany: insertmanyvalues pages the rows into multi-row
+        # INSERT ... VALUES statements from a single compiled upsert
+        db.execute(upsert, batch)
+        db.commit()
+    return len(batch)
 
 
 if __name__ == "__main__":
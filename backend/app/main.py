@@ -1,11 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import importlib
 import logging
 
 from app.core.config import settings
 from app.core.sentry_init import init_sentry
-from app.core.scheduler import start_scheduler, stop_scheduler, get_scheduler_status
+from app.core.scheduler import start_scheduler, stop_scheduler, get_scheduler_status, job_flush_api_key_usage
 from app.core.rate_limit import setup_rate_limiting
 
 # Initialise Sentry BEFORE FastAPI() so the SDK can wrap the ASGI app
@@ -16,19 +17,7 @@ init_sentry(
     traces_sample_rate=settings.sentry_traces_sample_rate,
     profiles_sample_rate=settings.sentry_profiles_sample_rate,
 )
-from app.api import countries, trade_flows, ports, airports, shipping_density, indicators, intelligence
-from app.api import auth, keys, billing, export, alerts, admin, geopolitical
-from app.api import analytics as analytics_router
-from app.api import import_data as import_router
-from app.api import commodities as commodities_router
-from app.api import websocket as ws_router
-from app.api import data_sources as data_sources_router
-from app.api import economic_groups as economic_groups_router
-from app.api import vessels as vessels_router
-from app.api import tiles as tiles_router
-from app.api import aircraft as aircraft_router
-from app.api import rail_freight as rail_freight_router
-from app.core.usage_middleware import UsageTrackingMiddleware
+from app.core.usage_middleware import UsageTrackingMiddleware, flush_usage_logs
 from app.services.vessel_tracker import vessel_tracker
 from app.services.aircraft_tracker import aircraft_tracker
 
@@ -55,6 +44,8 @@ async def lifespan(app: FastAPI):
     aircraft_tracker.stop()
     vessel_tracker.stop()
     stop_scheduler()
+    flush_usage_logs()
+    job_flush_api_key_usage()
 
 
 app = FastAPI(
@@ -78,31 +69,29 @@ app.add_middleware(
 # Usage tracking middleware (before rate limiter so it captures all requests)
 app.add_middleware(UsageTrackingMiddleware)
 
-# Register routers
-app.include_router(admin.router)
-app.include_router(auth.router)
-app.include_router(keys.router)
-app.include_router(billing.router)
-app.include_router(export.router)
-app.include_router(alerts.router)
-app.include_router(countries.router)
-app.include_router(trade_flows.router)
-app.include_router(ports.router)
-app.include_router(airports.router)
-app.include_router(shipping_density.router)
-app.include_router(indicators.router)
-app.include_router(intelligence.router)
-app.include_router(geopolitical.router)
-app.include_router(analytics_router.router)
-app.include_router(import_router.router)
-app.include_router(commodities_router.router)
-app.include_router(ws_router.router)
-app.include_router(data_sources_router.router)
-app.include_router(economic_groups_router.router)
-app.include_router(vessels_router.router)
-app.include_router(aircraft_router.router)
-app.include_router(rail_freight_router.router)
-app.include_router(tiles_router.router)
+# Register routers (app.api submodules, imported only when mounted)
+ROUTERS = (
+    "admin", "auth", "keys", "billing", "export", "alerts", "countries",
+    "trade_flows", "ports", "airports", "shipping_density", "indicators",
+    "analytics", "import_data", "commodities", "websocket", "data_sources",
+    "economic_groups", "vessels", "aircraft", "rail_freight", "tiles",
+)
+# Heavier analysis surfaces, mountable per deployment
+OPTIONAL_ROUTERS = (
+    ("intelligence", settings.enable_intelligence),
+    ("geopolitical", settings.enable_geopolitical),
+)
+
+
+def _load_router(name: str):
+    return importlib.import_module(f"app.api.{name}").router
+
+
+for name in ROUTERS:
+    app.include_router(_load_router(name))
+for name, enabled in OPTIONAL_ROUTERS:
+    if enabled:
+        app.include_router(_load_router(name))
 
 # Rate limiting
 setup_rate_limiting(app)
@@ -1,15 +1,15 @@
 """Alert & Notification models for Phase 4."""
 
 import enum
-from datetime import datetime
 
 from sqlalchemy import (
     Column, Integer, String, Text, Float, Boolean, DateTime,
-    ForeignKey, Enum as SAEnum, JSON,
+    ForeignKey, Index, Enum as SAEnum,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, UTC_NOW
 
 
 # ── Enums ────────────────────────────────────────────────────────────────
@@ -44,6 +44,10 @@ class ChannelType(str, enum.Enum):
 class AlertRule(Base):
     """User-configured alert rule — defines what to monitor and thresholds."""
     __tablename__ = "alert_rules"
+    __table_args__ = (
+        # Containment lookups on config (e.g. config @> '{"iso_code": "JPN"}')
+        Index("ix_alert_rules_config_gin", "config", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -52,19 +56,19 @@ class AlertRule(Base):
     rule_type = Column(SAEnum(AlertRuleType), nullable=False)
     is_enabled = Column(Boolean, default=True, nullable=False)
 
-    # Flexible config stored as JSON:
+    # Flexible config stored as JSONB:
     # chokepoint_stress: {"chokepoint": "Suez Canal", "z_score_threshold": 1.5}
     # port_stress:       {"port_name": "Shanghai", "psi_threshold": 0.7}
     # trade_anomaly:     {"iso_code": "DEU", "z_score_threshold": 2.0}
     # tfii_threshold:    {"exporter": "CHN", "importer": "USA", "tfii_min": 50}
     # energy_exposure:   {"iso_code": "JPN", "ecei_threshold": 0.6}
-    config = Column(JSON, nullable=False, default=dict)
+    config = Column(JSONB, nullable=False, default=dict)
 
     # Cooldown: minimum minutes between repeated alerts for same condition
     cooldown_minutes = Column(Integer, default=60, nullable=False)
 
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW)
 
     # Relationships
     user = relationship("User", backref="alert_rules")
@@ -76,6 +80,11 @@ class AlertRule(Base):
 class Alert(Base):
     """A triggered alert — created when a rule condition is met."""
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Cooldown lookups (latest triggered_at per rule); also covers the
+        # rule_id FK for cascading deletes
+        Index("ix_alert_rule_triggered", "rule_id", "triggered_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     rule_id = Column(Integer, ForeignKey("alert_rules.id", ondelete="CASCADE"), nullable=False)
@@ -86,13 +95,14 @@ class Alert(Base):
 
     title = Column(String(300), nullable=False)
     message = Column(Text, nullable=False)
-    details = Column(JSON, nullable=True)  # Raw metric values that triggered it
+    details = Column(JSONB, nullable=True)  # Raw metric values that triggered it
 
-    triggered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    triggered_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
     acknowledged_at = Column(DateTime, nullable=True)
     resolved_at = Column(DateTime, nullable=True)
 
-    # Track notification delivery
+    # Track notification delivery. Set in bulk by dispatch_all_new_alerts
+    # (one UPDATE per flag per batch), not per alert.
     email_sent = Column(Boolean, default=False)
     webhook_sent = Column(Boolean, default=False)
 
@@ -123,7 +133,7 @@ class NotificationChannel(Base):
     # Webhook: optional secret for HMAC signature verification
     secret = Column(String(200), nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=UTC_NOW, nullable=False)
 
     # Relationship
     user = relationship("User", backref="notification_channels")
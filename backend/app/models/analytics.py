@@ -5,7 +5,7 @@ Stores computed forecasts and detected anomalies so they can be
 served instantly without re-running expensive computations.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, Index, text
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -14,9 +14,12 @@ from app.core.database import Base
 class TradeForecast(Base):
     """Stored trade-flow forecast for a country pair or single country."""
     __tablename__ = "trade_forecasts"
+    __table_args__ = (
+        Index("ix_tf_iso_year", "iso_code", "forecast_year"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    iso_code = Column(String(3), nullable=False, index=True)
+    iso_code = Column(String(3), nullable=False)
     partner_iso = Column(String(3), nullable=True)          # null = aggregate
     direction = Column(String(10), nullable=False)           # 'export' | 'import' | 'total'
     forecast_year = Column(Integer, nullable=False)
@@ -31,6 +34,10 @@ class TradeForecast(Base):
 class TradeAnomaly(Base):
     """Detected anomaly in trade flows."""
     __tablename__ = "trade_anomalies"
+    __table_args__ = (
+        # Dashboards list open anomalies; a partial index keeps that path small
+        Index("ix_ta_iso_active_year", "iso_code", "year", postgresql_where=text("is_active")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     iso_code = Column(String(3), nullable=False, index=True)
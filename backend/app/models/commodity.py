@@ -8,7 +8,7 @@ Tables:
 """
 
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, UniqueConstraint
+    Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, UniqueConstraint
 )
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -33,12 +33,14 @@ class Commodity(Base):
 class CommodityPrice(Base):
     """Monthly price series for tracked commodities."""
     __tablename__ = "commodity_prices"
+    # The unique (commodity_id, year, month) index also serves the
+    # commodity + year-range price history lookups.
     __table_args__ = (
         UniqueConstraint("commodity_id", "year", "month", name="uq_commodity_price_period"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    commodity_id = Column(Integer, ForeignKey("commodities.id"), nullable=False, index=True)
+    commodity_id = Column(Integer, ForeignKey("commodities.id"), nullable=False)
     year = Column(Integer, nullable=False, index=True)
     month = Column(Integer, nullable=False)           # 1-12
     price = Column(Float, nullable=False)              # in commodity's unit
@@ -56,11 +58,13 @@ class SupplyDependency(Base):
     __tablename__ = "supply_dependencies"
     __table_args__ = (
         UniqueConstraint("country_iso", "commodity_id", "direction", "year", name="uq_supply_dep"),
+        Index("ix_sd_country_year_direction", "country_iso", "year", "direction"),
+        Index("ix_sd_commodity_year_direction", "commodity_id", "year", "direction"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    country_iso = Column(String(3), ForeignKey("countries.iso_code"), nullable=False, index=True)
-    commodity_id = Column(Integer, ForeignKey("commodities.id"), nullable=False, index=True)
+    country_iso = Column(String(3), ForeignKey("countries.iso_code"), nullable=False)
+    commodity_id = Column(Integer, ForeignKey("commodities.id"), nullable=False)
     year = Column(Integer, nullable=False, index=True)
     direction = Column(String(10), nullable=False)     # 'export' or 'import'
     value_usd = Column(Float, nullable=False)          # total trade value
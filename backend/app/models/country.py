@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean
+from sqlalchemy import Column, Computed, Integer, String, Float, Text, Boolean
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from geoalchemy2 import Geometry
 from app.core.database import Base
 
@@ -27,7 +28,12 @@ class Country(Base):
     inflation_cpi = Column(Float, nullable=True)
 
     # ── Trade ──
-    trade_balance = Column(Float, nullable=True)
+    # Maintained by PostgreSQL from the two columns below; never written directly
+    trade_balance = Column(Float, Computed(
+        "CASE WHEN export_value IS NULL AND import_value IS NULL THEN NULL "
+        "ELSE COALESCE(export_value, 0) - COALESCE(import_value, 0) END",
+        persisted=True,
+    ))
     current_account = Column(Float, nullable=True)
     export_value = Column(Float, nullable=True)
     import_value = Column(Float, nullable=True)
@@ -114,7 +120,9 @@ class Country(Base):
     external_debt_usd = Column(Float, nullable=True)
 
     # ── Geo ──
-    geometry = Column(Geometry("MULTIPOLYGON", srid=4326), nullable=True)
+    # GiST-indexed for spatial filters. Deferred so plain Country queries
+    # don't detoast the polygon; ST_* calls select the column explicitly.
+    geometry = deferred(Column(Geometry("MULTIPOLYGON", srid=4326, spatial_index=True), nullable=True))
     centroid_lat = Column(Float, nullable=True)
     centroid_lon = Column(Float, nullable=True)
 
@@ -7,8 +7,7 @@ from sqlalchemy import (
     Column, Integer, String, Float, Text, Boolean, DateTime,
     ForeignKey, UniqueConstraint
 )
-from datetime import datetime
-from app.core.database import Base
+from app.core.database import Base, UTC_NOW
 
 
 class NationalDataSource(Base):
@@ -34,7 +33,7 @@ class NationalDataSource(Base):
     fetch_error_count = Column(Integer, default=0)
     circuit_breaker_until = Column(DateTime, nullable=True)  # disable until this time
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UTC_NOW)
 
     __table_args__ = (
         UniqueConstraint("country_iso", "institution", name="uq_nds_country_institution"),
@@ -79,7 +78,7 @@ class DataProvenance(Base):
     source_id = Column(Integer, ForeignKey("national_data_sources.id"), nullable=True)
     source_name = Column(String(255), nullable=True)  # fallback if no source_id
     source_url = Column(Text, nullable=True)
-    fetched_at = Column(DateTime, default=datetime.utcnow)
+    fetched_at = Column(DateTime, server_default=UTC_NOW)
     data_year = Column(Integer, nullable=True)
     quality = Column(String(20), nullable=True)  # official/estimated/simulated
     notes = Column(Text, nullable=True)
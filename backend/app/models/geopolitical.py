@@ -2,14 +2,20 @@
 Geopolitical Risk models — sanctions, conflict zones, country risk scores.
 Phase 6: Geopolitical Risk & Sanctions Layer.
 """
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
-from app.core.database import Base
+from sqlalchemy import Column, Computed, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, text
+from sqlalchemy.orm import deferred
+from geoalchemy2 import Geometry
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database import Base, UTC_NOW
 
 
 class SanctionedEntity(Base):
     """Sanctioned countries, organisations, individuals, or vessels."""
     __tablename__ = "sanctioned_entities"
+    __table_args__ = (
+        # Containment lookups, e.g. identifiers @> '{"imo": ["9166778"]}'
+        Index("ix_sanct_ids_gin", "identifiers", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     entity_type = Column(String(30), nullable=False, index=True)  # country, organisation, vessel, individual
@@ -21,9 +27,9 @@ class SanctionedEntity(Base):
     date_listed = Column(DateTime, nullable=True)
     date_delisted = Column(DateTime, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
-    identifiers = Column(Text, nullable=True)  # JSON: aliases, IMO numbers, etc.
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    identifiers = Column(JSONB, nullable=True)  # aliases, IMO numbers, etc.
+    created_at = Column(DateTime, server_default=UTC_NOW)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW)
 
     def __repr__(self):
         return f"<SanctionedEntity({self.entity_type}: {self.name}, by={self.sanctioning_body})>"
@@ -32,6 +38,11 @@ class SanctionedEntity(Base):
 class ConflictZone(Base):
     """Active conflict zones / areas of instability affecting trade."""
     __tablename__ = "conflict_zones"
+    __table_args__ = (
+        # affected_countries @> '["UKR"]' — zones touching a country
+        Index("ix_cz_affected_countries_gin", "affected_countries", postgresql_using="gin"),
+        Index("ix_cz_affected_chokepoints_gin", "affected_chokepoints", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False, unique=True)
@@ -39,27 +50,75 @@ class ConflictZone(Base):
     severity = Column(String(20), nullable=False, default="moderate")  # low, moderate, high, critical
     lat = Column(Float, nullable=False)
     lon = Column(Float, nullable=False)
+    # Point built by PostgreSQL from lat/lon, GiST-indexed for bbox/radius
+    # filters. Deferred: row loads don't need the WKB.
+    geom = deferred(Column(
+        Geometry("POINT", srid=4326, spatial_index=True),
+        Computed("ST_SetSRID(ST_MakePoint(lon, lat), 4326)", persisted=True),
+    ))
     radius_km = Column(Float, nullable=False, default=200)  # affected radius
-    affected_countries = Column(Text, nullable=True)  # JSON array of ISO codes
-    affected_chokepoints = Column(Text, nullable=True)  # JSON array of chokepoint names
+    affected_countries = Column(JSONB, nullable=True)  # array of ISO codes
+    affected_chokepoints = Column(JSONB, nullable=True)  # array of chokepoint names
     description = Column(Text, nullable=True)
     start_date = Column(DateTime, nullable=True)
     end_date = Column(DateTime, nullable=True)  # NULL = ongoing
     is_active = Column(Boolean, default=True, nullable=False)
     source = Column(String(200), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UTC_NOW)
+    updated_at = Column(DateTime, server_default=UTC_NOW, onupdate=UTC_NOW)
 
     def __repr__(self):
         return f"<ConflictZone({self.name}, severity={self.severity})>"
 
 
+# ─── Composite risk definition (shared with services/risk_scoring) ───
+RISK_WEIGHTS = {
+    "sanctions": 0.30,
+    "conflict": 0.25,
+    "trade_dependency": 0.15,
+    "chokepoint": 0.15,
+    "energy": 0.15,
+}
+
+RISK_THRESHOLDS = [
+    (80, "critical"),
+    (60, "high"),
+    (40, "elevated"),
+    (20, "moderate"),
+    (0, "low"),
+]
+
+_RISK_COLUMNS = {
+    "sanctions": "sanctions_score",
+    "conflict": "conflict_score",
+    "trade_dependency": "trade_dependency_score",
+    "chokepoint": "chokepoint_vulnerability",
+    "energy": "energy_risk_score",
+}
+
+COMPOSITE_RISK_SQL = " + ".join(
+    f"{RISK_WEIGHTS[k]} * COALESCE({col}, 0)" for k, col in _RISK_COLUMNS.items()
+)
+
+RISK_LEVEL_SQL = "CASE " + " ".join(
+    f"WHEN ({COMPOSITE_RISK_SQL}) >= {threshold} THEN '{level}'"
+    for threshold, level in RISK_THRESHOLDS
+) + " ELSE 'low' END"
+
+
 class CountryRiskScore(Base):
     """Composite geopolitical risk score per country per year."""
     __tablename__ = "country_risk_scores"
+    __table_args__ = (
+        Index("ix_crs_iso_year", "country_iso", "year", unique=True),
+        Index(
+            "ix_crs_high_risk", "year", "country_iso",
+            postgresql_where=text(f"composite_risk >= {RISK_THRESHOLDS[1][0]}"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    country_iso = Column(String(3), ForeignKey("countries.iso_code", ondelete="CASCADE"), nullable=False, index=True)
+    country_iso = Column(String(3), ForeignKey("countries.iso_code", ondelete="CASCADE"), nullable=False)
     year = Column(Integer, nullable=False, index=True)
 
     # Component scores (0-100, higher = more risk)
@@ -69,14 +128,16 @@ class CountryRiskScore(Base):
     chokepoint_vulnerability = Column(Float, default=0)  # exposure to stressed chokepoints
     energy_risk_score = Column(Float, default=0)  # energy corridor exposure
 
-    # Composite
-    composite_risk = Column(Float, default=0)    # weighted average of all components
-    risk_level = Column(String(20), default="low")  # low, moderate, elevated, high, critical
+    # Composite — maintained by PostgreSQL from the components above.
+    # A generated column can't reference another one, so risk_level
+    # repeats the weighted sum inside its CASE.
+    composite_risk = Column(Float, Computed(COMPOSITE_RISK_SQL, persisted=True))
+    risk_level = Column(String(20), Computed(RISK_LEVEL_SQL, persisted=True))  # low … critical
 
-    calculated_at = Column(DateTime, default=datetime.utcnow)
+    calculated_at = Column(DateTime, server_default=UTC_NOW)
 
     def __repr__(self):
-        return f"<CountryRiskScore({self.country_iso} {self.year}: {self.risk_level} = {self.composite_risk:.1f})>"
+        return f"<CountryRiskScore({self.country_iso} {self.year}: {self.risk_level} = {self.composite_risk})>"
 
 
 class SupplyChainRoute(Base):
@@ -88,13 +149,13 @@ class SupplyChainRoute(Base):
     origin_iso = Column(String(3), ForeignKey("countries.iso_code", ondelete="SET NULL"), nullable=True)
     destination_iso = Column(String(3), ForeignKey("countries.iso_code", ondelete="SET NULL"), nullable=True)
     commodity = Column(String(100), nullable=True)  # oil, gas, semiconductors, rare_earths, grain, etc.
-    chokepoints_transit = Column(Text, nullable=True)  # JSON array of chokepoint names on route
+    chokepoints_transit = Column(JSONB, nullable=True)  # array of chokepoint names on route
     annual_value_usd = Column(Float, nullable=True)
     vulnerability_score = Column(Float, default=0)  # 0-100
-    risk_factors = Column(Text, nullable=True)  # JSON array of risk factors
-    alternative_routes = Column(Text, nullable=True)  # JSON description of alternatives
+    risk_factors = Column(JSONB, nullable=True)  # array of risk factors
+    alternative_routes = Column(JSONB, nullable=True)  # description of alternatives
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=UTC_NOW)
 
     def __repr__(self):
-        return f"<SupplyChainRoute({self.name}, vuln={self.vulnerability_score:.0f})>"
+        return f"<SupplyChainRoute({self.name}, vuln={self.vulnerability_score})>"
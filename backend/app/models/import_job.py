@@ -4,7 +4,7 @@ Data Pipeline & Import models — Phase 9.
 Tracks import jobs: file uploads, API fetches, validation status, error logs.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Boolean, LargeBinary, ForeignKey
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -43,11 +43,18 @@ class ImportJob(Base):
     import_mode = Column(String(20), default="append")  # 'append', 'replace', 'upsert'
     year_filter = Column(Integer, nullable=True)  # if replacing for a specific year
 
-    # Errors
+    # Errors — row-level errors live in import_job_errors. error_log is
+    # deprecated: only read as a fallback for jobs that predate that table.
     error_log = Column(JSON, nullable=True)
     # [{row: 5, field: "trade_value_usd", error: "not a number"}, ...]
     error_summary = Column(Text, nullable=True)
 
+    # Duplicate detection — HyperLogLog sketch of the natural keys imported
+    # (fixed size, mergeable across jobs) and its distinct-key estimate.
+    # Null when the table has no natural key or datasketch isn't installed.
+    dedup_sketch = Column(LargeBinary, nullable=True)
+    distinct_keys = Column(Integer, nullable=True)
+
     # Validation preview (first N rows parsed)
     preview_data = Column(JSON, nullable=True)
 
@@ -57,6 +64,17 @@ class ImportJob(Base):
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
 
+class ImportJobError(Base):
+    """One row-level validation error from an import job (append-only)."""
+    __tablename__ = "import_job_errors"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    row_num = Column(Integer, nullable=False)
+    field = Column(String(100), nullable=True)
+    error = Column(Text, nullable=False)
+
+
 class DataSource(Base):
     """Registered external data sources for scheduled refresh."""
     __tablename__ = "data_sources"
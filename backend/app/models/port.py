@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Computed, Integer, String, Float
+from sqlalchemy.orm import deferred
+from geoalchemy2 import Geometry
 from app.core.database import Base
 
 
@@ -10,6 +12,12 @@ class Port(Base):
     country_iso = Column(String(3), nullable=False, index=True)
     lat = Column(Float, nullable=False)
     lon = Column(Float, nullable=False)
+    # Point built by PostgreSQL from lat/lon, GiST-indexed for bbox/radius
+    # filters. Deferred: row loads don't need the WKB.
+    geom = deferred(Column(
+        Geometry("POINT", srid=4326, spatial_index=True),
+        Computed("ST_SetSRID(ST_MakePoint(lon, lat), 4326)", persisted=True),
+    ))
     port_type = Column(String(50), nullable=True)  # container, bulk, oil, etc.
     throughput_teu = Column(Float, nullable=True)  # TEU for container ports
     throughput_tons = Column(Float, nullable=True)  # Metric tons
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Computed, Integer, String, Float
+from sqlalchemy.orm import deferred
 from geoalchemy2 import Geometry
 from app.core.database import Base
 
@@ -10,6 +11,12 @@ class ShippingDensity(Base):
     region_name = Column(String(255), nullable=True)
     lat = Column(Float, nullable=False)
     lon = Column(Float, nullable=False)
+    # Point built by PostgreSQL from lat/lon, GiST-indexed for bbox/radius
+    # filters. Deferred: row loads don't need the WKB.
+    geom = deferred(Column(
+        Geometry("POINT", srid=4326, spatial_index=True),
+        Computed("ST_SetSRID(ST_MakePoint(lon, lat), 4326)", persisted=True),
+    ))
     year = Column(Integer, nullable=False, index=True)
     month = Column(Integer, nullable=False, index=True)
     density_value = Column(Float, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, func
 from app.core.database import Base
 
 
@@ -6,8 +6,8 @@ class TradeFlow(Base):
     __tablename__ = "trade_flows"
 
     id = Column(Integer, primary_key=True, index=True)
-    exporter_iso = Column(String(3), ForeignKey("countries.iso_code"), nullable=False, index=True)
-    importer_iso = Column(String(3), ForeignKey("countries.iso_code"), nullable=False, index=True)
+    exporter_iso = Column(String(3), ForeignKey("countries.iso_code"), nullable=False)
+    importer_iso = Column(String(3), ForeignKey("countries.iso_code"), nullable=False)
     year = Column(Integer, nullable=False, index=True)
     month = Column(Integer, nullable=True)
     commodity_code = Column(String(10), nullable=True)
@@ -16,5 +16,19 @@ class TradeFlow(Base):
     weight_kg = Column(Float, nullable=True)
     flow_type = Column(String(10), nullable=False)  # 'export' or 'import'
 
+    __table_args__ = (
+        # Natural key — lets bulk loads dedup with ON CONFLICT DO NOTHING.
+        # NULL month/commodity (annual / aggregate rows) must collide too.
+        Index(
+            "ux_trade_flows_natural_key",
+            exporter_iso, importer_iso, year,
+            func.coalesce(month, 0), flow_type, func.coalesce(commodity_code, ""),
+            unique=True,
+        ),
+        # The natural key already leads with exporter_iso (and exporter +
+        # importer + year); importer-side lookups need their own prefix.
+        Index("ix_tf_imp_year", importer_iso, year),
+    )
+
     def __repr__(self):
-        return f"<TradeFlow({self.exporter_iso} -> {self.importer_iso}, ${self.trade_value_usd:,.0f})>"
+        return f"<TradeFlow({self.exporter_iso} -> {self.importer_iso}, {self.year}, ${self.trade_value_usd})>"
@@ -1,21 +1,62 @@
 """API usage log model — tracks every authenticated request for analytics."""
 
-from datetime import datetime
-
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from app.core.database import Base
+from sqlalchemy import DDL, Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, event
+from app.core.database import Base, UTC_NOW
 
 
 class APIUsageLog(Base):
     """One row per authenticated API request. Used by admin analytics."""
     __tablename__ = "api_usage_logs"
+    __table_args__ = (
+        # Admin analytics filter on a recent window, then group by endpoint
+        # or by user; one index per access path keeps per-request writes low.
+        Index("ix_usage_ts_endpoint", "timestamp", "endpoint", "method"),
+        Index("ix_usage_user_ts", "user_id", "timestamp"),
+        # Monthly range partitions; see app/services/usage_partitions.py
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
-    endpoint = Column(String(300), nullable=False, index=True)
+    # The partition key must be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    endpoint = Column(String(300), nullable=False)
     method = Column(String(10), nullable=False)
     status_code = Column(Integer, nullable=False)
     response_time_ms = Column(Float, nullable=True)
     ip_address = Column(String(45), nullable=True)
-    user_agent = Column(String(500), nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # A handful of distinct user agents repeat across millions of rows;
+    # store a 4-byte reference instead of the text
+    user_agent_id = Column(Integer, ForeignKey("user_agents.id"), nullable=True)
+    # Set by the middleware at request time (rows are written in batches);
+    # the server default covers any other writer.
+    timestamp = Column(DateTime, server_default=UTC_NOW, nullable=False, primary_key=True)
+
+
+# Catch-all partition so inserts never fail before a monthly partition exists
+event.listen(
+    APIUsageLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS api_usage_logs_default PARTITION OF api_usage_logs DEFAULT"),
+)
+
+
+class UserAgent(Base):
+    """Distinct User-Agent strings referenced by api_usage_logs."""
+    __tablename__ = "user_agents"
+
+    id = Column(Integer, primary_key=True)
+    ua_text = Column(String(500), nullable=False, unique=True)
+
+
+class APIUsageDaily(Base):
+    """Per-day, per-endpoint roll-up of api_usage_logs for admin analytics.
+    Filled nightly by app/services/usage_rollup.py."""
+    __tablename__ = "api_usage_daily"
+
+    day = Column(Date, primary_key=True)
+    endpoint = Column(String(300), primary_key=True)
+    method = Column(String(10), primary_key=True)
+    request_count = Column(Integer, nullable=False)
+    # Sum/count of non-null response times, so averages combine across days
+    response_ms_sum = Column(Float, nullable=True)
+    response_ms_count = Column(Integer, nullable=False, default=0)
@@ -1,11 +1,10 @@
 """User & API-key models for authentication and subscription management."""
 
 from sqlalchemy import (
-    Column, Integer, String, Float, Boolean, DateTime, Text,
-    ForeignKey, Enum as SAEnum, UniqueConstraint,
+    Column, Integer, String, Float, Boolean, DateTime, Text, LargeBinary,
+    ForeignKey, Enum as SAEnum, UniqueConstraint, func,
 )
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
 import enum
 
 from app.core.database import Base
@@ -36,18 +35,21 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(320), unique=True, nullable=False, index=True)
-    hashed_password = Column(String(255), nullable=False)
+    hashed_password = Column(String(60, collation="C"), nullable=False)  # bcrypt, fixed 60 chars
     full_name = Column(String(255), nullable=True)
     organisation = Column(String(255), nullable=True)
 
-    # Subscription
+    # Subscription — VARCHAR + CHECK rather than a native PG enum, so adding a
+    # tier is a constraint swap instead of ALTER TYPE ... ADD VALUE.
     tier = Column(
-        SAEnum(SubscriptionTier, name="subscription_tier"),
+        SAEnum(SubscriptionTier, name="subscription_tier", native_enum=False,
+               create_constraint=True, length=20),
         default=SubscriptionTier.FREE,
         nullable=False,
     )
     subscription_status = Column(
-        SAEnum(SubscriptionStatus, name="subscription_status"),
+        SAEnum(SubscriptionStatus, name="subscription_status", native_enum=False,
+               create_constraint=True, length=20),
         default=SubscriptionStatus.ACTIVE,
         nullable=False,
     )
@@ -59,12 +61,8 @@ class User(Base):
     # State
     is_active = Column(Boolean, default=True, nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
-    )
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relations
     api_keys = relationship("APIKey", back_populates="user", cascade="all, delete-orphan")
@@ -81,12 +79,12 @@ class APIKey(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    key_hash = Column(String(255), nullable=False, unique=True, index=True)
+    key_hash = Column(LargeBinary(32), nullable=False)  # raw SHA-256 digest; indexed via uq_api_key_hash
     key_prefix = Column(String(12), nullable=False)  # e.g. "gefo_abc1" for display
     label = Column(String(100), nullable=True)
 
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_used_at = Column(DateTime(timezone=True), nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=True)
 
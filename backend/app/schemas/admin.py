@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 # ── User management ─────────────────────────────────────────────────────
@@ -21,8 +21,7 @@ class AdminUserSummary(BaseModel):
     alert_rule_count: int = 0
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AdminUserUpdate(BaseModel):
@@ -78,6 +77,13 @@ class UsageAnalytics(BaseModel):
     error_rate: float  # percentage of 4xx/5xx
 
 
+# Built once: validating a whole list in one pydantic-core call is much
+# cheaper than constructing each row model from Python.
+EndpointUsageList = TypeAdapter(list[EndpointUsage])
+DailyUsageList = TypeAdapter(list[DailyUsage])
+UserUsageList = TypeAdapter(list[UserUsage])
+
+
 # ── System health ────────────────────────────────────────────────────────
 
 class SystemHealth(BaseModel):
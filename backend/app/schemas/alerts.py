@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from app.models.alert import AlertRuleType, AlertSeverity, AlertStatus, ChannelType
 
@@ -34,8 +34,7 @@ class AlertRuleResponse(BaseModel):
     created_at: datetime
     alert_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ── Alerts ───────────────────────────────────────────────────────────────
@@ -55,8 +54,7 @@ class AlertResponse(BaseModel):
     email_sent: bool
     webhook_sent: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AlertList(BaseModel):
@@ -65,6 +63,9 @@ class AlertList(BaseModel):
     alerts: list[AlertResponse]
 
 
+AlertResponseList = TypeAdapter(list[AlertResponse])
+
+
 class AlertAcknowledge(BaseModel):
     alert_ids: list[int] = Field(..., min_length=1)
 
@@ -92,8 +93,7 @@ class ChannelResponse(BaseModel):
     label: Optional[str]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ── Alert Summary (for dashboard bell icon) ──────────────────────────────
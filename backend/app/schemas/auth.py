@@ -1,6 +1,6 @@
 """Pydantic schemas for authentication, users, API keys, and subscriptions."""
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -48,8 +48,7 @@ class UserProfile(BaseModel):
     created_at: datetime
     api_key_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserUpdate(BaseModel):
@@ -79,8 +78,7 @@ class APIKeyResponse(BaseModel):
     expires_at: Optional[datetime]
     request_count: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class APIKeyCreated(BaseModel):
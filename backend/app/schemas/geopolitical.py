@@ -1,9 +1,20 @@
 """
 Pydantic schemas for Geopolitical Risk & Sanctions API — Phase 6.
 """
+import json
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, Optional, Union
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _decode_json_string(value: Any) -> Any:
+    """Accept the older JSON-encoded string form for JSONB fields."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            raise ValueError("must be valid JSON")
+    return value
 
 
 # ─── Sanctioned Entity ───
@@ -16,7 +27,12 @@ class SanctionedEntityCreate(BaseModel):
     programme: Optional[str] = None
     reason: Optional[str] = None
     date_listed: Optional[datetime] = None
-    identifiers: Optional[str] = None  # JSON string
+    identifiers: Optional[Union[dict, list]] = None  # aliases, IMO numbers, etc.
+
+    @field_validator("identifiers", mode="before")
+    @classmethod
+    def decode_identifiers(cls, v):
+        return _decode_json_string(v)
 
 
 class SanctionedEntityResponse(BaseModel):
@@ -31,8 +47,7 @@ class SanctionedEntityResponse(BaseModel):
     date_delisted: Optional[datetime]
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ─── Conflict Zone ───
@@ -44,12 +59,17 @@ class ConflictZoneCreate(BaseModel):
     lat: float
     lon: float
     radius_km: float = 200
-    affected_countries: Optional[str] = None  # JSON array of ISO codes
-    affected_chokepoints: Optional[str] = None
+    affected_countries: Optional[list[str]] = None  # ISO codes
+    affected_chokepoints: Optional[list[str]] = None
     description: Optional[str] = None
     start_date: Optional[datetime] = None
     source: Optional[str] = None
 
+    @field_validator("affected_countries", "affected_chokepoints", mode="before")
+    @classmethod
+    def decode_affected(cls, v):
+        return _decode_json_string(v)
+
 
 class ConflictZoneResponse(BaseModel):
     id: int
@@ -59,15 +79,14 @@ class ConflictZoneResponse(BaseModel):
     lat: float
     lon: float
     radius_km: float
-    affected_countries: Optional[str]
-    affected_chokepoints: Optional[str]
+    affected_countries: Optional[list[str]]
+    affected_chokepoints: Optional[list[str]]
     description: Optional[str]
     start_date: Optional[datetime]
     end_date: Optional[datetime]
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ─── Risk Scores ───
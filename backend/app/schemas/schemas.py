@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Optional, List
 
 
@@ -110,8 +110,7 @@ class CountryMacro(CountryBase):
     tariff_rate_weighted: Optional[float] = None
     tariff_rate_simple: Optional[float] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CountryGeoJSON(BaseModel):
@@ -144,8 +143,7 @@ class TradeFlowResponse(BaseModel):
     importer_lat: Optional[float] = None
     importer_lon: Optional[float] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TradeFlowAggregated(BaseModel):
@@ -172,8 +170,7 @@ class PortResponse(BaseModel):
     year: Optional[int] = None
     unlocode: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ─── Airport Schemas ───
@@ -193,8 +190,7 @@ class AirportResponse(BaseModel):
     runways: Optional[int] = None
     continent: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # ─── Shipping Density Schemas ───
@@ -208,8 +204,7 @@ class ShippingDensityResponse(BaseModel):
     vessel_type: Optional[str] = None
     region_name: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ShippingDensityGrid(BaseModel):
@@ -218,6 +213,13 @@ class ShippingDensityGrid(BaseModel):
     max_density: float
 
 
+# List validators for the bulk endpoints — one pydantic-core call per
+# response instead of one model constructor per row
+TradeFlowList = TypeAdapter(List[TradeFlowResponse])
+PortList = TypeAdapter(List[PortResponse])
+ShippingDensityList = TypeAdapter(List[ShippingDensityResponse])
+
+
 # ─── Indicator Schemas ───
 
 class IndicatorResponse(BaseModel):
@@ -4,17 +4,29 @@ Alert Engine — evaluates user-configured rules against live intelligence data.
 Runs periodically via APScheduler. For each active rule, checks whether the
 monitored metric breaches the user's threshold, respects cooldown, then creates
 Alert records and dispatches notifications.
+
+Each underlying analytic (chokepoint monitor, port stress, TFII, ECEI,
+baselines) is computed at most once per evaluation pass and shared by every
+rule that reads it. Results are also kept for a few minutes across passes,
+keyed by year and a data version, so a scheduled run followed by an
+on-demand check doesn't recompute them.
 """
 
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+from sqlalchemy import func as sqlfunc, insert, select
 from sqlalchemy.orm import Session
 
 from app.models.alert import (
     AlertRule, Alert, NotificationChannel,
     AlertRuleType, AlertSeverity, AlertStatus, ChannelType,
 )
+from app.models.port import Port
+from app.models.shipping_density import ShippingDensity
+from app.models.trade_flow import TradeFlow
 from app.services.chokepoint_monitor import monitor_chokepoints
 from app.services.port_stress import compute_port_stress
 from app.services.tfii import compute_corridor_tfii
@@ -50,79 +62,145 @@ def _ecei_severity(ecei: float) -> AlertSeverity:
     return AlertSeverity.INFO
 
 
+# ── Analytic snapshots ───────────────────────────────────────────────────
+
+SNAPSHOT_TTL = 300  # seconds
+SNAPSHOT_CACHE_SIZE = 64
+# (key, year, data version) → (cached_at, result)
+_snapshot_cache: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+
+
+def _data_version(db: Session) -> tuple:
+    """Cheap change marker for the tables the analytics read: their max ids.
+    New rows change it; in-place updates are picked up by SNAPSHOT_TTL."""
+    return tuple(db.query(
+        select(sqlfunc.max(TradeFlow.id)).scalar_subquery(),
+        select(sqlfunc.max(ShippingDensity.id)).scalar_subquery(),
+        select(sqlfunc.max(Port.id)).scalar_subquery(),
+    ).one())
+
+
+class _Snapshots:
+    """Analytic results for one evaluation pass. Each is computed at most
+    once, and reused from _snapshot_cache while the data is unchanged."""
+
+    def __init__(self, year: int, version: tuple):
+        self.year = year
+        self.version = version
+        self._results: Dict[Any, Any] = {}
+
+    def get(self, key: Any, compute: Callable[[], Any]) -> Any:
+        if key in self._results:
+            return self._results[key]
+
+        cache_key = (key, self.year, self.version)
+        entry = _snapshot_cache.get(cache_key)
+        if entry is not None and time.monotonic() - entry[0] < SNAPSHOT_TTL:
+            _snapshot_cache.move_to_end(cache_key)
+            result = entry[1]
+        else:
+            result = compute()
+            _snapshot_cache[cache_key] = (time.monotonic(), result)
+            _snapshot_cache.move_to_end(cache_key)
+            while len(_snapshot_cache) > SNAPSHOT_CACHE_SIZE:
+                _snapshot_cache.popitem(last=False)
+
+        self._results[key] = result
+        return result
+
+
+def _index(rows: List[dict], key: Callable[[dict], Any]) -> Dict[Any, dict]:
+    """Lookup dict over `rows`; the first row wins on duplicate keys."""
+    out: Dict[Any, dict] = {}
+    for row in rows:
+        out.setdefault(key(row), row)
+    return out
+
+
+def clear_snapshot_cache() -> None:
+    """Drop cached analytics (e.g. after an import rewrites existing rows)."""
+    _snapshot_cache.clear()
+
+
 # ── Rule evaluators ──────────────────────────────────────────────────────
 
-def _eval_chokepoint_stress(rule: AlertRule, db: Session, year: int) -> Optional[dict]:
+def _eval_chokepoint_stress(rule: AlertRule, db: Session, year: int, snapshots: _Snapshots) -> Optional[dict]:
     """Check if a specific chokepoint's z-score exceeds threshold."""
     cfg = rule.config
     target_name = cfg.get("chokepoint", "").lower()
     threshold = float(cfg.get("z_score_threshold", 1.5))
 
-    results = monitor_chokepoints(db, current_year=year)
-    for cp in results:
-        if cp["name"].lower() == target_name:
-            z = abs(cp.get("z_score", 0))
-            if z >= threshold:
-                return {
-                    "title": f"Chokepoint Alert: {cp['name']}",
-                    "message": (
-                        f"{cp['name']} z-score is {cp['z_score']:.2f} "
-                        f"(threshold: {threshold}). "
-                        f"Stress level: {cp.get('stress_level', 'unknown')}."
-                    ),
-                    "severity": _z_severity(cp["z_score"]),
-                    "details": {
-                        "chokepoint": cp["name"],
-                        "z_score": cp["z_score"],
-                        "current_density": cp.get("current_density"),
-                        "baseline_mean": cp.get("baseline_mean"),
-                        "stress_level": cp.get("stress_level"),
-                    },
-                }
-    return None
-
-
-def _eval_port_stress(rule: AlertRule, db: Session, year: int) -> Optional[dict]:
+    by_name = snapshots.get("chokepoints", lambda: _index(
+        monitor_chokepoints(db, current_year=year), lambda cp: cp["name"].lower(),
+    ))
+    cp = by_name.get(target_name)
+    if cp is None or abs(cp.get("z_score", 0)) < threshold:
+        return None
+    return {
+        "title": f"Chokepoint Alert: {cp['name']}",
+        "message": (
+            f"{cp['name']} z-score is {cp['z_score']:.2f} "
+            f"(threshold: {threshold}). "
+            f"Stress level: {cp.get('stress_level', 'unknown')}."
+        ),
+        "severity": _z_severity(cp["z_score"]),
+        "details": {
+            "chokepoint": cp["name"],
+            "z_score": cp["z_score"],
+            "current_density": cp.get("current_density"),
+            "baseline_mean": cp.get("baseline_mean"),
+            "stress_level": cp.get("stress_level"),
+        },
+    }
+
+
+def _eval_port_stress(rule: AlertRule, db: Session, year: int, snapshots: _Snapshots) -> Optional[dict]:
     """Check if a specific port's PSI exceeds threshold."""
     cfg = rule.config
     target_port = cfg.get("port_name", "").lower()
     threshold = float(cfg.get("psi_threshold", 0.7))
 
-    ports = compute_port_stress(db, year=year)
-    for p in ports:
-        if p["port_name"].lower() == target_port:
-            psi = p.get("psi", 0)
-            if psi >= threshold:
-                return {
-                    "title": f"Port Stress Alert: {p['port_name']}",
-                    "message": (
-                        f"{p['port_name']} ({p['country_iso']}) PSI is {psi:.3f} "
-                        f"(threshold: {threshold}). "
-                        f"Stress level: {p.get('stress_level', 'unknown')}."
-                    ),
-                    "severity": _psi_severity(psi),
-                    "details": {
-                        "port_name": p["port_name"],
-                        "country_iso": p["country_iso"],
-                        "psi": round(psi, 4),
-                        "stress_level": p.get("stress_level"),
-                        "throughput_teu": p.get("throughput_teu"),
-                    },
-                }
-    return None
-
-
-def _eval_trade_anomaly(rule: AlertRule, db: Session, year: int) -> Optional[dict]:
+    by_name = snapshots.get("port_stress", lambda: _index(
+        compute_port_stress(db, year=year), lambda p: p["port_name"].lower(),
+    ))
+    p = by_name.get(target_port)
+    if p is None:
+        return None
+    psi = p.get("psi", 0)
+    if psi < threshold:
+        return None
+    return {
+        "title": f"Port Stress Alert: {p['port_name']}",
+        "message": (
+            f"{p['port_name']} ({p['country_iso']}) PSI is {psi:.3f} "
+            f"(threshold: {threshold}). "
+            f"Stress level: {p.get('stress_level', 'unknown')}."
+        ),
+        "severity": _psi_severity(psi),
+        "details": {
+            "port_name": p["port_name"],
+            "country_iso": p["country_iso"],
+            "psi": round(psi, 4),
+            "stress_level": p.get("stress_level"),
+            "throughput_teu": p.get("throughput_teu"),
+        },
+    }
+
+
+def _eval_trade_anomaly(rule: AlertRule, db: Session, year: int, snapshots: _Snapshots) -> Optional[dict]:
     """Check if a country's trade z-score exceeds threshold."""
     cfg = rule.config
     iso = cfg.get("iso_code", "")
     threshold = float(cfg.get("z_score_threshold", 2.0))
 
     if iso:
-        data = compute_country_trade_baseline(db, iso_code=iso, current_year=year)
+        data = snapshots.get(
+            ("country_baseline", iso),
+            lambda: compute_country_trade_baseline(db, iso_code=iso, current_year=year),
+        )
         indicators = data.get("indicators", [])
     else:
-        data = compute_trade_baselines(db, current_year=year)
+        data = snapshots.get("trade_baseline", lambda: compute_trade_baselines(db, current_year=year))
         indicators = [data] if isinstance(data, dict) else []
 
     for ind in indicators:
@@ -149,62 +227,66 @@ def _eval_trade_anomaly(rule: AlertRule, db: Session, year: int) -> Optional[dic
     return None
 
 
-def _eval_tfii_threshold(rule: AlertRule, db: Session, year: int) -> Optional[dict]:
+def _eval_tfii_threshold(rule: AlertRule, db: Session, year: int, snapshots: _Snapshots) -> Optional[dict]:
     """Check if a trade corridor's TFII crosses a minimum threshold."""
     cfg = rule.config
     exporter = cfg.get("exporter", "").upper()
     importer = cfg.get("importer", "").upper()
     tfii_min = float(cfg.get("tfii_min", 50))
 
-    corridors = compute_corridor_tfii(db, year=year, top_n=100)
-    for c in corridors:
-        if c["exporter_iso"] == exporter and c["importer_iso"] == importer:
-            if c["tfii"] >= tfii_min:
-                return {
-                    "title": f"TFII Alert: {exporter}→{importer}",
-                    "message": (
-                        f"Corridor {exporter}→{importer} TFII is {c['tfii']:.1f} "
-                        f"(threshold: {tfii_min}). "
-                        f"Interpretation: {c.get('interpretation', '')}."
-                    ),
-                    "severity": AlertSeverity.WARNING if c["tfii"] >= tfii_min * 1.5 else AlertSeverity.INFO,
-                    "details": {
-                        "exporter": exporter,
-                        "importer": importer,
-                        "tfii": round(c["tfii"], 2),
-                        "trade_value_usd": c.get("trade_value_usd"),
-                        "interpretation": c.get("interpretation"),
-                    },
-                }
-    return None
-
-
-def _eval_energy_exposure(rule: AlertRule, db: Session, year: int) -> Optional[dict]:
+    by_pair = snapshots.get("tfii", lambda: _index(
+        compute_corridor_tfii(db, year=year, top_n=100), lambda c: (c["exporter_iso"], c["importer_iso"]),
+    ))
+    c = by_pair.get((exporter, importer))
+    if c is None or c["tfii"] < tfii_min:
+        return None
+    return {
+        "title": f"TFII Alert: {exporter}→{importer}",
+        "message": (
+            f"Corridor {exporter}→{importer} TFII is {c['tfii']:.1f} "
+            f"(threshold: {tfii_min}). "
+            f"Interpretation: {c.get('interpretation', '')}."
+        ),
+        "severity": AlertSeverity.WARNING if c["tfii"] >= tfii_min * 1.5 else AlertSeverity.INFO,
+        "details": {
+            "exporter": exporter,
+            "importer": importer,
+            "tfii": round(c["tfii"], 2),
+            "trade_value_usd": c.get("trade_value_usd"),
+            "interpretation": c.get("interpretation"),
+        },
+    }
+
+
+def _eval_energy_exposure(rule: AlertRule, db: Session, year: int, snapshots: _Snapshots) -> Optional[dict]:
     """Check if a country's ECEI exceeds threshold."""
     cfg = rule.config
     iso = cfg.get("iso_code", "").upper()
     threshold = float(cfg.get("ecei_threshold", 0.6))
 
-    countries = compute_energy_corridor_exposure(db, year=year)
-    for c in countries:
-        if c["iso_code"] == iso:
-            ecei = c.get("ecei", 0)
-            if ecei >= threshold:
-                return {
-                    "title": f"Energy Exposure Alert: {iso}",
-                    "message": (
-                        f"{iso} ECEI is {ecei:.3f} (threshold: {threshold}). "
-                        f"Risk level: {c.get('risk_level', 'unknown')}."
-                    ),
-                    "severity": _ecei_severity(ecei),
-                    "details": {
-                        "iso_code": iso,
-                        "ecei": round(ecei, 4),
-                        "risk_level": c.get("risk_level"),
-                        "total_trade_usd": c.get("total_trade_usd"),
-                    },
-                }
-    return None
+    by_iso = snapshots.get("ecei", lambda: _index(
+        compute_energy_corridor_exposure(db, year=year), lambda c: c["iso_code"],
+    ))
+    c = by_iso.get(iso)
+    if c is None:
+        return None
+    ecei = c.get("ecei", 0)
+    if ecei < threshold:
+        return None
+    return {
+        "title": f"Energy Exposure Alert: {iso}",
+        "message": (
+            f"{iso} ECEI is {ecei:.3f} (threshold: {threshold}). "
+            f"Risk level: {c.get('risk_level', 'unknown')}."
+        ),
+        "severity": _ecei_severity(ecei),
+        "details": {
+            "iso_code": iso,
+            "ecei": round(ecei, 4),
+            "risk_level": c.get("risk_level"),
+            "total_trade_usd": c.get("total_trade_usd"),
+        },
+    }
 
 
 # ── Evaluator dispatch ───────────────────────────────────────────────────
@@ -220,35 +302,37 @@ _EVALUATORS = {
 
 # ── Cooldown check ───────────────────────────────────────────────────────
 
-def _is_in_cooldown(db: Session, rule: AlertRule) -> bool:
-    """Return True if a recent alert exists within the cooldown window."""
-    cutoff = datetime.utcnow() - timedelta(minutes=rule.cooldown_minutes)
-    recent = (
-        db.query(Alert)
-        .filter(Alert.rule_id == rule.id, Alert.triggered_at >= cutoff)
-        .first()
+def _last_fired(db: Session, rules: List[AlertRule]) -> Dict[int, datetime]:
+    """Most recent triggered_at per rule id, in one grouped query."""
+    if not rules:
+        return {}
+    return dict(
+        db.query(Alert.rule_id, sqlfunc.max(Alert.triggered_at))
+        .filter(Alert.rule_id.in_([r.id for r in rules]))
+        .group_by(Alert.rule_id)
+        .all()
     )
-    return recent is not None
 
 
-# ── Main engine entry point ──────────────────────────────────────────────
+def _is_in_cooldown(rule: AlertRule, last_fired: Dict[int, datetime], now: datetime) -> bool:
+    """Return True if the rule last fired within its cooldown window."""
+    last = last_fired.get(rule.id)
+    return last is not None and last >= now - timedelta(minutes=rule.cooldown_minutes)
 
-def evaluate_rules(db: Session, year: int = 2023) -> List[Alert]:
-    """
-    Evaluate ALL enabled alert rules for ALL users.
-    Returns list of newly-created Alert objects.
-    """
-    rules: List[AlertRule] = (
-        db.query(AlertRule)
-        .filter(AlertRule.is_enabled == True)  # noqa: E712
-        .all()
-    )
 
-    new_alerts: List[Alert] = []
+# ── Main engine entry point ──────────────────────────────────────────────
+
+def _evaluate(db: Session, rules: List[AlertRule], year: int) -> List[Alert]:
+    """Evaluate `rules` against one shared set of snapshots and store the
+    alerts that fire. Returns the newly-created Alert objects."""
+    new_rows: List[dict] = []
+    last_fired = _last_fired(db, rules)
+    now = datetime.utcnow()
+    snapshots = _Snapshots(year, _data_version(db)) if rules else None
 
     for rule in rules:
         # Skip if in cooldown
-        if _is_in_cooldown(db, rule):
+        if _is_in_cooldown(rule, last_fired, now):
             continue
 
         evaluator = _EVALUATORS.get(rule.rule_type)
@@ -256,7 +340,7 @@ def evaluate_rules(db: Session, year: int = 2023) -> List[Alert]:
             continue
 
         try:
-            result = evaluator(rule, db, year)
+            result = evaluator(rule, db, year, snapshots)
         except Exception as exc:
             # Log but don't crash the whole engine
             print(f"[AlertEngine] Error evaluating rule {rule.id} ({rule.rule_type}): {exc}")
@@ -265,26 +349,49 @@ def evaluate_rules(db: Session, year: int = 2023) -> List[Alert]:
         if result is None:
             continue  # Threshold not breached
 
-        alert = Alert(
-            rule_id=rule.id,
-            user_id=rule.user_id,
-            severity=result["severity"],
-            status=AlertStatus.ACTIVE,
-            title=result["title"],
-            message=result["message"],
-            details=result.get("details"),
-        )
-        db.add(alert)
-        new_alerts.append(alert)
-
-    if new_alerts:
+        new_rows.append({
+            "rule_id": rule.id,
+            "user_id": rule.user_id,
+            "severity": result["severity"],
+            "status": AlertStatus.ACTIVE,
+            "title": result["title"],
+            "message": result["message"],
+            "details": result.get("details"),
+        })
+
+    if not new_rows:
+        return []
+
+    # One multi-row INSERT ... RETURNING hands back complete Alert objects
+    # (ids and server-side triggered_at included). The commit skips expiry
+    # so they stay loaded — otherwise the first attribute read on each one
+    # (notification dispatch, the /check response) would re-SELECT it.
+    new_alerts = list(db.scalars(
+        insert(Alert).returning(Alert, sort_by_parameter_order=True),
+        new_rows,
+    ))
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
         db.commit()
-        for a in new_alerts:
-            db.refresh(a)
-
+    finally:
+        db.expire_on_commit = expire_on_commit
     return new_alerts
 
 
+def evaluate_rules(db: Session, year: int = 2023) -> List[Alert]:
+    """
+    Evaluate ALL enabled alert rules for ALL users.
+    Returns list of newly-created Alert objects.
+    """
+    rules: List[AlertRule] = (
+        db.query(AlertRule)
+        .filter(AlertRule.is_enabled == True)  # noqa: E712
+        .all()
+    )
+    return _evaluate(db, rules, year)
+
+
 def evaluate_user_rules(db: Session, user_id: int, year: int = 2023) -> List[Alert]:
     """Evaluate rules for a single user (e.g., on-demand check)."""
     rules: List[AlertRule] = (
@@ -292,40 +399,4 @@ def evaluate_user_rules(db: Session, user_id: int, year: int = 2023) -> List[Ale
         .filter(AlertRule.user_id == user_id, AlertRule.is_enabled == True)  # noqa: E712
         .all()
     )
-
-    new_alerts: List[Alert] = []
-
-    for rule in rules:
-        if _is_in_cooldown(db, rule):
-            continue
-
-        evaluator = _EVALUATORS.get(rule.rule_type)
-        if not evaluator:
-            continue
-
-        try:
-            result = evaluator(rule, db, year)
-        except Exception:
-            continue
-
-        if result is None:
-            continue
-
-        alert = Alert(
-            rule_id=rule.id,
-            user_id=rule.user_id,
-            severity=result["severity"],
-            status=AlertStatus.ACTIVE,
-            title=result["title"],
-            message=result["message"],
-            details=result.get("details"),
-        )
-        db.add(alert)
-        new_alerts.append(alert)
-
-    if new_alerts:
-        db.commit()
-        for a in new_alerts:
-            db.refresh(a)
-
-    return new_alerts
+    return _evaluate(db, rules, year)
@@ -13,9 +13,17 @@ from __future__ import annotations
 
 import logging
 import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sqlalchemy import func as sqlfunc, and_, or_, case
 from sqlalchemy.orm import Session
 
@@ -24,23 +32,81 @@ from app.models.country import Country
 
 logger = logging.getLogger("gefo.analytics")
 
+# Worker cap for the dashboard's per-country anomaly scans (NumPy/sklearn
+# release the GIL, so threads scale)
+ANOMALY_SCAN_WORKERS = min(8, os.cpu_count() or 1)
+
+# Trade series are cached in process for polling dashboards:
+# (iso, direction, partner, granularity) → (cached_at, (values, labels)).
+# Cleared by clear_series_cache after imports and Comtrade refreshes write
+# trade_flows. Endpoints run on the threadpool, so access goes through
+# _series_lock.
+SERIES_FETCH_ROWS = 500  # yield_per batch for series queries
+SERIES_CACHE_TTL = 180  # seconds
+SERIES_CACHE_SIZE = 2048
+_series_cache: "OrderedDict[tuple, tuple[float, Tuple[np.ndarray, List[str]]]]" = OrderedDict()
+_series_lock = threading.Lock()
+
 
 # ═══════════════════════════════════════════════════════════════════
 #  1. TIME-SERIES HELPERS
 # ═══════════════════════════════════════════════════════════════════
 
+def _series_cache_get(key: tuple) -> Optional[Tuple[np.ndarray, List[str]]]:
+    with _series_lock:
+        entry = _series_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= SERIES_CACHE_TTL:
+            _series_cache.pop(key, None)
+            return None
+        _series_cache.move_to_end(key)
+        return entry[1]
+
+
+def _series_cache_put(key: tuple, series: Tuple[np.ndarray, List[str]]) -> None:
+    series[0].flags.writeable = False  # shared between callers
+    with _series_lock:
+        _series_cache[key] = (time.monotonic(), series)
+        _series_cache.move_to_end(key)
+        while len(_series_cache) > SERIES_CACHE_SIZE:
+            _series_cache.popitem(last=False)
+
+
+def clear_series_cache() -> None:
+    """Drop cached trade series (call after trade_flows changes)."""
+    with _series_lock:
+        _series_cache.clear()
+
+
 def _build_trade_series(
     db: Session,
     iso_code: str,
     direction: str = "total",
     partner_iso: Optional[str] = None,
     granularity: str = "annual",
-) -> Tuple[List[float], List[str]]:
+) -> Tuple[np.ndarray, List[str]]:
     """
     Build a time-series of trade values.
 
-    Returns (values, labels) where labels are "2020" or "2020-01".
+    Returns (values, labels): values as a read-only float64 array, labels
+    "2020" or "2020-01". Served from the series cache when fresh.
     """
+    key = (iso_code, direction, partner_iso, granularity)
+    series = _series_cache_get(key)
+    if series is None:
+        series = _query_trade_series(db, iso_code, direction, partner_iso, granularity)
+        _series_cache_put(key, series)
+    return series
+
+
+def _query_trade_series(
+    db: Session,
+    iso_code: str,
+    direction: str,
+    partner_iso: Optional[str],
+    granularity: str,
+) -> Tuple[np.ndarray, List[str]]:
     filters = []
     if direction == "export":
         filters.append(TradeFlow.exporter_iso == iso_code)
@@ -55,6 +121,10 @@ def _build_trade_series(
             or_(TradeFlow.exporter_iso == iso_code, TradeFlow.importer_iso == iso_code)
         )
 
+    # Rows stream in SERIES_FETCH_ROWS batches straight into a float64
+    # buffer + label list, in one pass
+    values = array("d")
+    labels: List[str] = []
     if granularity == "monthly":
         q = (
             db.query(
@@ -65,10 +135,11 @@ def _build_trade_series(
             .filter(*filters, TradeFlow.month.isnot(None))
             .group_by(TradeFlow.year, TradeFlow.month)
             .order_by(TradeFlow.year, TradeFlow.month)
-            .all()
+            .yield_per(SERIES_FETCH_ROWS)
         )
-        values = [float(r[2]) for r in q]
-        labels = [f"{r[0]}-{r[1]:02d}" for r in q]
+        for yr, month, total in q:
+            values.append(total)
+            labels.append(f"{yr}-{month:02d}")
     else:
         q = (
             db.query(
@@ -78,32 +149,96 @@ def _build_trade_series(
             .filter(*filters)
             .group_by(TradeFlow.year)
             .order_by(TradeFlow.year)
-            .all()
+            .yield_per(SERIES_FETCH_ROWS)
         )
-        values = [float(r[1]) for r in q]
-        labels = [str(r[0]) for r in q]
+        for yr, total in q:
+            values.append(total)
+            labels.append(str(yr))
 
-    return values, labels
+    return np.frombuffer(values, dtype=np.float64), labels
+
+
+def _build_export_series_many(
+    db: Session, iso_codes: List[str]
+) -> Dict[str, Tuple[np.ndarray, List[str]]]:
+    """
+    Annual export series for several countries in one grouped query.
+
+    Same (values, labels) shape as _build_trade_series(db, iso, "export"),
+    and shares its cache: only countries without a fresh entry are queried.
+    Countries without trade are absent from the result.
+    """
+    series: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+    missing = []
+    for iso in iso_codes:
+        cached = _series_cache_get((iso, "export", None, "annual"))
+        if cached is None:
+            missing.append(iso)
+        elif len(cached[0]):
+            series[iso] = cached
+    if not missing:
+        return series
+
+    q = (
+        db.query(
+            TradeFlow.exporter_iso,
+            TradeFlow.year,
+            sqlfunc.sum(TradeFlow.trade_value_usd),
+        )
+        .filter(TradeFlow.exporter_iso.in_(missing))
+        .group_by(TradeFlow.exporter_iso, TradeFlow.year)
+        .order_by(TradeFlow.exporter_iso, TradeFlow.year)
+        .all()
+    )
+    buckets: Dict[str, Tuple[List[float], List[str]]] = {iso: ([], []) for iso in missing}
+    for iso, yr, total in q:
+        values, labels = buckets[iso]
+        values.append(total)
+        labels.append(str(yr))
+    for iso, (values, labels) in buckets.items():
+        fetched = (np.array(values, dtype=np.float64), labels)
+        _series_cache_put((iso, "export", None, "annual"), fetched)
+        if values:
+            series[iso] = fetched
+    return series
+
+
+def _cagr(values: np.ndarray) -> Optional[float]:
+    """Compound Annual Growth Rate."""
+    if len(values) < 2 or values[0] <= 0:
+        return None
+    n = len(values) - 1
+    ratio = float(values[-1] / values[0])
+    if ratio <= 0:
+        return None
+    # ratio ** (1/n) - 1 in log space
+    return round(math.expm1(math.log(ratio) / n) * 100, 2)
 
 
-def _linear_trend(values: List[float]) -> Dict[str, Any]:
-    """Fit y = a + b*x via least-squares. Returns slope, intercept, r_squared."""
+def _linear_trend(values: np.ndarray) -> Dict[str, Any]:
+    """Fit y = a + b*x via least-squares. Returns slope, intercept, r_squared
+    and the series CAGR."""
     n = len(values)
     if n < 2:
-        return {"slope": 0, "intercept": values[0] if values else 0, "r_squared": 0}
-    x = np.arange(n, dtype=float)
-    y = np.array(values, dtype=float)
-    A = np.vstack([x, np.ones(n)]).T
-    result = np.linalg.lstsq(A, y, rcond=None)
-    slope, intercept = result[0]
-    ss_res = np.sum((y - (slope * x + intercept)) ** 2)
-    ss_tot = np.sum((y - np.mean(y)) ** 2)
+        return {"slope": 0, "intercept": float(values[0]) if n else 0, "r_squared": 0, "cagr": None}
+    # Closed-form simple OLS on x = 0..n-1 (no design matrix / SVD)
+    x_mean = (n - 1) / 2
+    dx = np.arange(n, dtype=float) - x_mean
+    y_mean = values.mean()
+    dy = values - y_mean
+    s_xx = n * (n * n - 1) / 12  # sum of dx**2
+    s_xy = float(dx @ dy)
+    ss_tot = float(dy @ dy)
+    slope = s_xy / s_xx
+    intercept = y_mean - slope * x_mean
+    ss_res = ss_tot - slope * s_xy
     r_sq = 1 - ss_res / ss_tot if ss_tot > 0 else 0
     return {
         "slope": round(float(slope), 2),
         "intercept": round(float(intercept), 2),
         "r_squared": round(float(r_sq), 4),
         "direction": "growing" if slope > 0 else "declining" if slope < 0 else "flat",
+        "cagr": _cagr(values),
     }
 
 
@@ -111,8 +246,51 @@ def _linear_trend(values: List[float]) -> Dict[str, Any]:
 #  2. FORECASTING
 # ═══════════════════════════════════════════════════════════════════
 
+@lru_cache(maxsize=1024)
+def _fit_holt_winters(
+    values: Tuple[float, ...], seasonal: Optional[str], seasonal_periods: Optional[int], horizon: int
+) -> Tuple[Tuple[float, ...], float]:
+    """Fit ExponentialSmoothing and return (forecast, residual std).
+
+    Memoised on the series itself: the dashboard, country and global views
+    forecast the same series repeatedly, and each fit runs the optimiser
+    from scratch.
+    """
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    y = np.array(values, dtype=float)
+    model = ExponentialSmoothing(
+        y,
+        trend="add",
+        seasonal=seasonal,
+        seasonal_periods=seasonal_periods,
+        initialization_method="estimated",
+    ).fit(optimized=True)
+
+    residuals = y - model.fittedvalues
+    return tuple(float(v) for v in model.forecast(horizon)), float(np.std(residuals))
+
+
+# A series with no linear trend and little spread is "flat": Holt-Winters
+# would collapse to roughly the mean, so the linear forecast is used instead
+FLAT_MAX_R_SQUARED = 0.05
+FLAT_MAX_CV = 0.05  # std / mean
+
+
+def _forecast(values: np.ndarray, trend: Dict[str, Any], horizon: int = 3) -> List[Dict[str, float]]:
+    """Forecast `values`, skipping the Holt-Winters fit for flat series."""
+    mean = float(values.mean()) if len(values) else 0.0
+    if (
+        len(values) >= 4
+        and trend["r_squared"] < FLAT_MAX_R_SQUARED
+        and float(values.std()) < FLAT_MAX_CV * abs(mean)
+    ):
+        return _forecast_linear(values, horizon, trend)
+    return _forecast_holt_winters(values, horizon=horizon)
+
+
 def _forecast_holt_winters(
-    values: List[float], horizon: int = 3
+    values: np.ndarray, horizon: int = 3
 ) -> List[Dict[str, float]]:
     """
     Holt-Winters / Exponential Smoothing forecast.
@@ -123,10 +301,6 @@ def _forecast_holt_winters(
         return _forecast_linear(values, horizon)
 
     try:
-        from statsmodels.tsa.holtwinters import ExponentialSmoothing
-
-        y = np.array(values, dtype=float)
-
         # Choose seasonal or non-seasonal based on series length
         seasonal = None
         seasonal_periods = None
@@ -136,20 +310,9 @@ def _forecast_holt_winters(
         elif len(values) >= 6:  # at least 2 cycles of a smaller period
             seasonal = None
 
-        model = ExponentialSmoothing(
-            y,
-            trend="add",
-            seasonal=seasonal,
-            seasonal_periods=seasonal_periods,
-            initialization_method="estimated",
-        ).fit(optimized=True)
-
-        forecast = model.forecast(horizon)
+        forecast, std = _fit_holt_winters(tuple(values.tolist()), seasonal, seasonal_periods, horizon)
 
         # Confidence intervals via residual std
-        residuals = y - model.fittedvalues
-        std = float(np.std(residuals))
-
         results = []
         for i, val in enumerate(forecast):
             ci_width = 1.28 * std * math.sqrt(i + 1)  # ~80% CI
@@ -166,13 +329,15 @@ def _forecast_holt_winters(
         return _forecast_linear(values, horizon)
 
 
-def _forecast_linear(values: List[float], horizon: int = 3) -> List[Dict[str, float]]:
-    """Simple linear extrapolation."""
+def _forecast_linear(
+    values: np.ndarray, horizon: int = 3, trend: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, float]]:
+    """Simple linear extrapolation (reuses `trend` when the caller has it)."""
     if len(values) < 2:
-        val = values[0] if values else 0
+        val = float(values[0]) if len(values) else 0
         return [{"predicted": val, "lower": val * 0.8, "upper": val * 1.2, "model": "linear"}] * horizon
 
-    trend = _linear_trend(values)
+    trend = trend or _linear_trend(values)
     n = len(values)
     std = float(np.std(values)) if len(values) > 2 else 0
 
@@ -193,82 +358,137 @@ def _forecast_linear(values: List[float], horizon: int = 3) -> List[Dict[str, fl
 #  3. ANOMALY DETECTION
 # ═══════════════════════════════════════════════════════════════════
 
+def _rolling_features(arr: np.ndarray, window: int) -> np.ndarray:
+    """Isolation Forest features, shape (n, 4): value, trailing mean, trailing
+    std (population), first difference. The trailing window for row i is
+    arr[max(0, i - window) : i + 1].
+
+    The series is NaN-padded at the front and viewed as overlapping windows
+    (no copies), so each window's mean/std is an exact two-pass reduction
+    done in one vectorised call.
+    """
+    padded = np.concatenate((np.full(window, np.nan), arr))
+    windows = sliding_window_view(padded, window + 1)
+    return np.column_stack((
+        arr,
+        np.nanmean(windows, axis=1),
+        np.nanstd(windows, axis=1),
+        np.diff(arr, prepend=arr[0]),
+    ))
+
+
+# Below this length the structural pass uses a MAD rule instead of a forest
+MAD_MIN_FOREST_POINTS = 30
+MAD_THRESHOLD = 3.0
+MAD_SCALE = 1.4826  # MAD → std for normal data
+
+
+def _mad_outliers(arr: np.ndarray) -> Tuple[Tuple[int, float], ...]:
+    """(index, robust z) of points beyond MAD_THRESHOLD scaled MADs of the median."""
+    median = np.median(arr)
+    mad = MAD_SCALE * np.median(np.abs(arr - median))
+    if mad < 1e-10:
+        return ()
+    robust_z = (arr - median) / mad
+    return tuple(
+        (i, float(robust_z[i])) for i in np.flatnonzero(np.abs(robust_z) > MAD_THRESHOLD).tolist()
+    )
+
+
+@lru_cache(maxsize=512)
+def _structural_outliers(values: Tuple[float, ...]) -> Tuple[str, Tuple[Tuple[int, float], ...]]:
+    """(method, ((index, score), ...)) for the structural-break pass.
+
+    Short series use the MAD rule (score = robust z); longer ones an
+    Isolation Forest over rolling features (score = decision function).
+    Memoised on the series: the forest is seeded, so a repeat fit on the
+    same values (scheduled reruns, dashboard reloads) would give the same
+    answer, and fitting is nearly all of the cost.
+    """
+    arr = np.array(values, dtype=np.float64)
+    if len(arr) < MAD_MIN_FOREST_POINTS:
+        return "mad", _mad_outliers(arr)
+
+    from sklearn.ensemble import IsolationForest
+
+    # Use rolling window features
+    window = min(6, len(arr) // 3)
+    X = _rolling_features(arr, window)
+    # n_jobs=1: the dashboard already scans countries on a thread pool
+    iso = IsolationForest(
+        contamination=0.1, random_state=42, n_estimators=50,
+        max_samples=min(256, len(X)), n_jobs=1,
+    )
+    preds = iso.fit_predict(X)
+    scores = iso.decision_function(X)
+    return "isolation_forest", tuple(
+        (i, float(score)) for i, (pred, score) in enumerate(zip(preds, scores)) if pred == -1
+    )
+
+
 def _detect_anomalies(
-    values: List[float], labels: List[str], threshold: float = 2.0
+    values: np.ndarray, labels: List[str], threshold: float = 2.0
 ) -> List[Dict[str, Any]]:
     """
-    Z-score anomaly detection + optional Isolation Forest.
+    Z-score anomaly detection + a structural-break pass (MAD rule for short
+    series, Isolation Forest for longer ones).
 
     Returns list of anomaly dicts with z_score, type, severity.
     """
     if len(values) < 5:
         return []
 
-    arr = np.array(values, dtype=float)
-    mean = float(np.mean(arr))
-    std = float(np.std(arr))
+    arr = np.asarray(values, dtype=np.float64)  # no copy for series arrays
+    mean = float(arr.mean())
+    dev = arr - mean
+    std = math.sqrt(float(dev @ dev) / len(arr))
     if std < 1e-10:
         return []
 
     anomalies = []
 
     # --- Z-score method ---
-    for i, (val, label) in enumerate(zip(values, labels)):
-        z = (val - mean) / std
-        if abs(z) >= threshold:
-            anomaly_type = "spike" if z > 0 else "drop"
-            severity = "critical" if abs(z) >= 3.5 else "high" if abs(z) >= 3 else "medium" if abs(z) >= 2.5 else "low"
-            anomalies.append({
-                "index": i,
-                "label": label,
-                "value": round(val, 2),
-                "expected": round(mean, 2),
-                "z_score": round(float(z), 2),
-                "type": anomaly_type,
-                "severity": severity,
-            })
+    z_scores = dev / std
+    for i in np.flatnonzero(np.abs(z_scores) >= threshold).tolist():
+        z = float(z_scores[i])
+        anomaly_type = "spike" if z > 0 else "drop"
+        severity = "critical" if abs(z) >= 3.5 else "high" if abs(z) >= 3 else "medium" if abs(z) >= 2.5 else "low"
+        anomalies.append({
+            "index": i,
+            "label": labels[i],
+            "value": round(float(values[i]), 2),
+            "expected": round(mean, 2),
+            "z_score": round(float(z), 2),
+            "type": anomaly_type,
+            "severity": severity,
+        })
 
-    # --- Isolation Forest (if sklearn available and enough data) ---
-    if len(values) >= 20:
+    # --- Structural breaks (MAD / Isolation Forest, if enough data) ---
+    # It only adds "structural_break" entries for otherwise calm series, so
+    # it is skipped once the z-score pass has already found a critical one.
+    has_critical = any(a["severity"] == "critical" for a in anomalies)
+    if len(values) >= 20 and not has_critical:
         try:
-            from sklearn.ensemble import IsolationForest
-
-            # Use rolling window features
-            window = min(6, len(values) // 3)
-            features = []
-            for i in range(len(values)):
-                start = max(0, i - window)
-                local_vals = arr[start:i + 1]
-                features.append([
-                    arr[i],
-                    float(np.mean(local_vals)),
-                    float(np.std(local_vals)) if len(local_vals) > 1 else 0,
-                    arr[i] - arr[i - 1] if i > 0 else 0,
-                ])
-
-            X = np.array(features)
-            iso = IsolationForest(contamination=0.1, random_state=42, n_estimators=100)
-            preds = iso.fit_predict(X)
-            scores = iso.decision_function(X)
-
-            for i, (pred, score) in enumerate(zip(preds, scores)):
-                if pred == -1:
-                    # Check if already detected by z-score
-                    already = any(a["index"] == i for a in anomalies)
-                    if not already:
-                        anomalies.append({
-                            "index": i,
-                            "label": labels[i],
-                            "value": round(values[i], 2),
-                            "expected": round(mean, 2),
-                            "z_score": round(float((values[i] - mean) / std), 2),
-                            "type": "structural_break",
-                            "severity": "medium",
-                            "method": "isolation_forest",
-                            "if_score": round(float(score), 4),
-                        })
+            method, outliers = _structural_outliers(tuple(arr.tolist()))
+            score_key = "if_score" if method == "isolation_forest" else "mad_z"
+
+            seen = {a["index"] for a in anomalies}
+            for i, score in outliers:
+                # Check if already detected by z-score
+                if i not in seen:
+                    anomalies.append({
+                        "index": i,
+                        "label": labels[i],
+                        "value": round(float(values[i]), 2),
+                        "expected": round(mean, 2),
+                        "z_score": round(float(z_scores[i]), 2),
+                        "type": "structural_break",
+                        "severity": "medium",
+                        "method": method,
+                        score_key: round(score, 4),
+                    })
         except Exception as e:
-            logger.debug("Isolation Forest skipped: %s", e)
+            logger.debug("Structural-break pass skipped: %s", e)
 
     anomalies.sort(key=lambda a: abs(a["z_score"]), reverse=True)
     return anomalies
@@ -285,59 +505,43 @@ def compute_yoy_growth(db: Session, year: int, limit: int = 30) -> List[Dict[str
     """
     prev_year = year - 1
 
-    # Subquery: total trade (exports + imports) per country per year
-    current = (
-        db.query(
-            TradeFlow.exporter_iso.label("iso"),
-            sqlfunc.sum(TradeFlow.trade_value_usd).label("total"),
-        )
-        .filter(TradeFlow.year == year)
-        .group_by(TradeFlow.exporter_iso)
-        .all()
+    # Both years pivoted in one grouped scan: total exports per country
+    curr = sqlfunc.sum(case((TradeFlow.year == year, TradeFlow.trade_value_usd), else_=0.0))
+    prev = sqlfunc.sum(case((TradeFlow.year == prev_year, TradeFlow.trade_value_usd), else_=0.0))
+    growth = case(
+        (prev > 0, (curr - prev) / prev * 100),
+        (curr > 0, 100.0),
+        else_=0.0,
     )
 
-    previous = (
+    rows = (
         db.query(
             TradeFlow.exporter_iso.label("iso"),
-            sqlfunc.sum(TradeFlow.trade_value_usd).label("total"),
+            sqlfunc.coalesce(Country.name, TradeFlow.exporter_iso).label("name"),
+            curr.label("curr"),
+            prev.label("prev"),
+            growth.label("growth"),
         )
-        .filter(TradeFlow.year == prev_year)
-        .group_by(TradeFlow.exporter_iso)
+        .outerjoin(Country, Country.iso_code == TradeFlow.exporter_iso)
+        .filter(TradeFlow.year.in_([year, prev_year]))
+        .group_by(TradeFlow.exporter_iso, Country.name)
+        .order_by(growth.desc())
+        .limit(limit)
         .all()
     )
 
-    curr_map = {r.iso: float(r.total) for r in current}
-    prev_map = {r.iso: float(r.total) for r in previous}
-
-    all_isos = set(curr_map.keys()) | set(prev_map.keys())
-
-    # Country name lookup
-    countries = db.query(Country.iso_code, Country.name).all()
-    name_map = {c.iso_code: c.name for c in countries}
-
-    results = []
-    for iso in all_isos:
-        curr_val = curr_map.get(iso, 0)
-        prev_val = prev_map.get(iso, 0)
-        if prev_val > 0:
-            growth = ((curr_val - prev_val) / prev_val) * 100
-        elif curr_val > 0:
-            growth = 100.0
-        else:
-            growth = 0.0
-
-        results.append({
-            "iso_code": iso,
-            "name": name_map.get(iso, iso),
-            "current_value": round(curr_val, 2),
-            "previous_value": round(prev_val, 2),
-            "change_usd": round(curr_val - prev_val, 2),
-            "growth_pct": round(growth, 2),
+    return [
+        {
+            "iso_code": r.iso,
+            "name": r.name,
+            "current_value": round(float(r.curr), 2),
+            "previous_value": round(float(r.prev), 2),
+            "change_usd": round(float(r.curr) - float(r.prev), 2),
+            "growth_pct": round(float(r.growth), 2),
             "year": year,
-        })
-
-    results.sort(key=lambda r: r["growth_pct"], reverse=True)
-    return results[:limit]
+        }
+        for r in rows
+    ]
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -359,7 +563,7 @@ def country_trade_analytics(
     """
     values, labels = _build_trade_series(db, iso_code, direction, granularity="annual")
 
-    if not values:
+    if len(values) == 0:
         return {
             "iso_code": iso_code,
             "direction": direction,
@@ -368,7 +572,7 @@ def country_trade_analytics(
         }
 
     trend = _linear_trend(values)
-    forecast = _forecast_holt_winters(values, horizon=horizon)
+    forecast = _forecast(values, trend, horizon=horizon)
     anomalies = _detect_anomalies(values, labels)
 
     # Forecast labels
@@ -384,7 +588,7 @@ def country_trade_analytics(
         "data_points": len(values),
         "historical": {
             "labels": labels,
-            "values": [round(v, 2) for v in values],
+            "values": np.round(values, 2).tolist(),
         },
         "trend": trend,
         "forecast": {
@@ -393,27 +597,16 @@ def country_trade_analytics(
         },
         "anomalies": anomalies,
         "summary": {
-            "min": round(min(values), 2),
-            "max": round(max(values), 2),
-            "mean": round(float(np.mean(values)), 2),
-            "std": round(float(np.std(values)), 2),
-            "latest": round(values[-1], 2),
-            "cagr": _cagr(values),
+            "min": round(float(values.min()), 2),
+            "max": round(float(values.max()), 2),
+            "mean": round(float(values.mean()), 2),
+            "std": round(float(values.std()), 2),
+            "latest": round(float(values[-1]), 2),
+            "cagr": trend["cagr"],
         },
     }
 
 
-def _cagr(values: List[float]) -> Optional[float]:
-    """Compound Annual Growth Rate."""
-    if len(values) < 2 or values[0] <= 0:
-        return None
-    n = len(values) - 1
-    ratio = values[-1] / values[0]
-    if ratio <= 0:
-        return None
-    return round((ratio ** (1 / n) - 1) * 100, 2)
-
-
 # ═══════════════════════════════════════════════════════════════════
 #  6. TOP MOVERS & GLOBAL ANALYTICS
 # ═══════════════════════════════════════════════════════════════════
@@ -445,18 +638,24 @@ def global_trade_trend(db: Session) -> Dict[str, Any]:
         )
         .group_by(TradeFlow.year)
         .order_by(TradeFlow.year)
-        .all()
+        .yield_per(SERIES_FETCH_ROWS)
     )
 
-    if not q:
+    labels: List[str] = []
+    totals = array("d")
+    flow_counts: List[int] = []
+    for yr, total, flow_count in q:
+        labels.append(str(yr))
+        totals.append(total)
+        flow_counts.append(int(flow_count))
+
+    if not labels:
         return {"labels": [], "values": [], "trend": {}, "flow_counts": []}
 
-    labels = [str(r.year) for r in q]
-    values = [round(float(r.total), 2) for r in q]
-    flow_counts = [int(r.flow_count) for r in q]
-
-    trend = _linear_trend(values)
-    forecast = _forecast_holt_winters(values, horizon=3)
+    series = np.round(np.frombuffer(totals, dtype=np.float64), 2)
+    values = series.tolist()
+    trend = _linear_trend(series)
+    forecast = _forecast(series, trend, horizon=3)
 
     forecast_labels = []
     if labels:
@@ -474,7 +673,7 @@ def global_trade_trend(db: Session) -> Dict[str, Any]:
             "min": round(min(values), 2),
             "max": round(max(values), 2),
             "latest": round(values[-1], 2),
-            "cagr": _cagr(values),
+            "cagr": trend["cagr"],
         },
     }
 
@@ -500,20 +699,26 @@ def analytics_dashboard(db: Session, year: int) -> Dict[str, Any]:
     critical_anomalies = 0
     country_anomalies: List[Dict[str, Any]] = []
 
-    for (iso,) in top_countries:
-        values, labels = _build_trade_series(db, iso, "export", granularity="annual")
-        if len(values) >= 5:
-            anomalies = _detect_anomalies(values, labels)
-            if anomalies:
-                total_anomalies += len(anomalies)
-                critical = sum(1 for a in anomalies if a["severity"] in ("critical", "high"))
-                critical_anomalies += critical
-                country_anomalies.append({
-                    "iso_code": iso,
-                    "count": len(anomalies),
-                    "critical": critical,
-                    "worst_z": anomalies[0]["z_score"] if anomalies else 0,
-                })
+    # All DB work happens here; the scans below only see in-memory arrays
+    series = _build_export_series_many(db, [iso for (iso,) in top_countries])
+    scannable = [
+        (iso, series[iso]) for (iso,) in top_countries
+        if iso in series and len(series[iso][0]) >= 5
+    ]
+    with ThreadPoolExecutor(max_workers=ANOMALY_SCAN_WORKERS) as pool:
+        scans = list(pool.map(lambda item: _detect_anomalies(*item[1]), scannable))
+
+    for (iso, _), anomalies in zip(scannable, scans):
+        if anomalies:
+            total_anomalies += len(anomalies)
+            critical = sum(1 for a in anomalies if a["severity"] in ("critical", "high"))
+            critical_anomalies += critical
+            country_anomalies.append({
+                "iso_code": iso,
+                "count": len(anomalies),
+                "critical": critical,
+                "worst_z": anomalies[0]["z_score"] if anomalies else 0,
+            })
 
     country_anomalies.sort(key=lambda c: abs(c.get("worst_z", 0)), reverse=True)
 
@@ -120,8 +120,10 @@ def _get_density_near(
     # Fallback to spatial proximity
     spatial_q = db.query(func.avg(ShippingDensity.density_value)).filter(
         ShippingDensity.year == year,
-        ShippingDensity.lat.between(lat - radius, lat + radius),
-        ShippingDensity.lon.between(lon - radius, lon + radius),
+        func.ST_Intersects(
+            ShippingDensity.geom,
+            func.ST_MakeEnvelope(lon - radius, lat - radius, lon + radius, lat + radius, 4326),
+        ),
     )
     if quarter:
         spatial_q = spatial_q.filter(
@@ -25,12 +25,21 @@ import pandas as pd
 from sqlalchemy.orm import Session
 from sqlalchemy import text as sqla_text
 
+try:
+    from datasketch import HyperLogLog
+except ImportError:  # optional; jobs just skip the duplicate-key sketch
+    HyperLogLog = None
+
 from app.core.database import SessionLocal
-from app.models.import_job import ImportJob, DataSource
+from app.ingestion.bulk_load import copy_rows
+from app.models.import_job import ImportJob, ImportJobError, DataSource
 from app.models.trade_flow import TradeFlow
 from app.models.country import Country
 from app.models.port import Port
 from app.models.shipping_density import ShippingDensity
+from app.services.alert_engine import clear_snapshot_cache
+from app.services.analytics import clear_series_cache
+from app.services.partner_summary import refresh_view as refresh_partner_view
 from app.services.validation import (
     auto_map_columns,
     validate_rows,
@@ -52,7 +61,98 @@ TABLE_MODELS = {
     "shipping_density": ShippingDensity,
 }
 
-BATCH_SIZE = 500  # rows per bulk insert batch
+BATCH_SIZE = 10_000  # rows per bulk insert batch
+
+# Row errors are COPYed into import_job_errors and served a page at a time
+ERROR_COLUMNS = ["job_id", "row_num", "field", "error"]
+ERROR_PAGE_SIZE = 500
+
+# Conflict targets for import_mode="upsert" — the table's unique key, as
+# (ON CONFLICT target, key columns used to dedup rows within a batch).
+# Tables without a natural key (shipping_density) upsert as plain appends.
+UPSERT_KEYS = {
+    "trade_flows": (
+        "(exporter_iso, importer_iso, year, COALESCE(month, 0), flow_type,"
+        " COALESCE(commodity_code, ''))",
+        ("exporter_iso", "importer_iso", "year", "month", "flow_type", "commodity_code"),
+    ),
+    "countries": ("(iso_code)", ("iso_code",)),
+    "ports": ("(unlocode)", ("unlocode",)),
+}
+# Key columns the conflict target wraps in COALESCE, so NULLs there still
+# conflict. A NULL in any other key column never matches the unique index.
+UPSERT_COALESCED_KEYS = {"trade_flows": ("month", "commodity_code")}
+
+
+def _upsert_clause(target_table: str, columns: List[str]) -> Optional[str]:
+    """ON CONFLICT ... DO UPDATE clause for `target_table`, or None."""
+    if target_table not in UPSERT_KEYS:
+        return None
+    conflict_target, key_cols = UPSERT_KEYS[target_table]
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in key_cols)
+    if not updates:
+        return f"{conflict_target} DO NOTHING"
+    return f"{conflict_target} DO UPDATE SET {updates}"
+
+
+# HyperLogLog precision: 2^14 one-byte registers (~16 KB), ~0.8% error
+HLL_PRECISION = 14
+
+
+def _key_sketch(rows: List[Dict[str, Any]], target_table: str) -> Optional["HyperLogLog"]:
+    """HyperLogLog of the rows' natural keys, or None if unavailable."""
+    if HyperLogLog is None or target_table not in UPSERT_KEYS:
+        return None
+    key_cols = UPSERT_KEYS[target_table][1]
+    hll = HyperLogLog(p=HLL_PRECISION)
+    for r in rows:
+        hll.update("\x1f".join("" if r.get(c) is None else str(r[c]) for c in key_cols).encode())
+    return hll
+
+
+def _sketch_bytes(hll: "HyperLogLog") -> bytes:
+    buf = bytearray(hll.bytesize())
+    hll.serialize(buf)
+    return bytes(buf)
+
+
+def estimate_imported_keys(db: Session, target_table: str) -> Optional[int]:
+    """Approximate distinct natural keys across all completed imports into
+    `target_table`, from the union of their stored sketches."""
+    if HyperLogLog is None:
+        return None
+    sketches = [
+        s for (s,) in db.query(ImportJob.dedup_sketch).filter(
+            ImportJob.target_table == target_table,
+            ImportJob.status == "completed",
+            ImportJob.dedup_sketch.isnot(None),
+        )
+    ]
+    if not sketches:
+        return None
+    merged = HyperLogLog.deserialize(sketches[0])
+    for s in sketches[1:]:
+        merged.merge(HyperLogLog.deserialize(s))
+    return int(merged.count())
+
+
+def _dedup_last(
+    rows: List[Dict[str, Any]],
+    key_cols: Tuple[str, ...],
+    coalesced: Tuple[str, ...] = (),
+) -> List[Dict[str, Any]]:
+    """Keep the last row per key — one INSERT ... ON CONFLICT DO UPDATE
+    can't touch the same target row twice. Rows with a NULL in a key column
+    outside `coalesced` never conflict, so they all pass through."""
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    unkeyed: List[Dict[str, Any]] = []
+    for r in rows:
+        key = tuple(r.get(c) for c in key_cols)
+        if any(v is None and c not in coalesced for c, v in zip(key_cols, key)):
+            unkeyed.append(r)
+        else:
+            latest[key] = r
+    return list(latest.values()) + unkeyed
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -214,8 +314,15 @@ def execute_import(
     job.valid_rows = len(importable)
     job.error_rows = len(set(e["row"] for e in errors))
     job.skipped_rows = job.total_rows - len(importable)
-    job.error_log = errors[:500]  # cap error log at 500 entries
     job.progress_pct = 30.0
+    _store_errors(db, job.id, errors)
+
+    # Fixed-size duplicate check: valid_rows - distinct_keys ≈ rows that
+    # repeat another row's key within this file
+    sketch = _key_sketch(importable, target_table)
+    if sketch is not None:
+        job.distinct_keys = int(sketch.count())
+        job.dedup_sketch = _sketch_bytes(sketch)
     db.commit()
 
     if not importable:
@@ -244,25 +351,38 @@ def execute_import(
                 db.query(model_class).delete()
             db.commit()
 
-        # Bulk insert in batches
+        # Validated rows all carry the same schema columns (None where the
+        # file had no value), so each batch streams through COPY as-is.
+        columns = [c for c in TABLE_SCHEMAS[target_table] if hasattr(model_class, c)]
+        # Tables with a unique natural key never take a plain COPY: upserts
+        # update existing rows, other modes skip rows already present.
+        if import_mode == "upsert":
+            # Only overwrite columns the file actually maps; the rest come
+            # through validation as None and would NULL out existing values
+            mapped = set(column_mapping.values())
+            on_conflict = _upsert_clause(target_table, [c for c in columns if c in mapped])
+        elif target_table in UPSERT_KEYS:
+            on_conflict = f"{UPSERT_KEYS[target_table][0]} DO NOTHING"
+        else:
+            on_conflict = None
+
+        # Each batch and its progress update share a single short commit.
         imported_count = 0
         for i in range(0, len(importable), BATCH_SIZE):
             batch = importable[i : i + BATCH_SIZE]
-            objects = []
-            for row_data in batch:
-                # Filter to only columns that exist on the model
-                filtered = {
-                    k: v for k, v in row_data.items()
-                    if hasattr(model_class, k) and v is not None
-                }
-                objects.append(model_class(**filtered))
-
-            db.bulk_save_objects(objects)
-            db.commit()
-            imported_count += len(batch)
+            loaded = batch
+            if import_mode == "upsert" and on_conflict:
+                loaded = _dedup_last(
+                    batch, UPSERT_KEYS[target_table][1],
+                    UPSERT_COALESCED_KEYS.get(target_table, ()),
+                )
+            written = copy_rows(db, model_class, columns, loaded, on_conflict=on_conflict)
+            imported_count += written
+            # Rows superseded within the file or already in the table
+            job.skipped_rows += len(batch) - written
 
             # Update progress (30% parse/validate + 70% insert)
-            pct = 30 + (imported_count / len(importable) * 70)
+            pct = 30 + (min(i + BATCH_SIZE, len(importable)) / len(importable) * 70)
             job.progress_pct = round(pct, 1)
             job.imported_rows = imported_count
             db.commit()
@@ -273,6 +393,7 @@ def execute_import(
         job.imported_rows = imported_count
         job.completed_at = datetime.now(timezone.utc)
         db.commit()
+        _refresh_derived(db, target_table)
 
         return {
             "status": "completed",
@@ -281,16 +402,51 @@ def execute_import(
             "imported_rows": imported_count,
             "skipped_rows": job.skipped_rows,
             "error_rows": job.error_rows,
+            "distinct_keys": job.distinct_keys,
             "errors": errors[:20],
         }
 
     except Exception as e:
         db.rollback()
         _fail_job(db, job, f"Import error: {e}")
+        # Batches committed before the failure stay in the table
+        _refresh_derived(db, target_table)
         logger.error("Import failed for job %d: %s", job_id, e, exc_info=True)
         return {"error": f"Import failed: {e}"}
 
 
+def _refresh_derived(db: Session, target_table: str):
+    """Drop caches and recompute views derived from `target_table`.
+
+    Upserts rewrite rows in place, which the alert snapshots' max-id data
+    version can't see, so the snapshot cache is always cleared.
+    """
+    clear_snapshot_cache()
+    if target_table != "trade_flows":
+        return
+    clear_series_cache()
+    try:
+        refresh_partner_view(db.connection())
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Top-partner view refresh after import failed: %s", e)
+
+
+def _store_errors(db: Session, job_id: int, errors: List[Dict[str, Any]]):
+    """Append validation errors to import_job_errors (commits with the caller)."""
+    for i in range(0, len(errors), BATCH_SIZE):
+        copy_rows(db, ImportJobError, ERROR_COLUMNS, [
+            {
+                "job_id": job_id,
+                "row_num": e["row"],
+                "field": (e.get("field") or "")[:100] or None,
+                "error": str(e["error"]),
+            }
+            for e in errors[i : i + BATCH_SIZE]
+        ])
+
+
 def _fail_job(db: Session, job: ImportJob, message: str):
     """Mark job as failed."""
     job.status = "failed"
@@ -360,8 +516,28 @@ def get_import_jobs(
     ]
 
 
-def get_import_job_detail(db: Session, job_id: int) -> Optional[Dict[str, Any]]:
-    """Get full detail of a single import job including error log."""
+def get_import_job_errors(
+    db: Session, job: ImportJob, offset: int = 0, limit: int = ERROR_PAGE_SIZE
+) -> List[Dict[str, Any]]:
+    """One page of a job's row errors, in row order."""
+    rows = (
+        db.query(ImportJobError.row_num, ImportJobError.field, ImportJobError.error)
+        .filter(ImportJobError.job_id == job.id)
+        .order_by(ImportJobError.row_num, ImportJobError.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    if rows or offset:
+        return [{"row": r, "field": f or "", "error": e} for r, f, e in rows]
+    # Jobs from before import_job_errors kept their errors inline
+    return (job.error_log or [])[:limit]
+
+
+def get_import_job_detail(
+    db: Session, job_id: int, error_offset: int = 0, error_limit: int = ERROR_PAGE_SIZE
+) -> Optional[Dict[str, Any]]:
+    """Get full detail of a single import job including a page of its error log."""
     j = db.query(ImportJob).get(job_id)
     if not j:
         return None
@@ -377,10 +553,11 @@ def get_import_job_detail(db: Session, job_id: int) -> Optional[Dict[str, Any]]:
         "imported_rows": j.imported_rows,
         "error_rows": j.error_rows,
         "skipped_rows": j.skipped_rows,
+        "distinct_keys": j.distinct_keys,
         "column_mapping": j.column_mapping,
         "import_mode": j.import_mode,
         "year_filter": j.year_filter,
-        "error_log": j.error_log,
+        "error_log": get_import_job_errors(db, j, error_offset, error_limit),
         "error_summary": j.error_summary,
         "preview_data": j.preview_data,
         "created_at": j.created_at.isoformat() if j.created_at else None,
@@ -448,7 +625,8 @@ def create_data_source(
 # ═══════════════════════════════════════════════════════════════════
 
 def get_table_stats(db: Session) -> Dict[str, Any]:
-    """Get row counts and basic stats for importable tables."""
+    """Get row counts, year ranges and approximate distinct imported keys
+    for importable tables."""
     stats = {}
     for table_name, model in TABLE_MODELS.items():
         try:
@@ -465,6 +643,8 @@ def get_table_stats(db: Session) -> Dict[str, Any]:
             stats[table_name] = {
                 "row_count": count,
                 "year_range": year_range,
+                # Union of completed jobs' key sketches (None without datasketch)
+                "imported_distinct_keys": estimate_imported_keys(db, table_name),
             }
         except Exception as e:
             stats[table_name] = {"row_count": 0, "error": str(e)}
@@ -6,10 +6,12 @@ import hashlib
 import hmac
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 import httpx
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -133,31 +135,57 @@ async def send_webhook_notification(channel: NotificationChannel, alert: Alert)
 
 # ── Dispatch all channels for an alert ───────────────────────────────────
 
+async def _deliver(alert: Alert, channels: List[NotificationChannel]) -> tuple[bool, bool]:
+    """Send one alert to its user's channels. Returns (email_sent, webhook_sent)."""
+    email_sent = webhook_sent = False
+    for ch in channels:
+        if ch.channel_type == ChannelType.EMAIL:
+            if await send_email_notification(ch, alert):
+                email_sent = True
+        elif ch.channel_type == ChannelType.WEBHOOK:
+            if await send_webhook_notification(ch, alert):
+                webhook_sent = True
+    return email_sent, webhook_sent
+
+
 async def dispatch_notifications(db: Session, alert: Alert) -> None:
     """Send alert to all enabled notification channels for the alert's user."""
-    channels: List[NotificationChannel] = (
+    await dispatch_all_new_alerts(db, [alert])
+
+
+async def dispatch_all_new_alerts(db: Session, alerts: List[Alert]) -> None:
+    """Dispatch notifications for a batch of newly-created alerts.
+
+    Channels for every user in the batch are loaded in one query, and the
+    delivery flags are written afterwards as one UPDATE per flag with a
+    single commit. Don't set flags per alert and commit inside the loop.
+    """
+    if not alerts:
+        return
+
+    user_ids = {a.user_id for a in alerts}
+    channels_by_user: Dict[int, List[NotificationChannel]] = defaultdict(list)
+    for ch in (
         db.query(NotificationChannel)
         .filter(
-            NotificationChannel.user_id == alert.user_id,
+            NotificationChannel.user_id.in_(user_ids),
             NotificationChannel.is_enabled == True,  # noqa: E712
         )
         .all()
-    )
-
-    for ch in channels:
-        if ch.channel_type == ChannelType.EMAIL:
-            ok = await send_email_notification(ch, alert)
-            if ok:
-                alert.email_sent = True
-        elif ch.channel_type == ChannelType.WEBHOOK:
-            ok = await send_webhook_notification(ch, alert)
-            if ok:
-                alert.webhook_sent = True
+    ):
+        channels_by_user[ch.user_id].append(ch)
 
-    db.commit()
-
-
-async def dispatch_all_new_alerts(db: Session, alerts: List[Alert]) -> None:
-    """Dispatch notifications for a batch of newly-created alerts."""
+    email_ids: List[int] = []
+    webhook_ids: List[int] = []
     for alert in alerts:
-        await dispatch_notifications(db, alert)
+        email_sent, webhook_sent = await _deliver(alert, channels_by_user[alert.user_id])
+        if email_sent:
+            email_ids.append(alert.id)
+        if webhook_sent:
+            webhook_ids.append(alert.id)
+
+    if email_ids:
+        db.execute(update(Alert).where(Alert.id.in_(email_ids)).values(email_sent=True))
+    if webhook_ids:
+        db.execute(update(Alert).where(Alert.id.in_(webhook_ids)).values(webhook_sent=True))
+    db.commit()
@@ -0,0 +1,74 @@
+"""
+Country-Year Top Partner View
+─────────────────────────────
+Country profiles show, per year, total exports/imports and the single
+largest partner on each side. Computing that from trade_flows means one
+grouped scan per year per direction; mv_country_year_top_partners holds
+the answer precomputed (one row per country × year × direction). It is
+refreshed at scheduler start, nightly, and after the globe seed, trade-flow
+imports and Comtrade refreshes.
+
+The view is created by init_db, still empty at that point (and on first
+refresh for databases that predate it). Its unique index lets REFRESH ... CONCURRENTLY run without
+blocking profile reads.
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("gefo.services.partner_summary")
+
+VIEW_NAME = "mv_country_year_top_partners"
+
+_CREATE_VIEW = f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {VIEW_NAME} AS
+WITH pairs AS (
+    SELECT exporter_iso AS country_iso, year, 'export' AS direction,
+           importer_iso AS partner_iso, SUM(trade_value_usd) AS value_usd
+    FROM trade_flows
+    GROUP BY exporter_iso, importer_iso, year
+    UNION ALL
+    SELECT importer_iso, year, 'import',
+           exporter_iso, SUM(trade_value_usd)
+    FROM trade_flows
+    GROUP BY importer_iso, exporter_iso, year
+), ranked AS (
+    SELECT pairs.*,
+           ROW_NUMBER() OVER w_rank AS rn,
+           SUM(value_usd) OVER w_all AS total_value_usd
+    FROM pairs
+    WINDOW w_all AS (PARTITION BY country_iso, year, direction),
+           w_rank AS (w_all ORDER BY value_usd DESC, partner_iso)
+)
+SELECT country_iso, year, direction, partner_iso,
+       value_usd AS partner_value_usd, total_value_usd
+FROM ranked
+WHERE rn = 1
+"""
+
+_CREATE_INDEX = (
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{VIEW_NAME} "
+    f"ON {VIEW_NAME} (country_iso, year, direction)"
+)
+
+
+def ensure_view(conn: Connection) -> None:
+    """Create the view (populated) and its unique index if missing."""
+    conn.execute(text(_CREATE_VIEW))
+    conn.execute(text(_CREATE_INDEX))
+
+
+def refresh_view(conn: Connection) -> None:
+    """Recompute the view without blocking readers."""
+    ensure_view(conn)
+    conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {VIEW_NAME}"))
+
+
+def year_summaries(db: Session, iso: str) -> list:
+    """(year, direction, partner_iso, total_value_usd) rows for one country."""
+    return db.execute(text(
+        f"SELECT year, direction, partner_iso, total_value_usd FROM {VIEW_NAME} "
+        "WHERE country_iso = :iso ORDER BY year"
+    ), {"iso": iso}).all()
@@ -72,8 +72,10 @@ def _nearby_density(db: Session, lat: float, lon: float, year: int, radius_deg:
         db.query(func.avg(ShippingDensity.density_value))
         .filter(
             ShippingDensity.year == year,
-            ShippingDensity.lat.between(lat - radius_deg, lat + radius_deg),
-            ShippingDensity.lon.between(lon - radius_deg, lon + radius_deg),
+            func.ST_Intersects(
+                ShippingDensity.geom,
+                func.ST_MakeEnvelope(lon - radius_deg, lat - radius_deg, lon + radius_deg, lat + radius_deg, 4326),
+            ),
         )
         .scalar()
     )
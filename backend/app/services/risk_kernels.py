@@ -0,0 +1,62 @@
+"""
+Vectorised risk kernels — Phase 6
+──────────────────────────────────
+NumPy implementations of the per-country × per-zone loops used by
+risk_scoring. Inputs are plain arrays so the scorer can load each table
+once and score every country in a single call.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Impact of a conflict zone on a country it lists as affected
+AFFECTED_SEVERITY = {"critical": 90, "high": 70, "moderate": 45, "low": 20}
+AFFECTED_DEFAULT = 30
+# Peak impact on nearby countries, falling off linearly to 0 at 3× radius
+PROXIMITY_SEVERITY = {"critical": 80, "high": 60, "moderate": 35, "low": 15}
+PROXIMITY_DEFAULT = 25
+
+
+def haversine_matrix(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km, shape (len(lat1), len(lat2))."""
+    p1 = np.radians(lat1)[:, None]
+    p2 = np.radians(lat2)[None, :]
+    dlat = p2 - p1
+    dlon = np.radians(lon2)[None, :] - np.radians(lon1)[:, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def conflict_score_batch(
+    country_lat: np.ndarray,
+    country_lon: np.ndarray,
+    affected: np.ndarray,
+    zone_lat: np.ndarray,
+    zone_lon: np.ndarray,
+    zone_radius_km: np.ndarray,
+    zone_severity: list[str],
+) -> np.ndarray:
+    """Conflict score (0-100) for every country against every active zone.
+
+    `affected` is a (n_countries, n_zones) bool matrix: True where the zone
+    lists the country in affected_countries. Such pairs score the zone's
+    flat severity; all others score by distance. Each country keeps its
+    worst zone.
+    """
+    n_countries = len(country_lat)
+    if n_countries == 0 or len(zone_lat) == 0:
+        return np.zeros(n_countries)
+
+    flat = np.array([AFFECTED_SEVERITY.get(s, AFFECTED_DEFAULT) for s in zone_severity], dtype=float)
+    peak = np.array([PROXIMITY_SEVERITY.get(s, PROXIMITY_DEFAULT) for s in zone_severity], dtype=float)
+
+    reach = np.asarray(zone_radius_km, dtype=float) * 3
+    dist = haversine_matrix(
+        np.asarray(country_lat, dtype=float), np.asarray(country_lon, dtype=float),
+        np.asarray(zone_lat, dtype=float), np.asarray(zone_lon, dtype=float),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        proximity = np.where(dist < reach, peak * (1 - dist / reach), 0.0)
+
+    impact = np.where(affected, flat, proximity)
+    return np.minimum(100.0, impact.max(axis=1))
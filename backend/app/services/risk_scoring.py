@@ -10,42 +10,39 @@ Computes composite risk scores per country based on:
 
 Provides supply-chain vulnerability assessment for key trade routes.
 """
-import json
 import math
 import logging
 from typing import Optional
 
-from sqlalchemy import func
+import numpy as np
+from sqlalchemy import case, func, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
+from app.core.database import UTC_NOW
+
 from app.models.country import Country
 from app.models.chokepoint import Chokepoint
 from app.models.trade_flow import TradeFlow
 from app.models.port import Port
 from app.models.geopolitical import (
     SanctionedEntity, ConflictZone, CountryRiskScore, SupplyChainRoute,
+    RISK_WEIGHTS, RISK_THRESHOLDS,
 )
 from app.services.energy_corridor import compute_energy_corridor_exposure
 from app.services.chokepoint_monitor import monitor_chokepoints
+from app.services.risk_kernels import conflict_score_batch
 
 logger = logging.getLogger("gefo.services.risk_scoring")
 
-# ─── Weights for composite score ───
-RISK_WEIGHTS = {
-    "sanctions": 0.30,
-    "conflict": 0.25,
-    "trade_dependency": 0.15,
-    "chokepoint": 0.15,
-    "energy": 0.15,
-}
+# Rows per multi-row upsert; 7 params/row stays well under PostgreSQL's
+# 65535 bind-parameter limit
+RISK_UPSERT_BATCH_SIZE = 5_000
 
-RISK_THRESHOLDS = [
-    (80, "critical"),
-    (60, "high"),
-    (40, "elevated"),
-    (20, "moderate"),
-    (0, "low"),
-]
+_RISK_SCORE_COLUMNS = (
+    "sanctions_score", "conflict_score", "trade_dependency_score",
+    "chokepoint_vulnerability", "energy_risk_score",
+)
 
 
 def _risk_level(score: float) -> str:
@@ -72,6 +69,10 @@ def _sanctions_score(db: Session, iso: str) -> float:
         SanctionedEntity.is_active == True,  # noqa
     ).scalar() or 0
 
+    return _sanctions_formula(count, bodies)
+
+
+def _sanctions_formula(count: int, bodies: int) -> float:
     if count == 0:
         return 0.0
 
@@ -83,38 +84,38 @@ def _sanctions_score(db: Session, iso: str) -> float:
     return min(100, base + body_bonus)
 
 
-def _conflict_score(db: Session, iso: str, country_lat: float, country_lon: float) -> float:
-    """Score 0-100 based on proximity to active conflict zones."""
-    zones = db.query(ConflictZone).filter(ConflictZone.is_active == True).all()  # noqa
-    if not zones:
-        return 0.0
-
-    max_impact = 0.0
-    for zone in zones:
-        # Check if country is in affected list
-        affected = []
-        if zone.affected_countries:
-            try:
-                affected = json.loads(zone.affected_countries)
-            except (json.JSONDecodeError, TypeError):
-                affected = []
-
-        if iso in affected:
-            severity_map = {"critical": 90, "high": 70, "moderate": 45, "low": 20}
-            impact = severity_map.get(zone.severity, 30)
-            max_impact = max(max_impact, impact)
-            continue
-
-        # Distance-based falloff
-        dist_km = _haversine(country_lat, country_lon, zone.lat, zone.lon)
-        if dist_km < zone.radius_km * 3:
-            severity_map = {"critical": 80, "high": 60, "moderate": 35, "low": 15}
-            base = severity_map.get(zone.severity, 25)
-            # Linear falloff within 3x radius
-            falloff = max(0, 1 - (dist_km / (zone.radius_km * 3)))
-            max_impact = max(max_impact, base * falloff)
-
-    return min(100, max_impact)
+def _sanctions_scores(db: Session) -> dict[str, float]:
+    """_sanctions_score for every sanctioned country, in one grouped query."""
+    rows = db.query(
+        SanctionedEntity.country_iso,
+        func.count(SanctionedEntity.id),
+        func.count(func.distinct(SanctionedEntity.sanctioning_body)),
+    ).filter(
+        SanctionedEntity.is_active == True,  # noqa
+        SanctionedEntity.country_iso.isnot(None),
+    ).group_by(SanctionedEntity.country_iso).all()
+    return {iso: _sanctions_formula(count, bodies) for iso, count, bodies in rows}
+
+
+def _load_active_zones(db: Session) -> list[ConflictZone]:
+    return db.query(ConflictZone).filter(ConflictZone.is_active == True).all()  # noqa
+
+
+def _conflict_scores(
+    zones: list[ConflictZone], isos: list[str], lats: list[float], lons: list[float],
+) -> np.ndarray:
+    """Score 0-100 per country based on proximity to active conflict zones."""
+    affected = np.array(
+        [[iso in (z.affected_countries or ()) for z in zones] for iso in isos],
+        dtype=bool,
+    ).reshape(len(isos), len(zones))
+    return conflict_score_batch(
+        np.array(lats, dtype=float), np.array(lons, dtype=float), affected,
+        np.array([z.lat for z in zones], dtype=float),
+        np.array([z.lon for z in zones], dtype=float),
+        np.array([z.radius_km for z in zones], dtype=float),
+        [z.severity for z in zones],
+    )
 
 
 def _trade_dependency_score(db: Session, iso: str, year: int) -> float:
@@ -136,25 +137,56 @@ def _trade_dependency_score(db: Session, iso: str, year: int) -> float:
     if total_trade == 0:
         return 0.0
 
-    # Get sanctioned country ISOs
-    sanctioned_isos = set(
-        r[0] for r in db.query(func.distinct(SanctionedEntity.country_iso)).filter(
-            SanctionedEntity.is_active == True,  # noqa
-            SanctionedEntity.country_iso.isnot(None),
-        ).all()
-    )
-
     # Calculate trade share with sanctioned countries
+    sanctioned_isos = _sanctioned_isos(db)
     risky_trade = 0.0
     for partner, value in exports + imports:
         if partner in sanctioned_isos:
             risky_trade += value
 
+    return _trade_dependency_formula(total_trade, risky_trade)
+
+
+def _trade_dependency_formula(total_trade: float, risky_trade: float) -> float:
+    if not total_trade:
+        return 0.0
     risky_share = risky_trade / total_trade
     # Scale: 50% trade with sanctioned partners = score 100
     return min(100, risky_share * 200)
 
 
+def _sanctioned_isos(db: Session) -> set[str]:
+    return set(
+        r[0] for r in db.query(func.distinct(SanctionedEntity.country_iso)).filter(
+            SanctionedEntity.is_active == True,  # noqa
+            SanctionedEntity.country_iso.isnot(None),
+        ).all()
+    )
+
+
+def _trade_dependency_scores(db: Session, year: int) -> dict[str, float]:
+    """_trade_dependency_score for every trading country: one grouped query
+    per flow side instead of two per country."""
+    sanctioned = _sanctioned_isos(db)
+    totals: dict[str, list[float]] = {}
+    for own, partner in (
+        (TradeFlow.exporter_iso, TradeFlow.importer_iso),
+        (TradeFlow.importer_iso, TradeFlow.exporter_iso),
+    ):
+        risky = (
+            func.sum(case((partner.in_(sorted(sanctioned)), TradeFlow.trade_value_usd), else_=0.0))
+            if sanctioned else literal(0.0)
+        )
+        rows = db.query(own, func.sum(TradeFlow.trade_value_usd), risky).filter(
+            TradeFlow.year == year,
+        ).group_by(own).all()
+        for iso, total, risky_value in rows:
+            acc = totals.setdefault(iso, [0.0, 0.0])
+            acc[0] += total or 0.0
+            acc[1] += risky_value or 0.0
+    return {iso: _trade_dependency_formula(t, r) for iso, (t, r) in totals.items()}
+
+
 def _chokepoint_vulnerability_score(chokepoint_data: list, iso: str) -> float:
     """Score 0-100 based on exposure to stressed chokepoints."""
     # Use existing chokepoint monitoring data
@@ -185,10 +217,13 @@ def _energy_risk_score(energy_data: list, iso: str) -> float:
 
 def compute_country_risk_scores(db: Session, year: int = 2023) -> list[dict]:
     """Compute risk scores for all countries."""
-    countries = db.query(Country).filter(
+    countries = db.query(
+        Country.iso_code, Country.name, Country.centroid_lat, Country.centroid_lon,
+    ).filter(
         Country.centroid_lat.isnot(None),
         Country.centroid_lon.isnot(None),
     ).all()
+    isos = [c.iso_code for c in countries]
 
     # Pre-compute shared data
     try:
@@ -201,21 +236,25 @@ def compute_country_risk_scores(db: Session, year: int = 2023) -> list[dict]:
     except Exception:
         energy_data = []
 
+    # Component scores as columns (countries × RISK_WEIGHTS order), each
+    # filled from a handful of grouped queries rather than per country.
+    sanctions_by_iso = _sanctions_scores(db)
+    trade_dep_by_iso = _trade_dependency_scores(db, year)
+    components = np.column_stack([
+        [sanctions_by_iso.get(iso, 0.0) for iso in isos],
+        _conflict_scores(
+            _load_active_zones(db), isos,
+            [c.centroid_lat for c in countries], [c.centroid_lon for c in countries],
+        ),
+        [trade_dep_by_iso.get(iso, 0.0) for iso in isos],
+        [_chokepoint_vulnerability_score(chokepoint_data, iso) for iso in isos],
+        [_energy_risk_score(energy_data, iso) for iso in isos],
+    ]).reshape(len(isos), len(RISK_WEIGHTS))
+    composites = components @ np.array(list(RISK_WEIGHTS.values()))
+
     results = []
-    for country in countries:
-        sanctions = _sanctions_score(db, country.iso_code)
-        conflict = _conflict_score(db, country.iso_code, country.centroid_lat, country.centroid_lon)
-        trade_dep = _trade_dependency_score(db, country.iso_code, year)
-        chokepoint = _chokepoint_vulnerability_score(chokepoint_data, country.iso_code)
-        energy = _energy_risk_score(energy_data, country.iso_code)
-
-        composite = (
-            sanctions * RISK_WEIGHTS["sanctions"] +
-            conflict * RISK_WEIGHTS["conflict"] +
-            trade_dep * RISK_WEIGHTS["trade_dependency"] +
-            chokepoint * RISK_WEIGHTS["chokepoint"] +
-            energy * RISK_WEIGHTS["energy"]
-        )
+    for country, row, composite in zip(countries, components.tolist(), composites.tolist()):
+        sanctions, conflict, trade_dep, chokepoint, energy = row
         level = _risk_level(composite)
 
         results.append({
@@ -238,6 +277,35 @@ def compute_country_risk_scores(db: Session, year: int = 2023) -> list[dict]:
     return results
 
 
+def store_country_risk_scores(db: Session, year: int, results: list[dict]) -> int:
+    """Upsert component scores from compute_country_risk_scores into
+    country_risk_scores in batched multi-row INSERT ... ON CONFLICT
+    statements. composite_risk / risk_level are generated by PostgreSQL."""
+    rows = [
+        {
+            "country_iso": r["iso_code"],
+            "year": year,
+            "sanctions_score": r["scores"]["sanctions"],
+            "conflict_score": r["scores"]["conflict"],
+            "trade_dependency_score": r["scores"]["trade_dependency"],
+            "chokepoint_vulnerability": r["scores"]["chokepoint_vulnerability"],
+            "energy_risk_score": r["scores"]["energy_risk"],
+        }
+        for r in results
+    ]
+    for i in range(0, len(rows), RISK_UPSERT_BATCH_SIZE):
+        stmt = pg_insert(CountryRiskScore).values(rows[i : i + RISK_UPSERT_BATCH_SIZE])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["country_iso", "year"],
+            set_={
+                **{col: stmt.excluded[col] for col in _RISK_SCORE_COLUMNS},
+                "calculated_at": UTC_NOW,
+            },
+        ))
+    db.commit()
+    return len(rows)
+
+
 def compute_single_country_risk(db: Session, iso: str, year: int = 2023) -> Optional[dict]:
     """Compute risk score for a single country."""
     country = db.query(Country).filter(Country.iso_code == iso).first()
@@ -255,7 +323,9 @@ def compute_single_country_risk(db: Session, iso: str, year: int = 2023) -> Opti
         energy_data = []
 
     sanctions = _sanctions_score(db, iso)
-    conflict = _conflict_score(db, iso, country.centroid_lat or 0, country.centroid_lon or 0)
+    conflict = _conflict_scores(
+        _load_active_zones(db), [iso], [country.centroid_lat or 0], [country.centroid_lon or 0],
+    )[0].item()
     trade_dep = _trade_dependency_score(db, iso, year)
     chokepoint = _chokepoint_vulnerability_score(chokepoint_data, iso)
     energy = _energy_risk_score(energy_data, iso)
@@ -275,21 +345,18 @@ def compute_single_country_risk(db: Session, iso: str, year: int = 2023) -> Opti
     ).all()
 
     # Get conflict zones affecting this country
-    zones = db.query(ConflictZone).filter(ConflictZone.is_active == True).all()  # noqa
-    affecting_zones = []
-    for z in zones:
-        affected = []
-        if z.affected_countries:
-            try:
-                affected = json.loads(z.affected_countries)
-            except (json.JSONDecodeError, TypeError):
-                pass
-        if iso in affected:
-            affecting_zones.append({
-                "id": z.id, "name": z.name, "zone_type": z.zone_type,
-                "severity": z.severity, "lat": z.lat, "lon": z.lon,
-                "radius_km": z.radius_km,
-            })
+    zones = db.query(ConflictZone).filter(
+        ConflictZone.is_active == True,  # noqa
+        ConflictZone.affected_countries.contains([iso]),
+    ).all()
+    affecting_zones = [
+        {
+            "id": z.id, "name": z.name, "zone_type": z.zone_type,
+            "severity": z.severity, "lat": z.lat, "lon": z.lon,
+            "radius_km": z.radius_km,
+        }
+        for z in zones
+    ]
 
     return {
         "iso_code": iso,
@@ -328,12 +395,7 @@ def compute_supply_chain_vulnerabilities(db: Session, year: int = 2023) -> list[
     results = []
     for route in routes:
         # Score based on chokepoints on route
-        transit = []
-        if route.chokepoints_transit:
-            try:
-                transit = json.loads(route.chokepoints_transit)
-            except (json.JSONDecodeError, TypeError):
-                transit = []
+        transit = route.chokepoints_transit or []
 
         stressed_on_route = []
         for cp in chokepoint_data:
@@ -505,20 +567,9 @@ def get_conflict_zones_summary(db: Session) -> list[dict]:
         "lat": z.lat,
         "lon": z.lon,
         "radius_km": z.radius_km,
-        "affected_countries": json.loads(z.affected_countries) if z.affected_countries else [],
-        "affected_chokepoints": json.loads(z.affected_chokepoints) if z.affected_chokepoints else [],
+        "affected_countries": z.affected_countries or [],
+        "affected_chokepoints": z.affected_chokepoints or [],
         "description": z.description,
         "start_date": z.start_date.isoformat() if z.start_date else None,
         "is_active": z.is_active,
     } for z in zones]
-
-
-# ─── Haversine helper ───
-
-def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Distance in km between two points on Earth."""
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
@@ -0,0 +1,130 @@
+"""
+API Usage Log Partition Maintenance
+───────────────────────────────────
+api_usage_logs is range-partitioned by month on `timestamp`. Analytics
+windows (today / this week / last N days) then only touch the newest
+partitions, and expiring history is a DROP TABLE instead of a DELETE +
+VACUUM over the whole log.
+
+Rows with no matching monthly partition land in api_usage_logs_default,
+so inserts never fail. Monthly partitions are created ahead of time (before
+any row for that month can reach the default partition) by the scheduler.
+If rows for a month did land there first, creating that month's partition
+moves them out of the default partition; retention also prunes it.
+"""
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("gefo.services.usage_partitions")
+
+PARENT_TABLE = "api_usage_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+
+def _month_start(d: date, offset: int = 0) -> date:
+    months = d.year * 12 + (d.month - 1) + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = 2, today: date | None = None) -> list[str]:
+    """Create monthly partitions from the current month through `months_ahead`.
+    Returns the names of partitions that were newly created."""
+    today = today or datetime.utcnow().date()
+    existing = {
+        r[0] for r in conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ), {"parent": PARENT_TABLE})
+    }
+
+    created = []
+    for offset in range(months_ahead + 1):
+        start = _month_start(today, offset)
+        name = partition_name(start)
+        if name in existing:
+            continue
+        end = _month_start(start, 1)
+        stranded = 0
+        try:
+            with conn.begin_nested():
+                # Block inserts into the default partition until the month's
+                # rows have moved, or ATTACH would find new ones there
+                conn.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE"))
+                stranded = conn.execute(text(
+                    f"SELECT count(*) FROM {DEFAULT_PARTITION} "
+                    "WHERE \"timestamp\" >= :start AND \"timestamp\" < :end"
+                ), {"start": start, "end": end}).scalar()
+                if stranded:
+                    _create_from_default(conn, name, start, end)
+                    logger.warning(f"Moved {stranded} rows from {DEFAULT_PARTITION} into {name}")
+                else:
+                    conn.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                    ))
+            created.append(name)
+        except Exception as e:
+            logger.error(
+                f"Could not create partition {name} for {start:%Y-%m} "
+                f"({stranded} rows in {DEFAULT_PARTITION}): {e}"
+            )
+    return created
+
+
+def _create_from_default(conn: Connection, name: str, start: date, end: date) -> None:
+    """Create the [start, end) partition from rows already in the default
+    partition: copy them into a standalone table, delete them from the
+    default, then attach the table. Runs in the caller's transaction."""
+    conn.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        "WHERE \"timestamp\" >= :start AND \"timestamp\" < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), {"start": start, "end": end})
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+
+
+def drop_expired_partitions(conn: Connection, retention_months: int, today: date | None = None) -> list[str]:
+    """Drop monthly partitions that end before the retention window, and
+    delete default-partition rows older than it.
+    `retention_months` <= 0 keeps everything."""
+    if retention_months <= 0:
+        return []
+    today = today or datetime.utcnow().date()
+    cutoff_month = _month_start(today, -retention_months)
+    cutoff = partition_name(cutoff_month)
+
+    purged = conn.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE \"timestamp\" < :cutoff"),
+        {"cutoff": cutoff_month},
+    ).rowcount
+    if purged:
+        logger.info(f"Deleted {purged} expired rows from {DEFAULT_PARTITION}")
+
+    names = [
+        r[0] for r in conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent AND c.relname <> :default"
+        ), {"parent": PARENT_TABLE, "default": DEFAULT_PARTITION})
+    ]
+    # Zero-padded YYYY_MM suffixes sort chronologically
+    expired = sorted(n for n in names if n < cutoff)
+    for name in expired:
+        conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    return expired
@@ -0,0 +1,101 @@
+"""
+API Usage Daily Roll-up
+───────────────────────
+Admin analytics group the raw api_usage_logs by endpoint and by day over
+windows of up to 90 days. Completed days are rolled up nightly into
+api_usage_daily (one row per day × endpoint × method); the read helpers
+below combine that table with the raw log for whatever has not been
+rolled up yet, so results stay complete even if the job falls behind.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import desc, func, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.usage_log import APIUsageDaily, APIUsageLog
+
+logger = logging.getLogger("gefo.services.usage_rollup")
+
+
+def rollup_usage_days(conn: Connection, today: date | None = None) -> int:
+    """Aggregate every completed day since the last roll-up into
+    api_usage_daily. The last rolled-up day is recomputed too, picking up
+    rows written just after midnight. Returns the number of rows upserted."""
+    today = today or datetime.utcnow().date()
+    last = conn.execute(select(func.max(APIUsageDaily.day))).scalar()
+    if last is None:
+        first_ts = conn.execute(select(func.min(APIUsageLog.timestamp))).scalar()
+        if first_ts is None:
+            return 0
+        last = first_ts.date()
+
+    result = conn.execute(text(
+        "INSERT INTO api_usage_daily "
+        "(day, endpoint, method, request_count, response_ms_sum, response_ms_count) "
+        "SELECT timestamp::date, endpoint, method, COUNT(*), "
+        "SUM(response_time_ms), COUNT(response_time_ms) "
+        "FROM api_usage_logs WHERE timestamp >= :since AND timestamp < :until "
+        "GROUP BY 1, 2, 3 "
+        "ON CONFLICT (day, endpoint, method) DO UPDATE SET "
+        "request_count = EXCLUDED.request_count, "
+        "response_ms_sum = EXCLUDED.response_ms_sum, "
+        "response_ms_count = EXCLUDED.response_ms_count"
+    ), {"since": datetime.combine(last, time()), "until": datetime.combine(today, time())})
+    return result.rowcount
+
+
+def _split(db: Session, start: datetime) -> tuple[date, date, datetime]:
+    """(first rolled day, first unrolled day, raw-log start) for a window."""
+    last = db.execute(select(func.max(APIUsageDaily.day))).scalar()
+    live_day = last + timedelta(days=1) if last else start.date()
+    live_since = max(start, datetime.combine(live_day, time()))
+    return start.date(), live_day, live_since
+
+
+def top_endpoints(db: Session, start: datetime, limit: int = 15) -> list[tuple]:
+    """(endpoint, method, count, avg_ms) since `start`, busiest first.
+    Rolled-up days count whole, so the window starts at midnight of `start`."""
+    first_day, live_day, live_since = _split(db, start)
+    rolled = select(
+        APIUsageDaily.endpoint, APIUsageDaily.method,
+        APIUsageDaily.request_count.label("cnt"),
+        APIUsageDaily.response_ms_sum.label("ms_sum"),
+        APIUsageDaily.response_ms_count.label("ms_n"),
+    ).where(APIUsageDaily.day >= first_day, APIUsageDaily.day < live_day)
+    live = select(
+        APIUsageLog.endpoint, APIUsageLog.method,
+        func.count(APIUsageLog.id),
+        func.sum(APIUsageLog.response_time_ms),
+        func.count(APIUsageLog.response_time_ms),
+    ).where(APIUsageLog.timestamp >= live_since).group_by(APIUsageLog.endpoint, APIUsageLog.method)
+    u = union_all(rolled, live).subquery()
+
+    return db.execute(
+        select(
+            u.c.endpoint, u.c.method,
+            func.sum(u.c.cnt).label("cnt"),
+            (func.sum(u.c.ms_sum) / func.nullif(func.sum(u.c.ms_n), 0)).label("avg_ms"),
+        )
+        .group_by(u.c.endpoint, u.c.method)
+        .order_by(desc("cnt"))
+        .limit(limit)
+    ).all()
+
+
+def daily_counts(db: Session, start: datetime) -> list[tuple]:
+    """(day, count) per day since `start`, oldest first."""
+    first_day, live_day, live_since = _split(db, start)
+    rolled = select(
+        APIUsageDaily.day, func.sum(APIUsageDaily.request_count).label("cnt"),
+    ).where(APIUsageDaily.day >= first_day, APIUsageDaily.day < live_day).group_by(APIUsageDaily.day)
+    day = func.date(APIUsageLog.timestamp)
+    live = select(day, func.count(APIUsageLog.id)).where(
+        APIUsageLog.timestamp >= live_since,
+    ).group_by(day)
+    u = union_all(rolled, live).subquery()
+
+    return db.execute(
+        select(u.c.day, func.sum(u.c.cnt)).group_by(u.c.day).order_by(u.c.day)
+    ).all()
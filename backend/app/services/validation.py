@@ -40,7 +40,6 @@ TABLE_SCHEMAS: Dict[str, Dict[str, Dict[str, Any]]] = {
         "sub_region": {"type": "str", "required": False, "max_len": 100},
         "gdp": {"type": "float", "required": False, "min": 0},
         "gdp_per_capita": {"type": "float", "required": False, "min": 0},
-        "trade_balance": {"type": "float", "required": False},
         "current_account": {"type": "float", "required": False},
         "export_value": {"type": "float", "required": False, "min": 0},
         "import_value": {"type": "float", "required": False, "min": 0},
@@ -0,0 +1,108 @@
+"""
+Unit tests for analytics.py — growth & outlier detection helpers.
+
+Series loading and the anomaly endpoints are DB-bound (need TradeFlow
+rows); these tests cover the pure NumPy passes applied to each series.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.services.analytics import (
+    MAD_MIN_FOREST_POINTS,
+    _cagr,
+    _mad_outliers,
+    _structural_outliers,
+)
+
+
+# ─── _cagr ──────────────────────────────────────────────────────────────────
+
+class TestCagr:
+    def test_doubling_in_one_step(self):
+        assert _cagr(np.array([100.0, 200.0])) == 100.0
+
+    def test_matches_power_formula(self):
+        for values in ([1.0, 1.3, 1.6, 2.0], [8.0, 7.0, 6.0, 5.0, 4.0], [250.0, 300.0, 260.0]):
+            n = len(values) - 1
+            want = round(((values[-1] / values[0]) ** (1 / n) - 1) * 100, 2)
+            assert _cagr(np.array(values)) == pytest.approx(want, abs=0.01)
+
+    def test_decline(self):
+        assert _cagr(np.array([1.0, 0.9, 0.7, 0.6, 0.5])) == -15.91
+
+    def test_flat_series_is_zero(self):
+        assert _cagr(np.array([5.0, 7.0, 5.0])) == 0.0
+
+    def test_too_short_is_none(self):
+        assert _cagr(np.array([100.0])) is None
+        assert _cagr(np.array([])) is None
+
+    def test_non_positive_start_is_none(self):
+        assert _cagr(np.array([0.0, 10.0])) is None
+        assert _cagr(np.array([-5.0, 10.0])) is None
+
+    def test_non_positive_end_is_none(self):
+        assert _cagr(np.array([10.0, 0.0])) is None
+        assert _cagr(np.array([10.0, -2.0])) is None
+
+    def test_result_is_finite(self):
+        assert math.isfinite(_cagr(np.array([1e-6, 1e9])))
+
+
+# ─── _mad_outliers ──────────────────────────────────────────────────────────
+
+class TestMadOutliers:
+    def test_spike_is_flagged(self):
+        arr = np.array([10.0, 11.0, 9.0, 10.5, 9.5, 10.0, 80.0, 10.2])
+        got = _mad_outliers(arr)
+        assert [i for i, _ in got] == [6]
+        assert got[0][1] > 3.0
+
+    def test_negative_spike_has_negative_score(self):
+        arr = np.array([10.0, 11.0, 9.0, 10.5, 9.5, -50.0, 10.2])
+        (idx, z), = _mad_outliers(arr)
+        assert idx == 5
+        assert z < -3.0
+
+    def test_noise_within_threshold_is_clean(self):
+        assert _mad_outliers(np.array([10.0, 11.0, 9.0, 10.5, 9.5, 10.0])) == ()
+
+    def test_flat_series_returns_empty(self):
+        """MAD is 0 for a constant series — no scale, so nothing is flagged."""
+        assert _mad_outliers(np.full(12, 42.0)) == ()
+
+    def test_mostly_flat_series_returns_empty(self):
+        """More than half the points equal → MAD is still 0, even with a spike."""
+        assert _mad_outliers(np.array([5.0] * 7 + [500.0])) == ()
+
+
+# ─── _structural_outliers ───────────────────────────────────────────────────
+
+class TestStructuralOutliers:
+    def setup_method(self):
+        _structural_outliers.cache_clear()
+
+    def test_short_series_uses_mad(self):
+        values = tuple([10.0, 11.0, 9.0] * 9 + [10.0, 80.0])
+        assert len(values) == MAD_MIN_FOREST_POINTS - 1
+        method, outliers = _structural_outliers(values)
+        assert method == "mad"
+        assert outliers == _mad_outliers(np.array(values))
+
+    def test_flat_short_series(self):
+        assert _structural_outliers((3.0,) * 10) == ("mad", ())
+
+    def test_switches_to_forest_at_threshold(self):
+        pytest.importorskip("sklearn")
+        values = tuple(float(v) for v in np.linspace(100, 130, MAD_MIN_FOREST_POINTS))
+        method, outliers = _structural_outliers(values)
+        assert method == "isolation_forest"
+        assert all(0 <= i < len(values) for i, _ in outliers)
+
+    def test_result_is_memoised(self):
+        values = (1.0, 2.0, 3.0, 50.0, 2.0, 1.0)
+        first = _structural_outliers(values)
+        assert _structural_outliers(values) is first
+        assert _structural_outliers.cache_info().hits == 1
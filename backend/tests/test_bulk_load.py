@@ -0,0 +1,86 @@
+"""
+Unit tests for bulk_load.py — non-PostgreSQL fallback.
+
+The COPY path needs a live psycopg2 connection; these tests cover the
+bulk_insert fallback that copy_rows takes on every other dialect.
+"""
+from types import SimpleNamespace
+
+from sqlalchemy import Column, Integer, MetaData, String, Table
+
+from app.ingestion.bulk_load import (
+    BULK_INSERT_BATCH_SIZES,
+    DEFAULT_BULK_INSERT_BATCH_SIZE,
+    bulk_insert,
+    copy_rows,
+)
+
+_demo = Table(
+    "demo", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("iso_code", String(3)),
+)
+
+
+class _FakeSession:
+    """Records execute() calls; reports the given dialect."""
+
+    def __init__(self, dialect: str):
+        self._bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+        self.calls: list = []
+
+    def get_bind(self):
+        return self._bind
+
+    def execute(self, stmt, params=None):
+        self.calls.append((stmt, params))
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"id": i, "iso_code": "DEU"} for i in range(n)]
+
+
+# ─── copy_rows fallback ─────────────────────────────────────────────────────
+
+class TestCopyRowsFallback:
+    def test_returns_row_count(self):
+        db = _FakeSession("sqlite")
+        assert copy_rows(db, _demo, ("id", "iso_code"), _rows(5)) == 5
+
+    def test_inserts_every_row_once(self):
+        db = _FakeSession("sqlite")
+        rows = _rows(7)
+        copy_rows(db, _demo, ("id", "iso_code"), rows, on_conflict="(id) DO NOTHING")
+        sent = [r for _, chunk in db.calls for r in chunk]
+        assert sent == rows
+
+    def test_no_copy_or_staging_sql(self):
+        db = _FakeSession("sqlite")
+        copy_rows(db, _demo, ("id", "iso_code"), _rows(3), skip_conflicts=True)
+        assert len(db.calls) == 1
+        assert str(db.calls[0][0]).startswith("INSERT INTO demo")
+
+    def test_empty_rows_execute_nothing(self):
+        db = _FakeSession("sqlite")
+        assert copy_rows(db, _demo, ("id", "iso_code"), []) == 0
+        assert db.calls == []
+
+
+# ─── bulk_insert batching ───────────────────────────────────────────────────
+
+class TestBulkInsertBatching:
+    def test_unknown_dialect_uses_default_batch(self):
+        db = _FakeSession("sqlite")
+        bulk_insert(db, _demo, _rows(DEFAULT_BULK_INSERT_BATCH_SIZE + 1))
+        assert [len(chunk) for _, chunk in db.calls] == [DEFAULT_BULK_INSERT_BATCH_SIZE, 1]
+
+    def test_postgresql_batch_size(self):
+        db = _FakeSession("postgresql")
+        size = BULK_INSERT_BATCH_SIZES["postgresql"]
+        bulk_insert(db, _demo, _rows(size * 2 + 3))
+        assert [len(chunk) for _, chunk in db.calls] == [size, size, 3]
+
+    def test_explicit_batch_size(self):
+        db = _FakeSession("sqlite")
+        bulk_insert(db, _demo, iter(_rows(5)), batch_size=2)
+        assert [len(chunk) for _, chunk in db.calls] == [2, 2, 1]
@@ -0,0 +1,87 @@
+"""
+Unit tests for import_engine.py — upsert clause & batch deduplication.
+
+The import pipeline itself is DB-bound (needs ImportJob rows and a live
+session); these tests cover the pure helpers that shape each batch's
+INSERT ... ON CONFLICT.
+"""
+from app.services.import_engine import (
+    UPSERT_COALESCED_KEYS,
+    UPSERT_KEYS,
+    _dedup_last,
+    _upsert_clause,
+)
+
+
+# ─── _upsert_clause ─────────────────────────────────────────────────────────
+
+class TestUpsertClause:
+    def test_table_without_natural_key_has_no_clause(self):
+        assert _upsert_clause("shipping_density", ["lat", "lon", "density_value"]) is None
+
+    def test_updates_only_non_key_columns(self):
+        clause = _upsert_clause("countries", ["iso_code", "name", "gdp"])
+        assert clause == "(iso_code) DO UPDATE SET name = EXCLUDED.name, gdp = EXCLUDED.gdp"
+
+    def test_key_only_columns_do_nothing(self):
+        assert _upsert_clause("ports", ["unlocode"]) == "(unlocode) DO NOTHING"
+
+    def test_trade_flows_uses_expression_target(self):
+        cols = list(UPSERT_KEYS["trade_flows"][1]) + ["trade_value_usd"]
+        clause = _upsert_clause("trade_flows", cols)
+        assert clause.startswith(UPSERT_KEYS["trade_flows"][0] + " DO UPDATE SET ")
+        assert clause.endswith("trade_value_usd = EXCLUDED.trade_value_usd")
+        assert "month = EXCLUDED" not in clause
+
+
+# ─── _dedup_last ────────────────────────────────────────────────────────────
+
+class TestDedupLast:
+    def test_last_row_per_key_wins(self):
+        rows = [
+            {"iso_code": "DEU", "gdp": 1},
+            {"iso_code": "FRA", "gdp": 2},
+            {"iso_code": "DEU", "gdp": 3},
+        ]
+        assert _dedup_last(rows, ("iso_code",)) == [
+            {"iso_code": "DEU", "gdp": 3},
+            {"iso_code": "FRA", "gdp": 2},
+        ]
+
+    def test_missing_and_none_keys_collide(self):
+        """COALESCE in the conflict target treats a NULL month as 0, so rows
+        with and without a month column must not both reach the INSERT."""
+        key = ("exporter_iso", "month")
+        rows = [{"exporter_iso": "CHN", "v": 1}, {"exporter_iso": "CHN", "month": None, "v": 2}]
+        assert _dedup_last(rows, key, ("month",)) == [{"exporter_iso": "CHN", "month": None, "v": 2}]
+
+    def test_null_keys_pass_through(self):
+        """The unique index treats NULLs as distinct, so ports without a
+        UN/LOCODE never conflict and must all be kept."""
+        rows = [
+            {"unlocode": None, "name": "A"},
+            {"unlocode": "NLRTM", "name": "B"},
+            {"unlocode": None, "name": "C"},
+            {"name": "D"},
+            {"unlocode": "NLRTM", "name": "E"},
+        ]
+        got = _dedup_last(rows, ("unlocode",))
+        assert got == [rows[4], rows[0], rows[2], rows[3]]
+
+    def test_null_in_uncoalesced_trade_key_passes_through(self):
+        key, coalesced = UPSERT_KEYS["trade_flows"][1], UPSERT_COALESCED_KEYS["trade_flows"]
+        row = {"exporter_iso": None, "importer_iso": "USA", "year": 2023, "flow_type": "export"}
+        assert _dedup_last([row, dict(row)], key, coalesced) == [row, row]
+
+    def test_coalesced_keys_match_conflict_target(self):
+        for table, cols in UPSERT_COALESCED_KEYS.items():
+            target = UPSERT_KEYS[table][0]
+            for c in cols:
+                assert f"COALESCE({c}," in target
+
+    def test_distinct_keys_are_untouched(self):
+        rows = [{"unlocode": "NLRTM"}, {"unlocode": "SGSIN"}]
+        assert _dedup_last(rows, ("unlocode",)) == rows
+
+    def test_empty_batch(self):
+        assert _dedup_last([], ("iso_code",)) == []
@@ -0,0 +1,146 @@
+"""
+Unit tests for risk_kernels.py — vectorised conflict scoring.
+
+conflict_score_batch replaced a per-country loop over ConflictZone rows;
+these tests check it against that loop (reproduced below without the DB
+query) on hand-placed zones.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.services.risk_kernels import conflict_score_batch, haversine_matrix
+
+
+# ─── Reference: the per-zone loop conflict_score_batch replaced ─────────────
+
+def _haversine(lat1, lon1, lat2, lon2):
+    R = 6371
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _conflict_score(iso, lat, lon, zones):
+    max_impact = 0.0
+    for zone in zones:
+        if iso in zone["affected"]:
+            severity_map = {"critical": 90, "high": 70, "moderate": 45, "low": 20}
+            max_impact = max(max_impact, severity_map.get(zone["severity"], 30))
+            continue
+        dist_km = _haversine(lat, lon, zone["lat"], zone["lon"])
+        if dist_km < zone["radius_km"] * 3:
+            severity_map = {"critical": 80, "high": 60, "moderate": 35, "low": 15}
+            base = severity_map.get(zone["severity"], 25)
+            falloff = max(0, 1 - (dist_km / (zone["radius_km"] * 3)))
+            max_impact = max(max_impact, base * falloff)
+    return min(100, max_impact)
+
+
+def _batch(countries, zones):
+    isos = [c[0] for c in countries]
+    affected = np.array([[iso in z["affected"] for z in zones] for iso in isos], dtype=bool)
+    affected = affected.reshape(len(isos), len(zones))
+    return conflict_score_batch(
+        np.array([c[1] for c in countries], dtype=float),
+        np.array([c[2] for c in countries], dtype=float),
+        affected,
+        np.array([z["lat"] for z in zones], dtype=float),
+        np.array([z["lon"] for z in zones], dtype=float),
+        np.array([z["radius_km"] for z in zones], dtype=float),
+        [z["severity"] for z in zones],
+    )
+
+
+def _zone(lat, lon, radius_km, severity, affected=()):
+    return {"lat": lat, "lon": lon, "radius_km": radius_km, "severity": severity, "affected": set(affected)}
+
+
+# ─── haversine_matrix ───────────────────────────────────────────────────────
+
+class TestHaversineMatrix:
+    def test_matches_scalar_formula(self):
+        lat1, lon1 = np.array([51.5, -33.9]), np.array([-0.1, 151.2])
+        lat2, lon2 = np.array([40.7, 35.7, 0.0]), np.array([-74.0, 139.7, 0.0])
+        got = haversine_matrix(lat1, lon1, lat2, lon2)
+        assert got.shape == (2, 3)
+        for i in range(2):
+            for j in range(3):
+                assert got[i, j] == pytest.approx(_haversine(lat1[i], lon1[i], lat2[j], lon2[j]))
+
+    def test_same_point_is_zero(self):
+        d = haversine_matrix(np.array([10.0]), np.array([20.0]), np.array([10.0]), np.array([20.0]))
+        assert d[0, 0] == pytest.approx(0.0)
+
+
+# ─── conflict_score_batch ───────────────────────────────────────────────────
+
+class TestConflictScoreBatch:
+    def test_affected_country_scores_flat_severity(self):
+        """Listed countries get the flat score however far away they are."""
+        zones = [_zone(0, 0, 100, "high", affected={"AAA"})]
+        got = _batch([("AAA", 60.0, 120.0)], zones)
+        assert got[0] == pytest.approx(70.0)
+        assert got[0] == pytest.approx(_conflict_score("AAA", 60.0, 120.0, zones))
+
+    def test_proximity_falls_off_linearly(self):
+        zones = [_zone(0, 0, 200, "critical")]
+        # ~111 km per degree of latitude at the meridian
+        countries = [("NNN", 2.0, 0.0)]
+        dist = _haversine(2.0, 0.0, 0, 0)
+        got = _batch(countries, zones)
+        assert got[0] == pytest.approx(80 * (1 - dist / 600))
+
+    def test_three_times_radius_cutoff(self):
+        zones = [_zone(0, 0, 100, "critical")]
+        inside = ("INS", 2.6, 0.0)   # ~289 km < 300
+        outside = ("OUT", 2.8, 0.0)  # ~311 km > 300
+        got = _batch([inside, outside], zones)
+        assert got[0] > 0
+        assert got[1] == 0.0
+
+    def test_unknown_severity_uses_defaults(self):
+        zones = [
+            _zone(0, 0, 500, "unrated", affected={"AAA"}),
+            _zone(0, 0, 500, None),
+        ]
+        got = _batch([("AAA", 0.0, 0.0), ("BBB", 0.0, 0.0)], zones)
+        assert got[0] == pytest.approx(30.0)
+        assert got[1] == pytest.approx(25.0)
+
+    def test_affected_beats_weaker_proximity_and_vice_versa(self):
+        zones = [
+            _zone(0, 0, 1000, "low", affected={"AAA"}),  # flat 20
+            _zone(1, 1, 1000, "critical"),               # ~80 nearby
+        ]
+        got = _batch([("AAA", 0.5, 0.5)], zones)
+        assert got[0] > 20
+        assert got[0] == pytest.approx(_conflict_score("AAA", 0.5, 0.5, zones))
+
+    def test_matches_reference_loop(self):
+        rng = np.random.default_rng(7)
+        severities = ["critical", "high", "moderate", "low", "unknown"]
+        zones = [
+            _zone(
+                float(rng.uniform(-60, 60)), float(rng.uniform(-180, 180)),
+                float(rng.uniform(50, 1500)), severities[k % len(severities)],
+                affected={f"C{j:02d}" for j in rng.choice(40, size=3, replace=False)},
+            )
+            for k in range(15)
+        ]
+        countries = [
+            (f"C{i:02d}", float(rng.uniform(-60, 60)), float(rng.uniform(-180, 180)))
+            for i in range(40)
+        ]
+        got = _batch(countries, zones)
+        want = [_conflict_score(iso, lat, lon, zones) for iso, lat, lon in countries]
+        np.testing.assert_allclose(got, want, atol=1e-9)
+
+    def test_no_zones_scores_zero(self):
+        got = _batch([("AAA", 0.0, 0.0), ("BBB", 10.0, 10.0)], [])
+        assert got.tolist() == [0.0, 0.0]
+
+    def test_no_countries(self):
+        assert _batch([], [_zone(0, 0, 100, "high")]).shape == (0,)
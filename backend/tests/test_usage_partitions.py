@@ -0,0 +1,101 @@
+"""
+Unit tests for usage_partitions.py — month arithmetic & retention cutoff.
+
+Partition DDL needs PostgreSQL; drop_expired_partitions is exercised with
+a fake connection that lists partitions and records the DROP and DELETE
+statements.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+from app.services.usage_partitions import (
+    DEFAULT_PARTITION,
+    _month_start,
+    drop_expired_partitions,
+    partition_name,
+)
+
+
+class _FakeConn:
+    """Answers the pg_inherits query with `partitions`; records DROPs and
+    default-partition purges."""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.dropped: list[str] = []
+        self.purged_before: list[date] = []
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        if sql.startswith("DROP TABLE"):
+            self.dropped.append(sql.split()[-1])
+            return []
+        if sql.startswith(f"DELETE FROM {DEFAULT_PARTITION}"):
+            self.purged_before.append(params["cutoff"])
+            return SimpleNamespace(rowcount=0)
+        return [(p,) for p in self.partitions if p != params["default"]]
+
+
+def _months(*pairs):
+    return [partition_name(date(y, m, 1)) for y, m in pairs]
+
+
+# ─── _month_start ───────────────────────────────────────────────────────────
+
+class TestMonthStart:
+    def test_snaps_to_first_of_month(self):
+        assert _month_start(date(2024, 5, 17)) == date(2024, 5, 1)
+
+    def test_back_across_year_boundary(self):
+        assert _month_start(date(2024, 1, 31), -1) == date(2023, 12, 1)
+
+    def test_forward_across_year_boundary(self):
+        assert _month_start(date(2023, 12, 15), 1) == date(2024, 1, 1)
+
+    def test_multi_year_offsets(self):
+        assert _month_start(date(2024, 1, 1), -13) == date(2022, 12, 1)
+        assert _month_start(date(2024, 3, 1), -24) == date(2022, 3, 1)
+        assert _month_start(date(2023, 11, 1), 14) == date(2025, 1, 1)
+
+    def test_partition_name_is_zero_padded(self):
+        assert partition_name(date(2024, 2, 1)) == "api_usage_logs_2024_02"
+
+
+# ─── drop_expired_partitions ────────────────────────────────────────────────
+
+class TestDropExpiredPartitions:
+    def test_cutoff_across_year_boundary(self):
+        """Feb 2024 with 3 months' retention keeps Nov 2023 onwards."""
+        conn = _FakeConn(_months((2023, 9), (2023, 10), (2023, 11), (2023, 12), (2024, 1), (2024, 2)))
+        dropped = drop_expired_partitions(conn, 3, today=date(2024, 2, 15))
+        assert dropped == _months((2023, 9), (2023, 10))
+        assert conn.dropped == dropped
+
+    def test_drops_oldest_first_whatever_the_listing_order(self):
+        conn = _FakeConn(_months((2024, 1), (2022, 12), (2023, 6), (2023, 1)))
+        dropped = drop_expired_partitions(conn, 12, today=date(2024, 1, 10))
+        assert dropped == _months((2022, 12))
+        conn = _FakeConn(_months((2024, 1), (2022, 12), (2023, 6), (2022, 11)))
+        assert drop_expired_partitions(conn, 13, today=date(2024, 1, 10)) == _months((2022, 11))
+
+    def test_default_partition_is_never_dropped(self):
+        conn = _FakeConn([DEFAULT_PARTITION] + _months((2020, 1)))
+        assert drop_expired_partitions(conn, 1, today=date(2024, 6, 1)) == _months((2020, 1))
+        assert DEFAULT_PARTITION not in conn.dropped
+
+    def test_default_partition_rows_are_purged_at_cutoff(self):
+        conn = _FakeConn([])
+        drop_expired_partitions(conn, 3, today=date(2024, 2, 15))
+        assert conn.purged_before == [date(2023, 11, 1)]
+
+    def test_nothing_expired(self):
+        conn = _FakeConn(_months((2024, 5), (2024, 6)))
+        assert drop_expired_partitions(conn, 6, today=date(2024, 6, 1)) == []
+        assert conn.dropped == []
+
+    def test_non_positive_retention_keeps_everything(self):
+        conn = _FakeConn(_months((2000, 1)))
+        assert drop_expired_partitions(conn, 0, today=date(2024, 6, 1)) == []
+        assert drop_expired_partitions(conn, -1, today=date(2024, 6, 1)) == []
+        assert conn.dropped == []
+        assert conn.purged_before == []
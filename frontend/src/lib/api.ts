@@ -1084,6 +1084,7 @@ export interface AnomalyEntry {
   severity: string;
   method?: string;
   if_score?: number;
+  mad_z?: number;
 }
 
 export interface TrendInfo {